@@ -0,0 +1,439 @@
+"""
+Per-route HTTP benchmark and load test.
+
+Boots the FastAPI app from main.py on the SQLite storage backend, seeds one
+user per scale (total expense + income transactions per user) and drives
+every router through an in-process ASGI client at the requested
+concurrency. The assistant routes run against a stub LLM that answers after
+--llm-latency-ms, so they measure the API's own work and not Groq's.
+
+For every (scale, concurrency, route) it reports p50/p95/p99 latency,
+throughput and storage-backend calls per request, and checks every response
+is a 2xx. Write routes run after the read routes of each scale so the reads
+see the seeded data. Each route gets --warmup unmeasured requests first, so
+the numbers are for warm per-user caches.
+
+Save the results with --output and diff them between commits to catch
+regressions.
+
+Usage (from the backend directory):
+    python -m benchmarks.http_routes --scales 100,10000,100000 --concurrency 1,16 \\
+        --requests 200 --output results.json
+    python -m benchmarks.http_routes --scales 10000 --routes expenses,debts
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from datetime import date, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# The benchmark always runs against a local database
+os.environ["STORAGE_BACKEND"] = "sqlite"
+
+from storage import StorageBackend  # noqa: E402
+
+EXPENSE_TAGS = ["Food", "Rent", "Transport", "Utilities", "Shopping", "Health", "Travel", "Fun"]
+INCOME_TAGS = ["Salary", "Freelance", "Interest"]
+ACCOUNTS_PER_USER = 3
+PEOPLE_PER_USER = 10
+DEBTS_PER_USER = 50
+LOANS_PER_USER = 3
+DISBURSEMENTS_PER_LOAN = 20
+# Share of each user's transactions that are expenses; the rest are income
+EXPENSE_SHARE = 0.8
+# Transactions are spread over this many days before today
+HISTORY_DAYS = 730
+SEED_BATCH_SIZE = 5000
+
+class Route(NamedTuple):
+    router: str
+    name: str
+    method: str
+    path: str
+    # Builds the JSON body from the seeded user, for POST routes
+    body: Optional[Callable[[dict], dict]] = None
+    writes: bool = False
+
+ROUTES = [
+    Route("users", "get", "GET", "/api/users/{user_id}"),
+    Route("accounts", "list", "GET", "/api/accounts/?user_id={user_id}"),
+    Route("accounts", "total_balance", "GET", "/api/accounts/user/{user_id}/total-balance"),
+    Route("expenses", "list", "GET", "/api/expenses/?user_id={user_id}&limit=100"),
+    Route("expenses", "list_by_tag", "GET", "/api/expenses/?user_id={user_id}&limit=100&tag_name=foo"),
+    Route("expenses", "budget_summary", "GET", "/api/expenses/budget-summary?user_id={user_id}&month={month}&year={year}"),
+    Route("income", "list", "GET", "/api/income/?user_id={user_id}&limit=100"),
+    Route("income", "monthly_summary", "GET", "/api/income/summary/monthly?user_id={user_id}&year={year}"),
+    Route("budgets", "list", "GET", "/api/budgets/?user_id={user_id}"),
+    Route("budgets", "month", "GET", "/api/budgets/user/{user_id}/month?month={month}&year={year}"),
+    Route("tags", "list", "GET", "/api/tags/?user_id={user_id}"),
+    Route("tags", "search", "GET", "/api/tags/search/{user_id}?q=fo"),
+    Route("people", "list", "GET", "/api/people/?user_id={user_id}"),
+    Route("debts", "list", "GET", "/api/debts/?user_id={user_id}"),
+    Route("debts", "summary", "GET", "/api/debts/summary/{user_id}"),
+    Route("loans", "list", "GET", "/api/loans/?user_id={user_id}"),
+    Route("loans", "summary", "GET", "/api/loans/{loan_id}/summary"),
+    Route("loan_disbursements", "list", "GET", "/api/loan-disbursements/?user_id={user_id}"),
+    Route("statistics", "overview", "GET", "/api/statistics/?user_id={user_id}"),
+    Route("dashboard", "home", "GET", "/api/dashboard/{user_id}"),
+    Route("export", "csv", "GET", "/api/export/{user_id}?format=csv"),
+    Route("assistant", "chat", "POST", "/api/assistant/chat",
+          body=lambda user: {"user_id": user["user_id"], "message": "How did I do this month?"}),
+    Route("assistant", "chat_stream", "POST", "/api/assistant/chat/stream",
+          body=lambda user: {"user_id": user["user_id"], "message": "How did I do this month?"}),
+    Route("expenses", "create", "POST", "/api/expenses/", writes=True,
+          body=lambda user: {"user_id": user["user_id"], "account_id": user["account_id"], "amount": 12.5,
+                             "place": "Benchmark", "expense_date": date.today().isoformat(), "tag_id": user["tag_id"]}),
+    Route("income", "create", "POST", "/api/income/", writes=True,
+          body=lambda user: {"user_id": user["user_id"], "account_id": user["account_id"], "amount": 100,
+                             "income_date": date.today().isoformat()}),
+    Route("accounts", "transfer", "POST", "/api/accounts/transfer", writes=True,
+          body=lambda user: {"user_id": user["user_id"], "from_account_id": user["account_id"],
+                             "to_account_id": user["other_account_id"], "amount": 0.01}),
+]
+
+class CountingBackend(StorageBackend):
+    """Storage backend wrapper counting the calls made through it"""
+
+    def __init__(self, backend: StorageBackend):
+        self.backend = backend
+        self.name = backend.name
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _count(self):
+        with self._lock:
+            self.calls += 1
+
+    def insert(self, *args, **kwargs):
+        self._count()
+        return self.backend.insert(*args, **kwargs)
+
+    def select(self, *args, **kwargs):
+        self._count()
+        return self.backend.select(*args, **kwargs)
+
+    def count(self, *args, **kwargs):
+        self._count()
+        return self.backend.count(*args, **kwargs)
+
+    def update(self, *args, **kwargs):
+        self._count()
+        return self.backend.update(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        self._count()
+        return self.backend.delete(*args, **kwargs)
+
+    def rpc(self, *args, **kwargs):
+        self._count()
+        return self.backend.rpc(*args, **kwargs)
+
+    def close(self):
+        self.backend.close()
+
+class StubCompletions:
+    """Stands in for AsyncGroq().chat.completions, answering after a fixed delay"""
+
+    ANSWER = "Your spending this month is in line with your budget. " * 8
+
+    def __init__(self, latency_seconds: float):
+        self.latency_seconds = latency_seconds
+
+    async def create(self, stream: bool = False, **kwargs):
+        await asyncio.sleep(self.latency_seconds)
+        if stream:
+            return StubStream(self.ANSWER.split(" "))
+        message = SimpleNamespace(content=self.ANSWER)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+class StubStream:
+    """Async iterator of completion chunks, one word each"""
+
+    def __init__(self, words: List[str]):
+        self._words = iter(words)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        word = next(self._words, None)
+        if word is None:
+            raise StopAsyncIteration
+        delta = SimpleNamespace(content=word + " ")
+        return SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+    async def close(self):
+        pass
+
+def load_app(database_path: str, llm_latency_seconds: float):
+    """Import the app on the SQLite backend, counting backend calls and stubbing the LLM"""
+    os.environ["SQLITE_DATABASE_PATH"] = database_path
+
+    import logging
+
+    import database
+    import main
+    from routes import assistant
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    counter = CountingBackend(database.database.get_backend())
+    database.database.backend = counter
+    for module in list(sys.modules.values()):
+        for value in list(vars(module).values()) if module else []:
+            if isinstance(value, database.SupabaseRepository):
+                value.backend = counter
+
+    assistant.GROQ_API_KEY = "benchmark"
+    assistant.groq_client = SimpleNamespace(chat=SimpleNamespace(completions=StubCompletions(llm_latency_seconds)))
+    return main.app, counter
+
+def insert_rows(backend: StorageBackend, table: str, rows: List[dict]) -> List[dict]:
+    inserted = []
+    for start in range(0, len(rows), SEED_BATCH_SIZE):
+        inserted.extend(backend.insert(table, rows[start:start + SEED_BATCH_SIZE]))
+    return inserted
+
+def seed_user(backend: StorageBackend, transactions: int, rng: random.Random) -> dict:
+    """Create a user with `transactions` expenses and income plus accounts, tags, debts and loans"""
+    user_id = str(uuid.uuid4())
+    today = date.today()
+
+    def day() -> str:
+        return (today - timedelta(days=rng.randrange(HISTORY_DAYS))).isoformat()
+
+    backend.insert("users", [{"id": user_id, "name": "Benchmark", "username": f"bench-{user_id[:8]}",
+                              "email": f"{user_id[:8]}@example.com"}])
+    accounts = insert_rows(backend, "accounts", [
+        {"user_id": user_id, "account_name": f"Account {index}", "balance": 1_000_000.0}
+        for index in range(ACCOUNTS_PER_USER)
+    ])
+    account_ids = [account["account_id"] for account in accounts]
+    expense_tags = insert_rows(backend, "tags", [
+        {"user_id": user_id, "name": name, "type": "Expense"} for name in EXPENSE_TAGS
+    ])
+    income_tags = insert_rows(backend, "tags", [
+        {"user_id": user_id, "name": name, "type": "Income"} for name in INCOME_TAGS
+    ])
+
+    expense_count = int(transactions * EXPENSE_SHARE)
+    insert_rows(backend, "expenses", [
+        {
+            "user_id": user_id,
+            "account_id": rng.choice(account_ids),
+            "amount": round(rng.uniform(1, 200), 2),
+            "place": f"Shop {rng.randrange(100)}",
+            "notes": "",
+            "expense_date": day(),
+            "tag_id": rng.choice(expense_tags)["tag_id"],
+        }
+        for _ in range(expense_count)
+    ])
+    insert_rows(backend, "income", [
+        {
+            "user_id": user_id,
+            "account_id": rng.choice(account_ids),
+            "amount": round(rng.uniform(100, 3000), 2),
+            "notes": "",
+            "income_date": day(),
+            "tag_id": rng.choice(income_tags)["tag_id"],
+        }
+        for _ in range(transactions - expense_count)
+    ])
+    insert_rows(backend, "budgets", [
+        {"user_id": user_id, "month": month, "year": year, "amount": 2500.0}
+        for year in (today.year - 1, today.year)
+        for month in range(1, 13)
+    ])
+
+    people = insert_rows(backend, "people", [
+        {"user_id": user_id, "name": f"Person {index}"} for index in range(PEOPLE_PER_USER)
+    ])
+    insert_rows(backend, "debts", [
+        {
+            "user_id": user_id,
+            "person_id": rng.choice(people)["person_id"],
+            "amount": round(rng.uniform(5, 500), 2),
+            "type": owed_type,
+            "notes": "",
+            "is_settled": rng.random() < 0.5,
+            "debt_date": day(),
+            "account_id": rng.choice(account_ids) if owed_type == "OwedToMe" else None,
+        }
+        for owed_type in (rng.choice(["OwedToMe", "IOwe"]) for _ in range(DEBTS_PER_USER))
+    ])
+
+    loans = insert_rows(backend, "loans", [
+        {"user_id": user_id, "loan_name": f"Loan {index}", "total_amount": 20000.0, "taken_amount": 0}
+        for index in range(LOANS_PER_USER)
+    ])
+    for loan in loans:
+        disbursements = insert_rows(backend, "loan_disbursements", [
+            {"user_id": user_id, "loan_id": loan["loan_id"], "amount": 500.0, "notes": "",
+             "disbursement_date": day()}
+            for _ in range(DISBURSEMENTS_PER_LOAN)
+        ])
+        backend.update("loans", {"taken_amount": sum(row["amount"] for row in disbursements)},
+                       {"loan_id": loan["loan_id"]})
+
+    return {
+        "user_id": user_id,
+        "account_id": account_ids[0],
+        "other_account_id": account_ids[1],
+        "tag_id": expense_tags[0]["tag_id"],
+        "loan_id": loans[0]["loan_id"],
+        "month": today.month,
+        "year": today.year,
+    }
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    return sorted_values[max(0, math.ceil(fraction * len(sorted_values)) - 1)]
+
+async def drive(client, counter: CountingBackend, route: Route, user: dict,
+                requests: int, concurrency: int, warmup: int) -> dict:
+    """Send `requests` requests to one route from `concurrency` workers"""
+    path = route.path.format(**user)
+
+    async def send() -> int:
+        body = route.body(user) if route.body else None
+        response = await client.request(route.method, path, json=body)
+        return response.status_code
+
+    for _ in range(warmup):
+        await send()
+
+    latencies: List[float] = []
+    failures: Dict[int, int] = {}
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            start = time.perf_counter()
+            status = await send()
+            latencies.append((time.perf_counter() - start) * 1000)
+            if not 200 <= status < 300:
+                failures[status] = failures.get(status, 0) + 1
+
+    counter.calls = 0
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "route": f"{route.router}.{route.name}",
+        "method": route.method,
+        "path": route.path,
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": sum(failures.values()),
+        "error_statuses": {str(status): count for status, count in sorted(failures.items())},
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "mean_ms": round(statistics.mean(latencies), 3),
+        "throughput_rps": round(requests / elapsed, 1),
+        "db_calls_per_request": round(counter.calls / requests, 2),
+    }
+
+async def run(args) -> dict:
+    import httpx
+
+    app, counter = load_app(args.database, args.llm_latency_ms / 1000)
+    selected = {name.strip() for name in args.routes.split(",")} if args.routes else None
+    routes = [
+        route for route in ROUTES
+        if selected is None or route.router in selected or f"{route.router}.{route.name}" in selected
+    ]
+    # Reads first, so write routes don't change what the reads measure
+    routes.sort(key=lambda route: route.writes)
+
+    rng = random.Random(args.seed)
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+        for scale in args.scales:
+            started = time.perf_counter()
+            user = seed_user(counter.backend, scale, rng)
+            print(f"seeded {scale} transactions in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+            for concurrency in args.concurrency:
+                for route in routes:
+                    result = await drive(client, counter, route, user, args.requests, concurrency, args.warmup)
+                    result["transactions_per_user"] = scale
+                    results.append(result)
+                    print_result(result)
+
+    return {
+        "metadata": {
+            "commit": git_commit(),
+            "date": date.today().isoformat(),
+            "python": platform.python_version(),
+            "storage_backend": counter.name,
+            "database": args.database,
+            "requests_per_route": args.requests,
+            "warmup_requests": args.warmup,
+            "llm_latency_ms": args.llm_latency_ms,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_result(result: Dict[str, Any]):
+    print(
+        f"{result['transactions_per_user']:>7} tx  c={result['concurrency']:<3} {result['route']:<34} "
+        f"p50 {result['p50_ms']:>8.2f} ms  p95 {result['p95_ms']:>8.2f} ms  p99 {result['p99_ms']:>8.2f} ms  "
+        f"{result['throughput_rps']:>8.1f} req/s  db calls/req {result['db_calls_per_request']:>6.2f}"
+        + (f"  ERRORS {result['error_statuses']}" if result["errors"] else "")
+    )
+
+def int_list(text: str) -> List[int]:
+    return [int(value) for value in text.split(",") if value.strip()]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int_list, default=[100, 10_000, 100_000],
+                        help="comma-separated transactions per user, one seeded user per scale")
+    parser.add_argument("--concurrency", type=int_list, default=[1, 16],
+                        help="comma-separated numbers of concurrent clients")
+    parser.add_argument("--requests", type=int, default=100, help="measured requests per route")
+    parser.add_argument("--warmup", type=int, default=3, help="unmeasured requests per route before measuring")
+    parser.add_argument("--routes", help="comma-separated routers or router.route names to run (default: all)")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="stub LLM response delay")
+    parser.add_argument("--database", default=":memory:", help="SQLite database path")
+    parser.add_argument("--seed", type=int, default=1, help="random seed for the generated data")
+    parser.add_argument("--output", help="optional path to write the results as JSON")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    failed = sum(result["errors"] for result in report["results"])
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+    if failed:
+        sys.exit(f"{failed} requests failed")
+
+if __name__ == "__main__":
+    main()
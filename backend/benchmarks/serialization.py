@@ -0,0 +1,126 @@
+"""
+Microbenchmark for list endpoint serialization.
+
+Times turning 1000 enriched expense rows (as PostgREST returns them) into a
+response body three ways:
+
+  standard  ExpenseWithAccountAndTag(**row) per row, then FastAPI's
+            response_model validation and a JSONResponse (the old path)
+  orjson    the same, rendered with ORJSONResponse
+  fast      serialization.serialize_rows: one TypeAdapter validation of the
+            whole list dumped straight to JSON (RowSerializer's fast path)
+
+Every variant's output is checked against the standard one.
+
+Usage (from the backend directory):
+    python -m benchmarks.serialization --rows 1000 --iterations 50
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.responses import JSONResponse, ORJSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_model_field  # noqa: E402
+
+from models import ExpenseWithAccountAndTag  # noqa: E402
+from serialization import serialize_rows  # noqa: E402
+
+def make_rows(count: int) -> List[dict]:
+    """Expense rows with account and tag names attached, shaped like a PostgREST response"""
+    user_id = str(uuid.uuid4())
+    accounts = [(str(uuid.uuid4()), f"Account {index}") for index in range(3)]
+    tags = [(str(uuid.uuid4()), f"Tag {index}") for index in range(20)]
+    rows = []
+    for index in range(count):
+        account_id, account_name = random.choice(accounts)
+        tag_id, tag_name = random.choice(tags)
+        rows.append({
+            "expense_id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "account_id": account_id,
+            "amount": round(random.uniform(1, 500), 2),
+            "place": f"Shop {index % 50}",
+            "payment_method": account_name,
+            "notes": "",
+            "expense_date": (date(2025, 1, 1) + timedelta(days=index % 365)).isoformat(),
+            "tag_id": tag_id,
+            "created_at": (datetime(2025, 1, 1) + timedelta(minutes=index)).isoformat() + "+00:00",
+            "account_name": account_name,
+            "tag_name": tag_name,
+        })
+    return rows
+
+# FastAPI builds the response field once per route
+RESPONSE_FIELD = create_model_field(name="Response", type_=List[ExpenseWithAccountAndTag], mode="serialization")
+
+async def standard_body(rows: List[dict], response_class=JSONResponse) -> bytes:
+    """Build models per row, then validate and serialize them the way FastAPI does for response_model"""
+    models = [ExpenseWithAccountAndTag(**row) for row in rows]
+    content = await serialize_response(field=RESPONSE_FIELD, response_content=models)
+    return response_class(content).body
+
+async def fast_body(rows: List[dict]) -> bytes:
+    return serialize_rows(ExpenseWithAccountAndTag, rows)
+
+async def measure(name: str, build, rows: List[dict], iterations: int) -> dict:
+    """Time `iterations` builds of a response body for rows"""
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await build(rows)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    per_thousand = 1000 / len(rows)
+    return {
+        "variant": name,
+        "rows": len(rows),
+        "iterations": iterations,
+        "mean_ms_per_1000_rows": round(statistics.mean(timings) * per_thousand, 3),
+        "p95_ms_per_1000_rows": round(timings[int(len(timings) * 0.95) - 1] * per_thousand, 3),
+    }
+
+async def run(row_count: int, iterations: int) -> List[dict]:
+    rows = make_rows(row_count)
+    variants = [
+        ("standard", standard_body),
+        ("orjson", lambda rows: standard_body(rows, ORJSONResponse)),
+        ("fast", fast_body),
+    ]
+
+    expected = json.loads(await standard_body(rows))
+    for name, build in variants:
+        assert json.loads(await build(rows)) == expected, f"{name} output differs from the standard path"
+
+    return [await measure(name, build, rows, iterations) for name, build in variants]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000, help="rows per response")
+    parser.add_argument("--iterations", type=int, default=50, help="responses built per variant")
+    parser.add_argument("--output", help="optional path to write the results as JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.rows, args.iterations))
+    baseline = results[0]["mean_ms_per_1000_rows"]
+    for result in results:
+        print(
+            f"{result['variant']:<10} mean {result['mean_ms_per_1000_rows']:>8.3f} ms/1000 rows  "
+            f"p95 {result['p95_ms_per_1000_rows']:>8.3f} ms/1000 rows  "
+            f"speedup {baseline / result['mean_ms_per_1000_rows']:>5.1f}x"
+        )
+    if args.output:
+        Path(args.output).write_text(json.dumps({"results": results}, indent=2))
+
+if __name__ == "__main__":
+    main()
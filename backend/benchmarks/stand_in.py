@@ -0,0 +1,190 @@
+"""
+In-memory stand-in for the Supabase client used by the benchmarks.
+
+Implements the subset of the PostgREST query builder that SupabaseRepository
+uses (select/insert/update/delete, eq/in_/gte/lte filters, order and range)
+and keeps a hash index on every user_id column, so equality lookups on
+user_id cost the same as an indexed query would. It also counts rows scanned
+and returned so benchmarks can report how much data each endpoint touches.
+"""
+import sys
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+# Primary key column for each table
+PRIMARY_KEYS = {
+    "users": "id",
+    "accounts": "account_id",
+    "expenses": "expense_id",
+    "budgets": "budget_id",
+    "loans": "loan_id",
+    "loan_disbursements": "disbursement_id",
+    "income": "income_id",
+    "debts": "debt_id",
+    "people": "person_id",
+    "tags": "tag_id",
+}
+
+# Columns with a hash index
+INDEXED_COLUMNS = ("user_id",)
+
+# PostgREST's default max-rows setting
+MAX_ROWS = 1000
+
+class StandInQuery:
+    """Chainable query mirroring postgrest's SyncRequestBuilder"""
+
+    def __init__(self, client: "StandInClient", table_name: str):
+        self.client = client
+        self.table_name = table_name
+        self.operation = "select"
+        self.payload: Any = None
+        self.equals: List[tuple] = []
+        self.predicates: List[Any] = []
+        self.orders: List[tuple] = []
+        self.row_range = None
+
+    def select(self, *columns, count=None, head=None):
+        self.operation = "select"
+        return self
+
+    def insert(self, data, **kwargs):
+        self.operation = "insert"
+        self.payload = data
+        return self
+
+    def update(self, data, **kwargs):
+        self.operation = "update"
+        self.payload = data
+        return self
+
+    def delete(self, **kwargs):
+        self.operation = "delete"
+        return self
+
+    def eq(self, column, value):
+        self.equals.append((column, value))
+        return self
+
+    def in_(self, column, values):
+        allowed = {str(value) for value in values}
+        self.predicates.append(lambda row: str(row.get(column)) in allowed)
+        return self
+
+    def gte(self, column, value):
+        self.predicates.append(lambda row: row.get(column) is not None and str(row[column]) >= str(value))
+        return self
+
+    def lte(self, column, value):
+        self.predicates.append(lambda row: row.get(column) is not None and str(row[column]) <= str(value))
+        return self
+
+    def order(self, column, desc=False, **kwargs):
+        self.orders.append((column, desc))
+        return self
+
+    def range(self, start, end):
+        self.row_range = (start, end)
+        return self
+
+    def _matches(self, row):
+        for column, value in self.equals:
+            if isinstance(value, bool):
+                if row.get(column) is not value:
+                    return False
+            elif str(row.get(column)) != str(value):
+                return False
+        return all(predicate(row) for predicate in self.predicates)
+
+    def _candidates(self):
+        """Use a hash index when the query has an equality on an indexed column"""
+        table = self.client.tables.setdefault(self.table_name, [])
+        for column, value in self.equals:
+            if column in INDEXED_COLUMNS:
+                return self.client.index_lookup(self.table_name, column, str(value))
+        return table
+
+    def execute(self):
+        self.client.round_trips += 1
+        if self.operation == "insert":
+            rows = self.payload if isinstance(self.payload, list) else [self.payload]
+            return SimpleNamespace(data=[self.client.insert_row(self.table_name, row) for row in rows], count=None)
+
+        candidates = self._candidates()
+        self.client.rows_scanned += len(candidates)
+        matched = [row for row in candidates if self._matches(row)]
+
+        if self.operation == "update":
+            for row in matched:
+                row.update(self.payload)
+            return SimpleNamespace(data=[dict(row) for row in matched], count=None)
+        if self.operation == "delete":
+            for row in matched:
+                self.client.remove_row(self.table_name, row)
+            return SimpleNamespace(data=[dict(row) for row in matched], count=None)
+
+        for column, descending in reversed(self.orders):
+            matched.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=descending)
+        start, end = self.row_range or (0, MAX_ROWS - 1)
+        end = min(end, start + MAX_ROWS - 1)
+        page = [dict(row) for row in matched[start:end + 1]]
+        self.client.rows_returned += len(page)
+        return SimpleNamespace(data=page, count=None)
+
+class StandInClient:
+    """Drop-in replacement for supabase.Client backed by Python lists"""
+
+    def __init__(self):
+        self.tables: Dict[str, List[Dict[str, Any]]] = {}
+        self.indexes: Dict[tuple, Dict[str, List[Dict[str, Any]]]] = {}
+        self.reset_counters()
+
+    def reset_counters(self):
+        self.round_trips = 0
+        self.rows_scanned = 0
+        self.rows_returned = 0
+
+    def table(self, table_name: str) -> StandInQuery:
+        return StandInQuery(self, table_name)
+
+    def rpc(self, function_name: str, params: Dict[str, Any]):
+        # Behave like a database where sql/functions.sql has not been run
+        error = Exception(f"Could not find the function public.{function_name}")
+        error.code = "PGRST202"
+        raise error
+
+    def index_lookup(self, table_name: str, column: str, value: str) -> List[Dict[str, Any]]:
+        return self.indexes.get((table_name, column), {}).get(value, [])
+
+    def insert_row(self, table_name: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        row = dict(data)
+        primary_key = PRIMARY_KEYS.get(table_name)
+        if primary_key and not row.get(primary_key):
+            row[primary_key] = str(uuid.uuid4())
+        row.setdefault("created_at", datetime.now().isoformat())
+        self.tables.setdefault(table_name, []).append(row)
+        for column in INDEXED_COLUMNS:
+            if column in row:
+                self.indexes.setdefault((table_name, column), {}).setdefault(str(row[column]), []).append(row)
+        return dict(row)
+
+    def remove_row(self, table_name: str, row: Dict[str, Any]):
+        self.tables[table_name].remove(row)
+        for column in INDEXED_COLUMNS:
+            if column in row:
+                self.indexes[(table_name, column)][str(row[column])].remove(row)
+
+def use_stand_in(client: StandInClient):
+    """Point the global database and every loaded repository at the stand-in"""
+    import database
+    from storage import PostgrestBackend
+
+    backend = PostgrestBackend(client)
+    database.database.client = client
+    database.database.backend = backend
+    for module in list(sys.modules.values()):
+        for value in list(vars(module).values()) if module else []:
+            if isinstance(value, database.SupabaseRepository):
+                value.backend = backend
@@ -0,0 +1,110 @@
+"""
+Regression benchmark for the user-scoped account and budget endpoints.
+
+Seeds thousands of users into the in-memory stand-in database and calls
+get_accounts, get_total_balance, get_budgets and get_budget_for_month for a
+sample of them. Every call is checked against the seeded data, so the run
+fails if an endpoint goes back to scanning (and truncating) the whole table.
+
+Usage (from the backend directory):
+    python -m benchmarks.user_scoped_queries --users 5000 --samples 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+os.environ.setdefault("SUPABASE_ANON_KEY", "benchmark")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.stand_in import StandInClient, use_stand_in  # noqa: E402
+from routes import accounts, budgets  # noqa: E402
+
+ACCOUNTS_PER_USER = 3
+BUDGET_YEAR = 2025
+
+def seed(client: StandInClient, user_count: int) -> dict:
+    """Create accounts and a year of budgets for each user, returning expected totals"""
+    expected = {}
+    for _ in range(user_count):
+        user_id = str(uuid.uuid4())
+        balances = [round(random.uniform(0, 5000), 2) for _ in range(ACCOUNTS_PER_USER)]
+        for index, balance in enumerate(balances):
+            client.insert_row("accounts", {"user_id": user_id, "account_name": f"Account {index}", "balance": balance})
+        for month in range(1, 13):
+            client.insert_row("budgets", {"user_id": user_id, "month": month, "year": BUDGET_YEAR, "amount": 1000.0})
+        expected[user_id] = round(sum(balances), 2)
+    return expected
+
+async def measure(client: StandInClient, name: str, calls) -> dict:
+    """Time a list of zero-argument coroutine factories"""
+    client.reset_counters()
+    latencies = []
+    for call in calls:
+        start = time.perf_counter()
+        await call()
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return {
+        "endpoint": name,
+        "calls": len(calls),
+        "mean_ms": round(statistics.mean(latencies), 3),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 3),
+        "round_trips_per_call": client.round_trips / len(calls),
+        "rows_scanned_per_call": client.rows_scanned / len(calls),
+        "rows_returned_per_call": client.rows_returned / len(calls),
+    }
+
+async def run(user_count: int, samples: int) -> list:
+    client = StandInClient()
+    use_stand_in(client)
+    expected = seed(client, user_count)
+    sample_users = random.sample(list(expected), min(samples, len(expected)))
+
+    async def check_accounts(user_id):
+        result = await accounts.get_accounts(user_id, db=None)
+        assert len(result) == ACCOUNTS_PER_USER, f"expected {ACCOUNTS_PER_USER} accounts, got {len(result)}"
+
+    async def check_total(user_id):
+        result = await accounts.get_total_balance(user_id, db=None)
+        assert abs(result["total_balance"] - expected[user_id]) < 0.01, "total balance mismatch"
+
+    async def check_budgets(user_id):
+        result = await budgets.get_budgets(user_id, year=BUDGET_YEAR, db=None)
+        assert len(result) == 12, f"expected 12 budgets, got {len(result)}"
+
+    async def check_month(user_id):
+        result = await budgets.get_budget_for_month(user_id, month=6, year=BUDGET_YEAR, db=None)
+        assert result.month == 6
+
+    return [
+        await measure(client, "GET /api/accounts", [lambda u=u: check_accounts(u) for u in sample_users]),
+        await measure(client, "GET /api/accounts/user/{id}/total-balance", [lambda u=u: check_total(u) for u in sample_users]),
+        await measure(client, "GET /api/budgets", [lambda u=u: check_budgets(u) for u in sample_users]),
+        await measure(client, "GET /api/budgets/user/{id}/month", [lambda u=u: check_month(u) for u in sample_users]),
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=5000, help="number of users to seed")
+    parser.add_argument("--samples", type=int, default=200, help="number of users to query per endpoint")
+    parser.add_argument("--output", help="optional path to write the results as JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.users, args.samples))
+    for result in results:
+        print(
+            f"{result['endpoint']:<45} mean {result['mean_ms']:>8.3f} ms  p95 {result['p95_ms']:>8.3f} ms  "
+            f"rows scanned/call {result['rows_scanned_per_call']:>8.1f}  rows returned/call {result['rows_returned_per_call']:>6.1f}"
+        )
+    if args.output:
+        Path(args.output).write_text(json.dumps({"users": args.users, "results": results}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Streaming bulk import of expenses and income from CSV or NDJSON uploads.
+
+Rows are parsed one at a time from the spooled upload, validated with the
+same models as the single-row endpoints and inserted in batches of
+INSERT_BATCH_SIZE. Account balances and monthly rollups are updated once
+per account / month at the end rather than once per row. The row limit and
+encoding are checked in a first pass over the file, so an upload rejected
+for either writes nothing.
+"""
+import asyncio
+import csv
+import io
+import json
+import logging
+import os
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Type
+
+from fastapi import UploadFile
+from pydantic import BaseModel, ValidationError
+
+from database import (
+    INSERT_BATCH_SIZE, SupabaseRepository, get_reference_rows,
+    apply_balance_deltas, apply_rollup_deltas, merge_rollup_deltas, rollup_deltas
+)
+
+logger = logging.getLogger(__name__)
+
+# Largest number of rows accepted in one upload
+IMPORT_MAX_ROWS = int(os.getenv("IMPORT_MAX_ROWS", "50000"))
+
+# Rejected rows listed individually in the response
+MAX_REPORTED_ERRORS = 100
+
+SUPPORTED_FORMATS = ("csv", "ndjson")
+
+def detect_format(upload: UploadFile, requested: Optional[str] = None) -> str:
+    """Pick the upload format from an explicit value, the file extension or the content type"""
+    if requested:
+        if requested.lower() not in SUPPORTED_FORMATS:
+            raise ValueError(f"Unsupported format '{requested}', expected one of: {', '.join(SUPPORTED_FORMATS)}")
+        return requested.lower()
+
+    filename = (upload.filename or "").lower()
+    content_type = (upload.content_type or "").lower()
+    if filename.endswith((".ndjson", ".jsonl")) or "ndjson" in content_type or "jsonlines" in content_type:
+        return "ndjson"
+    if filename.endswith(".csv") or "csv" in content_type:
+        return "csv"
+    raise ValueError("Could not tell the file format; pass format=csv or format=ndjson")
+
+def iter_records(upload: UploadFile, file_format: str) -> Iterator[Tuple[int, Any]]:
+    """Yield (line number, record) pairs, reading the upload a line at a time"""
+    # utf-8-sig drops the byte order mark spreadsheet exports often start with
+    text = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+    try:
+        if file_format == "csv":
+            reader = csv.DictReader(text)
+            for record in reader:
+                yield reader.line_num, record
+        else:
+            for line_number, line in enumerate(text, start=1):
+                if line.strip():
+                    yield line_number, line
+    finally:
+        # Hand the file back to the UploadFile, which closes it
+        text.detach()
+
+def check_upload(upload: UploadFile, file_format: str):
+    """Reject an upload with too many rows or invalid UTF-8, then rewind it for the import"""
+    rows = 0
+    try:
+        for _ in iter_records(upload, file_format):
+            rows += 1
+            if rows > IMPORT_MAX_ROWS:
+                raise ValueError(f"Uploads are limited to {IMPORT_MAX_ROWS} rows")
+    except UnicodeDecodeError:
+        raise ValueError("File is not valid UTF-8")
+    upload.file.seek(0)
+
+def parse_record(record: Any, file_format: str) -> Dict[str, Any]:
+    """Turn a raw CSV row or NDJSON line into model fields"""
+    if file_format == "ndjson":
+        data = json.loads(record)
+        if not isinstance(data, dict):
+            raise ValueError("each line must be a JSON object")
+        return data
+
+    # Empty CSV cells mean "not provided" rather than an empty string
+    return {
+        key.strip(): value.strip() if value.strip() else None
+        for key, value in record.items()
+        if key and isinstance(value, str)
+    }
+
+def describe_error(error: Exception) -> str:
+    """One-line description of why a row was rejected"""
+    if isinstance(error, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}"
+            for detail in error.errors()
+        )
+    return str(error)
+
+async def import_transactions(
+    upload: UploadFile,
+    user_id: str,
+    model: Type[BaseModel],
+    build_row: Callable[[Any], Dict[str, Any]],
+    repo: SupabaseRepository,
+    kind: str,
+    balance_sign: int,
+    file_format: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Import every valid row of an upload for one user
+
+    kind is the rollup kind ("expense" or "income") and balance_sign is -1
+    for rows that take money out of their account, +1 for rows that add it.
+    Invalid rows are skipped and reported; the rest are imported. Raises
+    ValueError, before inserting anything, for an unreadable or oversized
+    upload. If an insert fails part way, the rows already inserted stay and
+    the result's `error` says where the import stopped.
+    """
+    file_format = detect_format(upload, file_format)
+    check_upload(upload, file_format)
+
+    # Rows may only reference the importing user's own accounts and tags
+    accounts, tags = await asyncio.gather(
+        get_reference_rows("accounts", user_id),
+        get_reference_rows("tags", user_id),
+    )
+    account_ids = {str(account["account_id"]) for account in accounts}
+    tag_ids = {str(tag["tag_id"]) for tag in tags}
+
+    batch: List[Dict[str, Any]] = []
+    balance_deltas: Dict[str, float] = {}
+    rollup_changes = []
+    imported = 0
+    errors: List[Dict[str, Any]] = []
+    rejected = 0
+    error: Optional[str] = None
+
+    async def flush():
+        nonlocal imported
+        created = await repo.create_many(batch)
+        imported += len(created)
+        for row in created:
+            if row.get("account_id"):
+                balance_deltas[row["account_id"]] = balance_deltas.get(row["account_id"], 0) + balance_sign * float(row["amount"])
+            rollup_changes.append(rollup_deltas(kind, new_row=row))
+        batch.clear()
+
+    try:
+        for line_number, record in iter_records(upload, file_format):
+            try:
+                fields = parse_record(record, file_format)
+                fields["user_id"] = user_id
+                item = model(**fields)
+                row = build_row(item)
+                if row.get("account_id") and row["account_id"] not in account_ids:
+                    raise ValueError(f"account {row['account_id']} not found")
+                if row.get("tag_id") and row["tag_id"] not in tag_ids:
+                    raise ValueError(f"tag {row['tag_id']} not found")
+            except (ValidationError, ValueError) as e:
+                rejected += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append({"line": line_number, "error": describe_error(e)})
+                continue
+
+            batch.append(row)
+            if len(batch) >= INSERT_BATCH_SIZE:
+                await flush()
+
+        if batch:
+            await flush()
+    except Exception as e:
+        # Batches already inserted stay, so report them rather than failing the request
+        logger.error(f"Import into {repo.table_name} for user {user_id} stopped after {imported} rows: {str(e)}")
+        error = f"Import stopped after {imported} rows: {str(e)}"
+    finally:
+        # Whatever was inserted must be reflected in balances and rollups,
+        # even if a later batch failed
+        await apply_balance_deltas(balance_deltas)
+        await apply_rollup_deltas(merge_rollup_deltas(*rollup_changes))
+
+    logger.info(f"Imported {imported} {repo.table_name} rows for user {user_id} ({rejected} rejected)")
+    return {
+        "imported": imported,
+        "rejected": rejected,
+        "errors": errors,
+        "error": error,
+    }
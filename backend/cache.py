@@ -0,0 +1,86 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+class TTLCache:
+    """Bounded in-process cache with per-entry TTL and LRU eviction
+
+    Each key also carries a version that is bumped on invalidation. Callers
+    that build a value slowly read the version first and pass it to set(), so
+    a value computed before a concurrent write is never stored afterwards.
+    Meant to be used from the event loop thread, so it takes no locks.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 300):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._versions: Dict[Hashable, int] = {}
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Get a live value, refreshing its LRU position, or None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, expires_at = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def version(self, key: Hashable) -> tuple:
+        """Current version of a key; changes whenever the key is invalidated"""
+        return (self._epoch, self._versions.get(key, 0))
+
+    def set(self, key: Hashable, value: Any, version: Optional[tuple] = None):
+        """Store a value unless the key was invalidated since `version` was read"""
+        if version is not None and version != self.version(key):
+            return
+
+        self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable):
+        """Drop a key and bump its version"""
+        self._entries.pop(key, None)
+        self._versions[key] = self._versions.get(key, 0) + 1
+        if len(self._versions) > self.max_entries * 4:
+            # Forget per-key versions; starting a new epoch still rejects
+            # every value that was being built before this point
+            self._versions.clear()
+            self._epoch += 1
+
+    def clear(self):
+        """Drop every entry and reject every value still being built
+
+        Builds in progress may be for keys that have no entry yet, so bumping
+        per-key versions is not enough; a new epoch invalidates them all.
+        """
+        self._entries.clear()
+        self._versions.clear()
+        self._epoch += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -1,12 +1,27 @@
 import os
-from typing import AsyncGenerator, Optional, Dict, List, Any
+from typing import AsyncGenerator, Callable, Optional, Dict, List, Any, Tuple
 from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-from supabase import create_client, Client
+from supabase import create_client, Client, ClientOptions
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import ContextVar
 import asyncio
+import base64
+import json
+import threading
+import time
+import httpx
+from datetime import date, timedelta
+from decimal import Decimal
 from functools import wraps
 import logging
 
+from cache import TTLCache
+from metrics import Counter, Gauge, Histogram
+from sqlite_storage import SQLiteBackend
+from storage import PostgrestBackend, RpcNotAvailable, StorageBackend
+from tag_index import TagIndex
+
 # Load environment variables from .env file (only in development)
 if os.getenv("RENDER") is None:
     load_dotenv()
@@ -15,136 +30,642 @@ if os.getenv("RENDER") is None:
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Where rows are stored: "postgrest" (Supabase) or "sqlite" (a local database
+# at SQLITE_DATABASE_PATH, in memory by default) for running without a network
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "postgrest").lower()
+SQLITE_DATABASE_PATH = os.getenv("SQLITE_DATABASE_PATH", ":memory:")
+
+if STORAGE_BACKEND not in ("postgrest", "sqlite"):
+    raise ValueError(f"Unknown STORAGE_BACKEND {STORAGE_BACKEND!r}, expected 'postgrest' or 'sqlite'")
+
 # Supabase connection details
 SUPABASE_URL = os.getenv("SUPABASE_URL", "https://mzclzcgzfpbghlbuiolk.supabase.co")
 SUPABASE_ANON_KEY = os.getenv("SUPABASE_ANON_KEY", "")
 
-if not SUPABASE_ANON_KEY:
-    logger.error("SUPABASE_ANON_KEY environment variable is required")
-    raise ValueError("SUPABASE_ANON_KEY environment variable is required")
+if STORAGE_BACKEND == "postgrest":
+    if not SUPABASE_ANON_KEY:
+        logger.error("SUPABASE_ANON_KEY environment variable is required")
+        raise ValueError("SUPABASE_ANON_KEY environment variable is required")
+    logger.info(f"Connecting to Supabase at: {SUPABASE_URL}")
+else:
+    logger.info(f"Using the SQLite storage backend at: {SQLITE_DATABASE_PATH}")
+
+# Maximum number of IDs sent in a single `in` filter
+ID_BATCH_SIZE = 200
+
+# Rows sent in a single batch insert
+INSERT_BATCH_SIZE = 500
+
+# Rows requested per server-side page (matches PostgREST's default max-rows)
+PAGE_SIZE = 1000
+
+# Dedicated thread pool for the synchronous Supabase client
+DB_EXECUTOR_MAX_WORKERS = int(os.getenv("DB_EXECUTOR_MAX_WORKERS", "16"))
+
+# Queue depth above which the executor logs that it is saturated
+DB_EXECUTOR_QUEUE_WARNING = int(os.getenv("DB_EXECUTOR_QUEUE_WARNING", str(DB_EXECUTOR_MAX_WORKERS * 2)))
+DB_EXECUTOR_LOG_INTERVAL_SECONDS = float(os.getenv("DB_EXECUTOR_LOG_INTERVAL_SECONDS", "10"))
+
+# Keep-alive HTTP connection pool shared by all Supabase requests
+DB_HTTP_MAX_CONNECTIONS = int(os.getenv("DB_HTTP_MAX_CONNECTIONS", str(DB_EXECUTOR_MAX_WORKERS)))
+DB_HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("DB_HTTP_MAX_KEEPALIVE_CONNECTIONS", str(DB_HTTP_MAX_CONNECTIONS)))
+DB_HTTP_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("DB_HTTP_KEEPALIVE_EXPIRY_SECONDS", "30"))
+DB_HTTP_TIMEOUT_SECONDS = float(os.getenv("DB_HTTP_TIMEOUT_SECONDS", "120"))
+DB_HTTP_CONNECT_TIMEOUT_SECONDS = float(os.getenv("DB_HTTP_CONNECT_TIMEOUT_SECONDS", "10"))
+# One multiplexed HTTP/2 connection serializes I/O across worker threads, so
+# a pool of HTTP/1.1 keep-alive connections is the default
+DB_HTTP2 = os.getenv("DB_HTTP2", "false").lower() == "true"
+
+# Serve month and category totals from the monthly_rollups table (sql/rollups.sql).
+# Only turn this on after backfilling with `python -m rollups rebuild`.
+MONTHLY_ROLLUPS_ENABLED = os.getenv("MONTHLY_ROLLUPS_ENABLED", "false").lower() == "true"
+
+# Per-user cache of accounts, people and tags (see get_reference_rows). Writes
+# invalidate it in this process; the TTL bounds staleness across workers.
+REFERENCE_CACHE_MAX_ENTRIES = int(os.getenv("REFERENCE_CACHE_MAX_ENTRIES", "3000"))
+REFERENCE_CACHE_TTL_SECONDS = float(os.getenv("REFERENCE_CACHE_TTL_SECONDS", "60"))
+
+# Functions PostgREST reported as missing, so we don't retry them on every request
+_missing_rpcs: set = set()
+
+# Callbacks run after every write with (table_name, affected rows)
+_write_listeners: List[Callable[[str, List[Dict[str, Any]]], None]] = []
+
+def add_write_listener(callback: Callable[[str, List[Dict[str, Any]]], None]):
+    """Register a callback to run after rows are written through a repository"""
+    _write_listeners.append(callback)
+
+def notify_write(table_name: str, rows: List[Dict[str, Any]]):
+    """Tell write listeners (e.g. caches) that rows in a table changed"""
+    loader = _request_loader.get()
+    if loader:
+        loader.forget(table_name)
+    for callback in _write_listeners:
+        try:
+            callback(table_name, rows)
+        except Exception as e:
+            logger.error(f"Write listener failed for {table_name}: {str(e)}")
+
+def encode_cursor(values: List[Any]) -> str:
+    """Opaque pagination cursor for the sort key of the last row on a page
+    
+    NULLs stay null (not "None") so the next page can match them with is null.
+    """
+    payload = json.dumps([None if value is None else str(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> List[Optional[str]]:
+    """Sort key encoded by encode_cursor; raises ValueError for a malformed cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or not all(value is None or isinstance(value, str) for value in values):
+        raise ValueError("Invalid cursor")
+    return values
+
+class RequestLoader:
+    """Request-scoped identity map and batcher for get_by_id lookups
+    
+    Lookups on the same table and ID column issued in the same event loop
+    tick (e.g. under asyncio.gather) are merged into one get_by_ids query,
+    and rows already loaded during the request are served from memory.
+    Writes to a table, and any RPC call, drop what was loaded.
+    """
+    
+    def __init__(self):
+        self._rows: Dict[Tuple[str, str], Dict[str, Optional[Dict[str, Any]]]] = {}
+        self._pending: Dict[Tuple[str, str], Dict[str, asyncio.Future]] = {}
+        # Bumped on every write so rows fetched before it aren't remembered
+        self._generation = 0
+        self._dispatches: set = set()
+        self.lookups = 0
+        self.queries = 0
+    
+    async def load(self, repo: "SupabaseRepository", record_id: str, id_column: str) -> Optional[Dict[str, Any]]:
+        """Get one row by ID, sharing the query with other lookups in this tick"""
+        self.lookups += 1
+        key = (repo.table_name, id_column)
+        record_id = str(record_id)
+        
+        loaded = self._rows.get(key, {})
+        if record_id in loaded:
+            row = loaded[record_id]
+            return dict(row) if row else None
+        
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = {}
+            # Runs after every lookup already scheduled in this tick has queued its ID
+            task = asyncio.create_task(self._dispatch(repo, key))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+        
+        future = pending.get(record_id)
+        if future is None:
+            future = pending[record_id] = asyncio.get_running_loop().create_future()
+        
+        # Shielded so one cancelled caller doesn't fail the others sharing the query
+        row = await asyncio.shield(future)
+        return dict(row) if row else None
+    
+    async def _dispatch(self, repo: "SupabaseRepository", key: Tuple[str, str]):
+        pending = self._pending.pop(key)
+        id_column = key[1]
+        generation = self._generation
+        self.queries += 1
+        
+        try:
+            rows = await repo.get_by_ids(list(pending), id_column)
+        except Exception as e:
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        found: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            found.setdefault(str(row[id_column]), row)
+        
+        # Only remember the rows if nothing was written while they were in flight
+        if self._generation == generation:
+            loaded = self._rows.setdefault(key, {})
+            for record_id in pending:
+                loaded[record_id] = found.get(record_id)
+        
+        for record_id, future in pending.items():
+            if not future.done():
+                future.set_result(found.get(record_id))
+    
+    def forget(self, table_name: Optional[str] = None):
+        """Drop loaded rows for one table, or for every table when table_name is None"""
+        self._generation += 1
+        for key in list(self._rows):
+            if table_name is None or key[0] == table_name:
+                del self._rows[key]
+
+# Loader for the request being handled, set by RequestLoaderMiddleware
+_request_loader: ContextVar[Optional[RequestLoader]] = ContextVar("request_loader", default=None)
+
+def get_request_loader() -> Optional[RequestLoader]:
+    """FastAPI dependency returning the current request's loader (None outside a request)"""
+    return _request_loader.get()
 
-logger.info(f"Connecting to Supabase at: {SUPABASE_URL}")
+class RequestLoaderMiddleware:
+    """ASGI middleware giving every HTTP request its own RequestLoader"""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        loader = RequestLoader()
+        token = _request_loader.set(loader)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_loader.reset(token)
+            if loader.lookups:
+                logger.debug(
+                    f"{scope['method']} {scope['path']}: {loader.lookups} row lookups "
+                    f"served by {loader.queries} queries"
+                )
+
+class DatabaseExecutor:
+    """Dedicated, bounded thread pool for blocking Supabase calls
+    
+    The supabase client is synchronous, so every query occupies a thread for
+    its whole round trip. Running them on their own pool keeps them from
+    starving other users of the default executor, and the counters here show
+    when requests are queueing behind a saturated pool.
+    """
+    
+    def __init__(self, max_workers: int, queue_warning_depth: int):
+        self.max_workers = max_workers
+        self.queue_warning_depth = queue_warning_depth
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="supabase")
+        self._lock = threading.Lock()
+        self._last_saturation_log = 0.0
+        self.queued = 0
+        self.running = 0
+        self.max_queue_depth = 0
+        self.completed = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+    
+    async def run(self, func: Callable, *args) -> Any:
+        """Run a blocking function on the pool and await its result"""
+        submitted_at = time.monotonic()
+        with self._lock:
+            self.queued += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queued)
+            queue_depth = self.queued
+        if queue_depth > self.queue_warning_depth:
+            self._log_saturation(queue_depth)
+        
+        def call():
+            wait_seconds = time.monotonic() - submitted_at
+            with self._lock:
+                self.queued -= 1
+                self.running += 1
+                self.total_wait_seconds += wait_seconds
+                self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+            DB_EXECUTOR_WAIT.observe(wait_seconds)
+            try:
+                return func(*args)
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self.completed += 1
+        
+        future = self._executor.submit(call)
+        future.add_done_callback(self._forget_cancelled)
+        return await asyncio.wrap_future(future)
+    
+    def _forget_cancelled(self, future: Future):
+        """Stop counting a call whose caller was cancelled before it left the queue
+        
+        Cancelling the awaiting task (a timeout, a client disconnect) cancels
+        the pool's future too, and `call` then never runs to decrement queued.
+        """
+        if future.cancelled():
+            with self._lock:
+                self.queued -= 1
+    
+    def _log_saturation(self, queue_depth: int):
+        """Warn about a backed-up pool, at most once every few seconds"""
+        now = time.monotonic()
+        if now - self._last_saturation_log < DB_EXECUTOR_LOG_INTERVAL_SECONDS:
+            return
+        self._last_saturation_log = now
+        logger.warning(
+            f"Database executor saturated: {queue_depth} calls queued, "
+            f"{self.running}/{self.max_workers} workers busy"
+        )
+    
+    def stats(self) -> Dict[str, Any]:
+        """Pool size, queue depth and wait-time counters"""
+        with self._lock:
+            started = self.completed + self.running
+            return {
+                "max_workers": self.max_workers,
+                "running": self.running,
+                "queued": self.queued,
+                "max_queue_depth": self.max_queue_depth,
+                "completed": self.completed,
+                "avg_wait_ms": round(self.total_wait_seconds / started * 1000, 3) if started else 0.0,
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+            }
+    
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+DB_EXECUTOR_WAIT = Histogram(
+    "db_executor_queue_wait_seconds", "Time a database call waited for a free executor thread",
+)
+DB_OPERATION_DURATION = Histogram(
+    "db_operation_duration_seconds", "Duration of repository operations, including executor queueing",
+    ["table", "operation"],
+)
+DB_OPERATION_ERRORS = Counter(
+    "db_operation_errors_total", "Repository operations that raised an error",
+    ["table", "operation"],
+)
+
+db_executor = DatabaseExecutor(DB_EXECUTOR_MAX_WORKERS, DB_EXECUTOR_QUEUE_WARNING)
+
+Gauge("db_executor_queued", "Database calls waiting for an executor thread", function=lambda: db_executor.queued)
+Gauge("db_executor_running", "Database calls currently running on the executor", function=lambda: db_executor.running)
+
+async def run_in_db_executor(func: Callable, *args) -> Any:
+    """Run a blocking Supabase call on the dedicated database executor"""
+    return await db_executor.run(func, *args)
+
+def create_http_client() -> httpx.Client:
+    """Keep-alive connection pool shared by every Supabase request
+    
+    Sized to the executor so each worker thread can hold its own connection
+    instead of queueing for one.
+    """
+    return httpx.Client(
+        limits=httpx.Limits(
+            max_connections=DB_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=DB_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=DB_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        timeout=httpx.Timeout(DB_HTTP_TIMEOUT_SECONDS, connect=DB_HTTP_CONNECT_TIMEOUT_SECONDS),
+        http2=DB_HTTP2,
+        follow_redirects=True,
+    )
 
 class Database:
     def __init__(self):
         self.client: Optional[Client] = None
+        self.http_client: Optional[httpx.Client] = None
+        self.backend: Optional[StorageBackend] = None
     
     def connect(self):
-        """Create Supabase client connection"""
-        if not self.client:
-            self.client = create_client(SUPABASE_URL, SUPABASE_ANON_KEY)
-        return self.client
+        """Create the storage backend (and the Supabase client it uses)"""
+        return self.get_backend()
     
     def get_client(self) -> Client:
         """Get the Supabase client, creating it if necessary"""
         if not self.client:
-            self.client = create_client(SUPABASE_URL, SUPABASE_ANON_KEY)
+            self.http_client = create_http_client()
+            self.client = create_client(
+                SUPABASE_URL,
+                SUPABASE_ANON_KEY,
+                options=ClientOptions(httpx_client=self.http_client),
+            )
         return self.client
+    
+    def get_backend(self) -> StorageBackend:
+        """Get the storage backend selected by STORAGE_BACKEND, creating it if necessary"""
+        if not self.backend:
+            if STORAGE_BACKEND == "sqlite":
+                self.backend = SQLiteBackend(SQLITE_DATABASE_PATH)
+            else:
+                self.backend = PostgrestBackend(self.get_client())
+        return self.backend
+    
+    def close(self):
+        """Close pooled connections and stop the executor"""
+        if self.backend is not None:
+            self.backend.close()
+        if self.http_client is not None:
+            self.http_client.close()
+        db_executor.shutdown()
 
 # Global database instance
 database = Database()
 
-def get_db() -> Client:
-    """Dependency to get Supabase client"""
-    return database.get_client()
+def get_db() -> Optional[Client]:
+    """Dependency to get Supabase client (None with the SQLite storage backend)"""
+    return database.get_client() if STORAGE_BACKEND == "postgrest" else None
 
 # Utility functions to make async operations easier with Supabase
 def async_supabase_operation(func):
     """Decorator to handle async operations with Supabase"""
     @wraps(func)
     async def wrapper(*args, **kwargs):
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, func, *args, **kwargs)
+        return await run_in_db_executor(lambda: func(*args, **kwargs))
     return wrapper
 
+def timed_operation(operation: str):
+    """Record a repository method's duration and errors under its table and `operation`"""
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await func(self, *args, **kwargs)
+            except RpcNotAvailable:
+                # Expected when a function isn't deployed; callers fall back
+                raise
+            except Exception:
+                DB_OPERATION_ERRORS.inc(table=self.table_name, operation=operation)
+                raise
+            finally:
+                DB_OPERATION_DURATION.observe(
+                    time.perf_counter() - started, table=self.table_name, operation=operation
+                )
+        return wrapper
+    return decorator
+
 class SupabaseRepository:
-    """Base repository class for Supabase operations"""
+    """Base repository class for Supabase operations
+    
+    Queries go through the storage backend selected by STORAGE_BACKEND
+    (see storage.py), so the same repository runs against Supabase or a
+    local SQLite database.
+    """
     
     def __init__(self, table_name: str):
         self.table_name = table_name
-        self.client = get_db()
+        self.backend = database.get_backend()
     
+    @timed_operation("create")
     async def create(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new record"""
-        loop = asyncio.get_event_loop()
         try:
-            result = await loop.run_in_executor(
-                None, 
-                lambda: self.client.table(self.table_name).insert(data).execute()
-            )
-            if result.data:
-                return result.data[0]
+            rows = await run_in_db_executor(lambda: self.backend.insert(self.table_name, [data]))
+            if rows:
+                notify_write(self.table_name, rows)
+                return rows[0]
             else:
-                print(f"Supabase insert failed for {self.table_name}: {result}")
-                raise Exception(f"Failed to create record in {self.table_name}: No data returned")
+                raise Exception("No data returned")
         except Exception as e:
-            print(f"Exception in create for {self.table_name}: {str(e)}")
-            print(f"Data being inserted: {data}")
+            logger.error(f"Insert into {self.table_name} failed: {str(e)}")
+            logger.debug(f"Rejected {self.table_name} row: {data}")
             raise Exception(f"Failed to create record in {self.table_name}: {str(e)}")
     
+    @timed_operation("create_many")
+    async def create_many(self, rows: List[Dict[str, Any]], batch_size: int = INSERT_BATCH_SIZE) -> List[Dict[str, Any]]:
+        """Create several records with one batch insert per chunk of rows"""
+        if not rows:
+            return []
+        
+        def execute_inserts():
+            created = []
+            for start in range(0, len(rows), batch_size):
+                created.extend(self.backend.insert(self.table_name, rows[start:start + batch_size]))
+            return created
+        
+        try:
+            created = await run_in_db_executor(execute_inserts)
+        except Exception as e:
+            logger.error(f"Batch insert of {len(rows)} rows into {self.table_name} failed: {str(e)}")
+            raise Exception(f"Failed to create records in {self.table_name}: {str(e)}")
+        notify_write(self.table_name, created)
+        return created
+    
+    @timed_operation("get_by_id")
     async def get_by_id(self, record_id: str, id_column: str = "id") -> Optional[Dict[str, Any]]:
-        """Get a record by ID"""
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(
-            None,
-            lambda: self.client.table(self.table_name).select("*").eq(id_column, record_id).execute()
-        )
-        if result.data:
-            return result.data[0]
+        """Get a record by ID
+        
+        Inside a request this goes through the request's RequestLoader, so
+        repeated and concurrent lookups share queries.
+        """
+        loader = _request_loader.get()
+        if loader:
+            return await loader.load(self, record_id, id_column)
+        
+        rows = await run_in_db_executor(lambda: self.backend.select(self.table_name, filters={id_column: record_id}))
+        if rows:
+            return rows[0]
         return None
     
-    async def get_all(self, filters: Optional[Dict[str, Any]] = None, 
-                     limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
-        """Get all records with optional filters"""
-        loop = asyncio.get_event_loop()
+    @timed_operation("get_by_ids")
+    async def get_by_ids(self, record_ids: List[str], id_column: str = "id",
+                         columns: str = "*") -> List[Dict[str, Any]]:
+        """Get several records by ID with one `in` query per chunk of IDs"""
+        unique_ids = list(dict.fromkeys(str(record_id) for record_id in record_ids if record_id))
+        if not unique_ids:
+            return []
         
         def execute_query():
-            query = self.client.table(self.table_name).select("*")
-            
-            if filters:
-                for key, value in filters.items():
-                    if value is not None:
-                        query = query.eq(key, value)
-            
-            query = query.range(offset, offset + limit - 1)
-            return query.execute()
-        
-        result = await loop.run_in_executor(None, execute_query)
-        return result.data or []
-    
-    async def get_filtered(self, filters: Dict[str, Any], limit: int = 100) -> List[Dict[str, Any]]:
+            rows = []
+            # Keep the request URL to a sane length for very large pages
+            for start in range(0, len(unique_ids), ID_BATCH_SIZE):
+                chunk = unique_ids[start:start + ID_BATCH_SIZE]
+                rows.extend(self.backend.select(self.table_name, columns, in_filters={id_column: chunk}))
+            return rows
+        
+        return await run_in_db_executor(execute_query)
+    
+    @timed_operation("get_all")
+    async def get_all(self, filters: Optional[Dict[str, Any]] = None, 
+                     limit: int = 100, offset: int = 0,
+                     gte: Optional[Dict[str, Any]] = None,
+                     lte: Optional[Dict[str, Any]] = None,
+                     in_filters: Optional[Dict[str, List[Any]]] = None,
+                     order_by: Optional[List[Tuple[str, bool]]] = None,
+                     columns: str = "*",
+                     after: Optional[List[Any]] = None) -> List[Dict[str, Any]]:
+        """Get all records with optional filters
+        
+        gte/lte map columns to inclusive bounds, in_filters maps columns to
+        allowed values and order_by is a list of (column, descending) pairs.
+        Pagination is applied server-side with range(), or with a keyset when
+        `after` holds the order_by values of the row to continue after.
+        """
+        # An empty IN set can never match, so skip the round trip
+        if in_filters and any(values is not None and len(values) == 0 for values in in_filters.values()):
+            return []
+        
+        return await run_in_db_executor(lambda: self.backend.select(
+            self.table_name, columns, filters=filters, gte=gte, lte=lte, in_filters=in_filters,
+            order_by=order_by, after=after, offset=offset, limit=limit,
+        ))
+    
+    async def get_page(self, filters: Optional[Dict[str, Any]] = None, limit: int = 100,
+                       cursor: Optional[str] = None, order_by: Optional[List[Tuple[str, bool]]] = None,
+                       **kwargs) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Get one keyset page and the cursor for the next one (None on the last page)
+        
+        order_by must end with a unique column so the sort key identifies a row.
+        """
+        after = decode_cursor(cursor) if cursor else None
+        rows = await self.get_all(filters=filters, limit=limit + 1, order_by=order_by, after=after, **kwargs)
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, encode_cursor([rows[-1][column] for column, _ in order_by])
+    
+    @timed_operation("count")
+    async def count(self, filters: Optional[Dict[str, Any]] = None,
+                    gte: Optional[Dict[str, Any]] = None, lte: Optional[Dict[str, Any]] = None,
+                    in_filters: Optional[Dict[str, List[Any]]] = None) -> int:
+        """Count matching records without transferring them"""
+        if in_filters and any(values is not None and len(values) == 0 for values in in_filters.values()):
+            return 0
+        
+        return await run_in_db_executor(lambda: self.backend.count(self.table_name, filters, gte, lte, in_filters))
+    
+    async def get_filtered(self, filters: Dict[str, Any], limit: int = 100, **kwargs) -> List[Dict[str, Any]]:
         """Get records with multiple filters efficiently"""
-        return await self.get_all(filters=filters, limit=limit)
+        return await self.get_all(filters=filters, limit=limit, **kwargs)
     
+    async def get_all_pages(self, filters: Optional[Dict[str, Any]] = None,
+                            page_size: int = PAGE_SIZE, **kwargs) -> List[Dict[str, Any]]:
+        """Get every matching record, reading server-side pages until exhausted
+        
+        PostgREST caps a single response at its max-rows setting, so callers
+        that genuinely need a user's full history must page through it.
+        """
+        if not kwargs.get("order_by"):
+            # Paging is only stable with a deterministic order
+            kwargs["order_by"] = [("created_at", False)]
+        
+        rows: List[Dict[str, Any]] = []
+        offset = 0
+        while True:
+            page = await self.get_all(filters=filters, limit=page_size, offset=offset, **kwargs)
+            rows.extend(page)
+            if len(page) < page_size:
+                return rows
+            offset += page_size
+
+    async def iter_pages(self, filters: Optional[Dict[str, Any]] = None,
+                         order_by: Optional[List[Tuple[str, bool]]] = None,
+                         page_size: int = PAGE_SIZE, **kwargs) -> AsyncGenerator[List[Dict[str, Any]], None]:
+        """Yield every matching record a keyset page at a time
+
+        Unlike get_all_pages only one page is held in memory, and each read
+        continues from the last row of the previous page instead of an offset.
+        order_by must end with a unique column.
+        """
+        after = None
+        while True:
+            page = await self.get_all(filters=filters, limit=page_size, order_by=order_by, after=after, **kwargs)
+            if page:
+                yield page
+            if len(page) < page_size:
+                return
+            after = [page[-1][column] for column, _ in order_by]
+
+    @timed_operation("update")
     async def update(self, record_id: str, data: Dict[str, Any], 
                     id_column: str = "id") -> Dict[str, Any]:
         """Update a record"""
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(
-            None,
-            lambda: self.client.table(self.table_name).update(data).eq(id_column, record_id).execute()
-        )
-        if result.data:
-            return result.data[0]
+        rows = await run_in_db_executor(lambda: self.backend.update(self.table_name, data, {id_column: record_id}))
+        if rows:
+            notify_write(self.table_name, rows)
+            return rows[0]
         raise Exception(f"Failed to update record in {self.table_name}")
     
+    @timed_operation("update_many")
+    async def update_many(self, record_ids: List[str], data: Dict[str, Any], id_column: str = "id",
+                          filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Apply the same update to several records with one `in` query per chunk of IDs"""
+        unique_ids = list(dict.fromkeys(str(record_id) for record_id in record_ids if record_id))
+        if not unique_ids:
+            return []
+        
+        def execute_updates():
+            updated = []
+            for start in range(0, len(unique_ids), ID_BATCH_SIZE):
+                chunk = unique_ids[start:start + ID_BATCH_SIZE]
+                updated.extend(self.backend.update(self.table_name, data, filters, in_filters={id_column: chunk}))
+            return updated
+        
+        updated = await run_in_db_executor(execute_updates)
+        notify_write(self.table_name, updated)
+        return updated
+    
+    @timed_operation("delete")
     async def delete(self, record_id: str, id_column: str = "id") -> bool:
         """Delete a record"""
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(
-            None,
-            lambda: self.client.table(self.table_name).delete().eq(id_column, record_id).execute()
-        )
-        return len(result.data) > 0
+        rows = await run_in_db_executor(lambda: self.backend.delete(self.table_name, {id_column: record_id}))
+        if rows:
+            notify_write(self.table_name, rows)
+        return len(rows) > 0
 
+    @timed_operation("execute_rpc")
     async def execute_rpc(self, function_name: str, params: Dict[str, Any] = None) -> Any:
-        """Execute a Supabase RPC function"""
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(
-            None,
-            lambda: self.client.rpc(function_name, params or {}).execute()
-        )
-        return result.data
+        """Execute a Supabase RPC function
+        
+        Raises RpcNotAvailable if the function has not been deployed
+        (see sql/functions.sql) so callers can fall back to plain queries.
+        """
+        if function_name in _missing_rpcs:
+            raise RpcNotAvailable(function_name)
+        
+        # The function may write to any table
+        loader = _request_loader.get()
+        if loader:
+            loader.forget()
+        
+        try:
+            return await run_in_db_executor(lambda: self.backend.rpc(function_name, params or {}))
+        except RpcNotAvailable:
+            logger.warning(f"RPC {function_name} is not deployed; falling back to client-side queries")
+            _missing_rpcs.add(function_name)
+            raise
 
 # Repository instances for each table
 users_repo = SupabaseRepository("users")
@@ -155,30 +676,417 @@ loans_repo = SupabaseRepository("loans")
 loan_disbursements_repo = SupabaseRepository("loan_disbursements")
 income_repo = SupabaseRepository("income")
 debts_repo = SupabaseRepository("debts")
+tags_repo = SupabaseRepository("tags")
+people_repo = SupabaseRepository("people")
+monthly_rollups_repo = SupabaseRepository("monthly_rollups")
 
-# Helper functions for account balance management
-async def adjust_account_balance(account_id: str, amount: float, operation: str = "subtract"):
-    """Adjust account balance by adding or subtracting amount"""
-    if not account_id:
+# Reference data: small per-user tables that are read far more often than written
+REFERENCE_TABLES: Dict[str, SupabaseRepository] = {
+    "accounts": accounts_repo,
+    "people": people_repo,
+    "tags": tags_repo,
+}
+
+reference_cache = TTLCache(max_entries=REFERENCE_CACHE_MAX_ENTRIES, ttl_seconds=REFERENCE_CACHE_TTL_SECONDS)
+
+# Name index over each user's tags, built from their cached tag rows
+tag_index_cache = TTLCache(max_entries=REFERENCE_CACHE_MAX_ENTRIES, ttl_seconds=REFERENCE_CACHE_TTL_SECONDS)
+
+def invalidate_reference_cache(table_name: str, rows: List[Dict[str, Any]]):
+    """Drop cached reference rows for every user whose rows in table_name changed"""
+    if table_name not in REFERENCE_TABLES:
         return
     
-    account = await accounts_repo.get_by_id(account_id, "account_id")
-    if not account:
+    user_ids = {row.get("user_id") for row in rows}
+    if None in user_ids:
+        # Can't tell whose rows changed, so drop everything
+        reference_cache.clear()
+        tag_index_cache.clear()
         return
+    for user_id in user_ids:
+        reference_cache.invalidate((table_name, str(user_id)))
+        if table_name == "tags":
+            tag_index_cache.invalidate(str(user_id))
+
+add_write_listener(invalidate_reference_cache)
+
+async def get_reference_rows(table_name: str, user_id: str) -> List[Dict[str, Any]]:
+    """Every row of a user's accounts, people or tags, served from reference_cache when possible
+    
+    Returns copies, so callers are free to modify them.
+    """
+    key = (table_name, user_id)
+    rows = reference_cache.get(key)
+    if rows is None:
+        version = reference_cache.version(key)
+        rows = await REFERENCE_TABLES[table_name].get_all_pages({"user_id": user_id})
+        reference_cache.set(key, rows, version=version)
+    return [dict(row) for row in rows]
+
+async def get_tag_index(user_id: str) -> TagIndex:
+    """Name index over a user's tags, rebuilt only after their tags change"""
+    index = tag_index_cache.get(user_id)
+    if index is None:
+        version = tag_index_cache.version(user_id)
+        index = TagIndex(await get_reference_rows("tags", user_id))
+        tag_index_cache.set(user_id, index, version=version)
+    return index
+
+# Helper functions for server-side aggregation
+async def get_monthly_expense_totals(user_id: str, start_date: date, end_date: date) -> Dict[Tuple[int, int], Decimal]:
+    """Get total expenses per (year, month) between two dates (inclusive)
+    
+    Reads the monthly rollups when enabled and the range covers whole months.
+    Otherwise uses the monthly_expense_totals database function so only one
+    row per month crosses the wire, falling back to summing a narrow
+    date-bounded select if the function has not been deployed.
+    """
+    totals: Dict[Tuple[int, int], Decimal] = {}
+    if can_use_rollups(start_date, end_date):
+        for row in await get_rollup_rows(user_id, start_date, end_date, "expense"):
+            key = (int(row["year"]), int(row["month"]))
+            totals[key] = totals.get(key, Decimal('0')) + Decimal(str(row["total"]))
+        return totals
+    
+    try:
+        rows = await expenses_repo.execute_rpc("monthly_expense_totals", {
+            "p_user_id": user_id,
+            "p_start_date": start_date.isoformat(),
+            "p_end_date": end_date.isoformat(),
+        })
+        for row in rows or []:
+            totals[(int(row["year"]), int(row["month"]))] = Decimal(str(row["total_expenses"]))
+        return totals
+    except RpcNotAvailable:
+        pass
+    
+    rows = await expenses_repo.get_all_pages(
+        {"user_id": user_id},
+        gte={"expense_date": start_date.isoformat()},
+        lte={"expense_date": end_date.isoformat()},
+        columns="amount,expense_date,created_at",
+    )
+    for row in rows:
+        # expense_date is an ISO string, so the month key can be sliced directly
+        key = (int(row["expense_date"][:4]), int(row["expense_date"][5:7]))
+        totals[key] = totals.get(key, Decimal('0')) + Decimal(str(row["amount"]))
+    return totals
+
+async def get_total_account_balance(user_id: str) -> Decimal:
+    """Get the sum of a user's account balances, computed by the database when possible"""
+    try:
+        total = await accounts_repo.execute_rpc("account_balance_total", {"p_user_id": user_id})
+        return Decimal(str(total or 0))
+    except RpcNotAvailable:
+        pass
+    
+    accounts = await accounts_repo.get_all_pages({"user_id": user_id}, columns="balance,created_at")
+    return sum((Decimal(str(account["balance"])) for account in accounts), Decimal('0'))
+
+async def get_monthly_income_totals(user_id: str, start_date: date, end_date: date) -> Dict[Tuple[int, int], Decimal]:
+    """Get total income per (year, month) between two dates (inclusive)"""
+    totals: Dict[Tuple[int, int], Decimal] = {}
+    if can_use_rollups(start_date, end_date):
+        for row in await get_rollup_rows(user_id, start_date, end_date, "income"):
+            key = (int(row["year"]), int(row["month"]))
+            totals[key] = totals.get(key, Decimal('0')) + Decimal(str(row["total"]))
+        return totals
+    
+    try:
+        rows = await income_repo.execute_rpc("monthly_income_totals", {
+            "p_user_id": user_id,
+            "p_start_date": start_date.isoformat(),
+            "p_end_date": end_date.isoformat(),
+        })
+        for row in rows or []:
+            totals[(int(row["year"]), int(row["month"]))] = Decimal(str(row["total_income"]))
+        return totals
+    except RpcNotAvailable:
+        pass
+    
+    rows = await income_repo.get_all_pages(
+        {"user_id": user_id},
+        gte={"income_date": start_date.isoformat()},
+        lte={"income_date": end_date.isoformat()},
+        columns="amount,income_date,created_at",
+    )
+    for row in rows:
+        key = (int(row["income_date"][:4]), int(row["income_date"][5:7]))
+        totals[key] = totals.get(key, Decimal('0')) + Decimal(str(row["amount"]))
+    return totals
+
+async def get_category_totals(user_id: str, start_date: date, end_date: date) -> Dict[str, Dict[Optional[str], Tuple[Decimal, int]]]:
+    """Get (total, count) per tag_id for expenses and income between two dates
+    
+    Returns {"expense": {tag_id: (total, count)}, "income": {...}}, with
+    untagged entries under a None key.
+    """
+    totals: Dict[str, Dict[Optional[str], Tuple[Decimal, int]]] = {"expense": {}, "income": {}}
+    if can_use_rollups(start_date, end_date):
+        for row in await get_rollup_rows(user_id, start_date, end_date):
+            if not row["entry_count"]:
+                continue
+            total, count = totals[row["kind"]].get(row["tag_id"], (Decimal('0'), 0))
+            totals[row["kind"]][row["tag_id"]] = (total + Decimal(str(row["total"])), count + int(row["entry_count"]))
+        return totals
+    
+    try:
+        rows = await expenses_repo.execute_rpc("category_totals", {
+            "p_user_id": user_id,
+            "p_start_date": start_date.isoformat(),
+            "p_end_date": end_date.isoformat(),
+        })
+        for row in rows or []:
+            totals[row["kind"]][row["tag_id"]] = (Decimal(str(row["total"])), int(row["entry_count"]))
+        return totals
+    except RpcNotAvailable:
+        pass
+    
+    expense_rows, income_rows = await asyncio.gather(
+        expenses_repo.get_all_pages(
+            {"user_id": user_id},
+            gte={"expense_date": start_date.isoformat()},
+            lte={"expense_date": end_date.isoformat()},
+            columns="amount,tag_id,created_at",
+        ),
+        income_repo.get_all_pages(
+            {"user_id": user_id},
+            gte={"income_date": start_date.isoformat()},
+            lte={"income_date": end_date.isoformat()},
+            columns="amount,tag_id,created_at",
+        ),
+    )
+    for kind, rows in (("expense", expense_rows), ("income", income_rows)):
+        for row in rows:
+            total, count = totals[kind].get(row.get("tag_id"), (Decimal('0'), 0))
+            totals[kind][row.get("tag_id")] = (total + Decimal(str(row["amount"])), count + 1)
+    return totals
+
+async def get_unsettled_debt_totals(user_id: str) -> Dict[str, Tuple[Decimal, int]]:
+    """Get (total, count) of a user's unsettled debts per type (OwedToMe / IOwe)"""
+    try:
+        rows = await debts_repo.execute_rpc("unsettled_debt_totals", {"p_user_id": user_id})
+        return {row["type"]: (Decimal(str(row["total"])), int(row["debt_count"])) for row in rows or []}
+    except RpcNotAvailable:
+        pass
+    
+    totals: Dict[str, Tuple[Decimal, int]] = {}
+    debts = await debts_repo.get_all_pages(
+        {"user_id": user_id, "is_settled": False},
+        columns="type,amount,created_at",
+    )
+    for debt in debts:
+        total, count = totals.get(debt["type"], (Decimal('0'), 0))
+        totals[debt["type"]] = (total + Decimal(str(debt["amount"])), count + 1)
+    return totals
+
+async def get_person_debt_totals(user_id: str, person_id: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """Get unsettled OwedToMe/IOwe totals and debt counts per person, keyed by person_id
+    
+    Every one of the user's people is included (only person_id if given),
+    with zero totals when they have no open debts.
+    """
+    try:
+        rows = await debts_repo.execute_rpc("debt_summary_by_person", {"p_user_id": user_id, "p_person_id": person_id})
+        return {
+            str(row["person_id"]): {
+                "person_name": row["person_name"],
+                "owed_to_me": Decimal(str(row["owed_to_me"])),
+                "i_owe": Decimal(str(row["i_owe"])),
+                "debt_count": int(row["debt_count"]),
+            }
+            for row in rows or []
+        }
+    except RpcNotAvailable:
+        pass
+    
+    debt_filters = {"user_id": user_id, "is_settled": False}
+    if person_id:
+        debt_filters["person_id"] = person_id
+    people, debts = await asyncio.gather(
+        get_reference_rows("people", user_id),
+        debts_repo.get_all_pages(debt_filters, columns="person_id,type,amount,created_at"),
+    )
+    
+    totals: Dict[str, Dict[str, Any]] = {
+        str(person["person_id"]): {
+            "person_name": person.get("name"),
+            "owed_to_me": Decimal('0'),
+            "i_owe": Decimal('0'),
+            "debt_count": 0,
+        }
+        for person in people
+        if not person_id or str(person["person_id"]) == person_id
+    }
+    for debt in debts:
+        person_totals = totals.get(str(debt["person_id"]))
+        if person_totals is None:
+            continue
+        person_totals["owed_to_me" if debt["type"] == "OwedToMe" else "i_owe"] += Decimal(str(debt["amount"]))
+        person_totals["debt_count"] += 1
+    return totals
+
+async def get_loan_disbursement_totals(user_id: str) -> Dict[Tuple[str, Optional[int], Optional[int]], Tuple[Decimal, int]]:
+    """Get (total, count) of a user's loan disbursements per (loan_id, year, month)
+    
+    Disbursements without a date are keyed with a None year and month.
+    """
+    try:
+        rows = await loan_disbursements_repo.execute_rpc("loan_disbursement_totals", {"p_user_id": user_id})
+        return {
+            (str(row["loan_id"]), row["year"], row["month"]): (Decimal(str(row["total"])), int(row["disbursement_count"]))
+            for row in rows or []
+        }
+    except RpcNotAvailable:
+        pass
+    
+    totals: Dict[Tuple[str, Optional[int], Optional[int]], Tuple[Decimal, int]] = {}
+    disbursements = await loan_disbursements_repo.get_all_pages(
+        {"user_id": user_id},
+        columns="loan_id,amount,disbursement_date,created_at",
+    )
+    for disbursement in disbursements:
+        disbursement_date = disbursement.get("disbursement_date")
+        key = (
+            str(disbursement["loan_id"]),
+            int(disbursement_date[:4]) if disbursement_date else None,
+            int(disbursement_date[5:7]) if disbursement_date else None,
+        )
+        total, count = totals.get(key, (Decimal('0'), 0))
+        totals[key] = (total + Decimal(str(disbursement["amount"])), count + 1)
+    return totals
+
+# Helper functions for tag-name filtering
+async def get_matching_tag_ids(user_id: str, tag_name: str) -> List[str]:
+    """Get IDs of the user's tags whose name contains tag_name (case-insensitive)"""
+    index = await get_tag_index(user_id)
+    return index.matching_ids(tag_name)
+
+# Helper functions for enriching listings with related names
+async def get_name_map(repo: SupabaseRepository, ids: List[str], id_column: str,
+                       name_column: str) -> Dict[str, str]:
+    """Resolve a set of IDs to their names with a single batched lookup"""
+    try:
+        rows = await repo.get_by_ids(ids, id_column, columns=f"{id_column},{name_column}")
+    except Exception as e:
+        logger.warning(f"Failed to resolve {name_column} for {repo.table_name}: {str(e)}")
+        return {}
+    return {row[id_column]: row.get(name_column) for row in rows}
+
+async def attach_account_and_tag_names(records: List[Dict[str, Any]], include_account: bool = True,
+                                       include_tag: bool = True) -> List[Dict[str, Any]]:
+    """Add account_name/tag_name to each record using one lookup per table for the whole page"""
+    account_ids = {r["account_id"] for r in records if include_account and r.get("account_id")}
+    tag_ids = {r["tag_id"] for r in records if include_tag and r.get("tag_id")}
+    
+    account_names, tag_names = await asyncio.gather(
+        get_name_map(accounts_repo, list(account_ids), "account_id", "account_name"),
+        get_name_map(tags_repo, list(tag_ids), "tag_id", "name"),
+    )
     
-    current_balance = float(account["balance"])
+    enriched = []
+    for record in records:
+        record_data = dict(record)
+        if include_account:
+            record_data["account_name"] = account_names.get(record.get("account_id")) if record.get("account_id") else None
+        if include_tag:
+            record_data["tag_name"] = tag_names.get(record.get("tag_id")) if record.get("tag_id") else None
+        enriched.append(record_data)
+    return enriched
+
+# Helper functions for account balance management
+async def increment_account_balance(account_id: str, delta: float) -> Optional[Dict[str, Any]]:
+    """Atomically add delta (negative to subtract) to an account balance
     
-    if operation == "add":
-        new_balance = current_balance + amount
-    else:  # subtract
-        new_balance = current_balance - amount
+    Runs `balance = balance + delta` inside the database in a single round
+    trip, so concurrent writes to the same account cannot lose updates.
+    Returns the updated account, or None if it does not exist.
+    """
+    try:
+        rows = await accounts_repo.execute_rpc("increment_account_balance", {
+            "p_account_id": account_id,
+            "p_delta": delta,
+        })
+        if rows:
+            notify_write("accounts", rows)
+        return rows[0] if rows else None
+    except RpcNotAvailable:
+        pass
     
-    await accounts_repo.update(
+    # Fallback without the database function: read-modify-write (not atomic)
+    account = await accounts_repo.get_by_id(account_id, "account_id")
+    if not account:
+        return None
+    return await accounts_repo.update(
         account_id,
-        {"balance": new_balance},
+        {"balance": float(account["balance"]) + delta},
         "account_id"
     )
 
+class AccountNotFound(ValueError):
+    """Raised when a transfer names an account that does not exist"""
+
+async def transfer_between_accounts(from_account_id: str, to_account_id: str, amount: float,
+                                    require_funds: bool = False) -> Dict[str, Dict[str, Any]]:
+    """Move amount from one account to another, returning both updated accounts by account_id
+    
+    The transfer_between_accounts database function debits and credits both
+    accounts in one transaction; with require_funds it refuses to overdraw the
+    source account. Nothing is written if the transfer is rejected: raises
+    AccountNotFound if either account does not exist, and ValueError for a
+    transfer to the same account or, with require_funds, insufficient funds.
+    """
+    if from_account_id == to_account_id:
+        raise ValueError("Cannot transfer to the same account")
+    
+    try:
+        rows = await accounts_repo.execute_rpc("transfer_between_accounts", {
+            "p_from_account_id": from_account_id,
+            "p_to_account_id": to_account_id,
+            "p_amount": amount,
+            "p_require_funds": require_funds,
+        })
+    except RpcNotAvailable:
+        # Fallback without the database function: check both accounts, then two independent increments
+        source, destination = await asyncio.gather(
+            accounts_repo.get_by_id(from_account_id, "account_id"),
+            accounts_repo.get_by_id(to_account_id, "account_id"),
+        )
+        if not source or not destination:
+            raise AccountNotFound("Account not found")
+        if require_funds and float(source["balance"]) < amount:
+            raise ValueError(f"Insufficient funds: available {source['balance']}")
+        debited, credited = await asyncio.gather(
+            increment_account_balance(from_account_id, -amount),
+            increment_account_balance(to_account_id, amount),
+        )
+        return {row["account_id"]: row for row in (debited, credited) if row}
+    except Exception as e:
+        # The function raised and its transaction rolled back
+        message = getattr(e, "message", None) or str(e)
+        if "Account not found" in message:
+            raise AccountNotFound("Account not found") from e
+        raise ValueError(message) from e
+    
+    notify_write("accounts", rows)
+    return {row["account_id"]: row for row in rows}
+
+async def adjust_account_balance(account_id: str, amount: float, operation: str = "subtract"):
+    """Adjust account balance by adding or subtracting amount"""
+    if not account_id:
+        return
+    
+    delta = amount if operation == "add" else -amount
+    await increment_account_balance(account_id, delta)
+
+async def apply_balance_deltas(deltas: Dict[str, float]):
+    """Apply one atomic increment per account, skipping accounts whose net change is zero"""
+    await asyncio.gather(*[
+        increment_account_balance(account_id, delta)
+        for account_id, delta in deltas.items()
+        if account_id and delta != 0
+    ])
+
 async def handle_expense_balance_changes(old_expense: dict, new_expense_data: dict):
     """Handle account balance adjustments when expense is updated"""
     old_account_id = old_expense.get("account_id")
@@ -186,24 +1094,15 @@ async def handle_expense_balance_changes(old_expense: dict, new_expense_data: di
     old_amount = float(old_expense.get("amount", 0))
     new_amount = float(new_expense_data.get("amount", 0))
     
-    # Case 1: Only amount changed (same payment method)
-    if old_account_id == new_account_id and old_account_id:
-        amount_difference = new_amount - old_amount
-        if amount_difference != 0:
-            # If new amount is higher, subtract the difference
-            # If new amount is lower, add the difference back
-            operation = "subtract" if amount_difference > 0 else "add"
-            await adjust_account_balance(old_account_id, abs(amount_difference), operation)
-    
-    # Case 2: Only payment method changed (same amount) OR Case 3: Both changed
-    elif old_account_id != new_account_id:
-        # Refund the old account
-        if old_account_id:
-            await adjust_account_balance(old_account_id, old_amount, "add")
-        
-        # Charge the new account
-        if new_account_id:
-            await adjust_account_balance(new_account_id, new_amount, "subtract")
+    # Refund the old account and charge the new one; when the account is
+    # unchanged the two collapse into a single increment of the difference
+    deltas: Dict[str, float] = {}
+    if old_account_id:
+        deltas[old_account_id] = deltas.get(old_account_id, 0) + old_amount
+    if new_account_id:
+        deltas[new_account_id] = deltas.get(new_account_id, 0) - new_amount
+    
+    await apply_balance_deltas(deltas)
 
 # Helper functions for income balance management
 async def handle_income_balance_changes(old_income: dict, new_income_data: dict):
@@ -213,21 +1112,101 @@ async def handle_income_balance_changes(old_income: dict, new_income_data: dict)
     old_amount = float(old_income.get("amount", 0))
     new_amount = float(new_income_data.get("amount", 0))
     
-    # Case 1: Only amount changed (same account)
-    if old_account_id == new_account_id and old_account_id:
-        amount_difference = new_amount - old_amount
-        if amount_difference != 0:
-            # If new amount is higher, add the difference
-            # If new amount is lower, subtract the difference
-            operation = "add" if amount_difference > 0 else "subtract"
-            await adjust_account_balance(old_account_id, abs(amount_difference), operation)
-    
-    # Case 2: Only account changed (same amount) OR Case 3: Both changed
-    elif old_account_id != new_account_id:
-        # Remove from old account
-        if old_account_id:
-            await adjust_account_balance(old_account_id, old_amount, "subtract")
-        
-        # Add to new account
-        if new_account_id:
-            await adjust_account_balance(new_account_id, new_amount, "add") 
\ No newline at end of file
+    # Remove from the old account and add to the new one; when the account is
+    # unchanged the two collapse into a single increment of the difference
+    deltas: Dict[str, float] = {}
+    if old_account_id:
+        deltas[old_account_id] = deltas.get(old_account_id, 0) - old_amount
+    if new_account_id:
+        deltas[new_account_id] = deltas.get(new_account_id, 0) + new_amount
+    
+    await apply_balance_deltas(deltas)
+
+# Helper functions for the monthly rollups
+# Date column of the table behind each rollup kind
+ROLLUP_DATE_COLUMNS = {"expense": "expense_date", "income": "income_date"}
+
+RollupKey = Tuple[str, int, int, Optional[str], str]
+
+def rollup_deltas(kind: str, old_row: Optional[dict] = None,
+                  new_row: Optional[dict] = None) -> Dict[RollupKey, Tuple[Decimal, int]]:
+    """Changes to (user_id, year, month, tag_id, kind) totals caused by replacing old_row with new_row
+    
+    Pass only new_row for an insert and only old_row for a delete.
+    """
+    date_column = ROLLUP_DATE_COLUMNS[kind]
+    deltas: Dict[RollupKey, Tuple[Decimal, int]] = {}
+    for row, sign in ((old_row, -1), (new_row, 1)):
+        if not row or not row.get(date_column):
+            continue
+        row_date = str(row[date_column])
+        key = (str(row["user_id"]), int(row_date[:4]), int(row_date[5:7]), row.get("tag_id"), kind)
+        total, count = deltas.get(key, (Decimal('0'), 0))
+        deltas[key] = (total + sign * Decimal(str(row["amount"])), count + sign)
+    return deltas
+
+def merge_rollup_deltas(*delta_maps: Dict[RollupKey, Tuple[Decimal, int]]) -> Dict[RollupKey, Tuple[Decimal, int]]:
+    """Combine several sets of rollup deltas into one"""
+    merged: Dict[RollupKey, Tuple[Decimal, int]] = {}
+    for deltas in delta_maps:
+        for key, (amount, count) in deltas.items():
+            total, entries = merged.get(key, (Decimal('0'), 0))
+            merged[key] = (total + amount, entries + count)
+    return merged
+
+async def apply_rollup_deltas(deltas: Dict[RollupKey, Tuple[Decimal, int]]):
+    """Add deltas to the monthly rollups with a single upsert
+    
+    A failure here is logged rather than raised: the transaction itself has
+    already been written, and `python -m rollups rebuild` repairs the totals.
+    """
+    changes = [
+        {
+            "user_id": user_id,
+            "year": year,
+            "month": month,
+            "tag_id": tag_id,
+            "kind": kind,
+            "amount": str(amount),
+            "count": count,
+        }
+        for (user_id, year, month, tag_id, kind), (amount, count) in deltas.items()
+        if amount != 0 or count != 0
+    ]
+    if not changes:
+        return
+    
+    try:
+        await monthly_rollups_repo.execute_rpc("increment_monthly_rollups", {"p_deltas": changes})
+    except RpcNotAvailable:
+        # Rollups are not deployed; readers keep using the raw tables
+        return
+    except Exception as e:
+        logger.error(f"Failed to update monthly rollups, run `python -m rollups rebuild` to repair: {str(e)}")
+
+async def record_rollup_change(kind: str, old_row: Optional[dict] = None, new_row: Optional[dict] = None):
+    """Update the monthly rollups after an expense or income row was created, updated or deleted"""
+    await apply_rollup_deltas(rollup_deltas(kind, old_row, new_row))
+
+def can_use_rollups(start_date: date, end_date: date) -> bool:
+    """Whether totals for the range can be read from the rollups
+    
+    Rollups are per month, so the range has to cover whole months, and they
+    are only trusted once enabled and while they are being maintained.
+    """
+    if not MONTHLY_ROLLUPS_ENABLED or "increment_monthly_rollups" in _missing_rpcs:
+        return False
+    return start_date.day == 1 and (end_date + timedelta(days=1)).day == 1
+
+async def get_rollup_rows(user_id: str, start_date: date, end_date: date,
+                          kind: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Rollup rows for a user in the months from start_date through end_date"""
+    rows = await monthly_rollups_repo.get_all_pages(
+        {"user_id": user_id, "kind": kind},
+        gte={"year": start_date.year},
+        lte={"year": end_date.year},
+        order_by=[("year", False), ("month", False)],
+    )
+    first_month, last_month = (start_date.year, start_date.month), (end_date.year, end_date.month)
+    return [row for row in rows if first_month <= (row["year"], row["month"]) <= last_month]
+
@@ -1,4 +1,5 @@
 from fastapi import FastAPI
+from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
 import logging
 from dotenv import load_dotenv
@@ -38,7 +39,9 @@ if not loaded:
     load_dotenv(override=True)
 
 # Import routes AFTER loading environment variables
-from routes import users, accounts, expenses, budgets, loans, loan_disbursements, income, debts, people, tags, assistant
+from routes import users, accounts, expenses, budgets, loans, loan_disbursements, income, debts, people, tags, assistant, statistics, export, dashboard
+from database import RequestLoaderMiddleware, database, db_executor, reference_cache, tag_index_cache
+from metrics import CONTENT_TYPE, REGISTRY, MetricsMiddleware
 
 app = FastAPI(title="Expense Tracker API", version="1.0.0")
 
@@ -54,8 +57,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Pagination metadata for the expense and income listings
+    expose_headers=["X-Next-Cursor", "X-Total-Count"],
 )
 
+# Batch and deduplicate row lookups made while handling each request
+app.add_middleware(RequestLoaderMiddleware)
+
+# Per-route request counts and latencies for /metrics (outermost, so it times everything)
+app.add_middleware(MetricsMiddleware)
+
 # Log CORS configuration on startup
 @app.on_event("startup")
 async def startup_event():
@@ -66,6 +77,11 @@ async def startup_event():
     if not groq_key:
         logger.warning("GROQ_API_KEY is NOT loaded - AI assistant will not work")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Release pooled Supabase connections and the database executor
+    database.close()
+
 # Include routers
 app.include_router(users.router, prefix="/api/users", tags=["users"])
 app.include_router(accounts.router, prefix="/api/accounts", tags=["accounts"])
@@ -78,6 +94,9 @@ app.include_router(debts.router, prefix="/api/debts", tags=["debts"])
 app.include_router(people.router, prefix="/api/people", tags=["people"])
 app.include_router(tags.router, prefix="/api/tags", tags=["tags"])
 app.include_router(assistant.router, prefix="/api/assistant", tags=["assistant"])
+app.include_router(statistics.router, prefix="/api/statistics", tags=["statistics"])
+app.include_router(export.router, prefix="/api/export", tags=["export"])
+app.include_router(dashboard.router, prefix="/api/dashboard", tags=["dashboard"])
 
 @app.get("/")
 async def root():
@@ -85,4 +104,14 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "database_executor": db_executor.stats(),
+        "reference_cache": reference_cache.stats(),
+        "tag_index_cache": tag_index_cache.stats(),
+    }
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Request, repository, executor and LLM metrics in the Prometheus text format"""
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
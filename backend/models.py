@@ -36,6 +36,16 @@ class Account(AccountBase):
     class Config:
         from_attributes = True
 
+class AccountTransfer(BaseModel):
+    user_id: UUID
+    from_account_id: UUID
+    to_account_id: UUID
+    amount: Decimal
+
+class AccountTransferResult(BaseModel):
+    from_account: Account
+    to_account: Account
+
 # Expense Models
 class ExpenseBase(BaseModel):
     amount: Decimal
@@ -202,6 +212,85 @@ class LoanSummary(BaseModel):
     disbursements: list[LoanDisbursement]
     total_disbursed: Decimal
 
+# Statistics Models
+class StatisticsOverview(BaseModel):
+    total_balance: Decimal
+    total_income: Decimal
+    total_expenses: Decimal
+    actual_savings: Decimal
+    total_loans: Decimal
+    total_loan_amount: Decimal
+    total_debts: Decimal
+    owed_to_me: Decimal
+    i_owe: Decimal
+    unsettled_debt_count: int
+    net_worth: Decimal
+
+class MonthlyStatistics(BaseModel):
+    year: int
+    month: int
+    income: Decimal
+    expenses: Decimal
+    savings: Decimal
+    budget: Optional[Decimal] = None
+
+class CategoryStatistics(BaseModel):
+    tag_id: Optional[UUID] = None
+    name: str
+    amount: Decimal
+    count: int
+
+class LoanStatistics(BaseModel):
+    loan_id: UUID
+    loan_name: Optional[str] = None
+    total_amount: Decimal
+    remaining_amount: Decimal
+    disbursement_count: int
+    total_disbursed: Decimal
+
+class DisbursementMonthStatistics(BaseModel):
+    year: int
+    month: int
+    amount: Decimal
+
+class Statistics(BaseModel):
+    start_date: date
+    end_date: date
+    overview: StatisticsOverview
+    monthly: list[MonthlyStatistics]
+    expense_categories: list[CategoryStatistics]
+    income_categories: list[CategoryStatistics]
+    loans: list[LoanStatistics]
+    disbursement_count: int
+    disbursements_by_month: list[DisbursementMonthStatistics]
+
+# Dashboard Models
+class DashboardTransaction(BaseModel):
+    id: UUID
+    type: Literal['expense', 'income']
+    amount: Decimal
+    description: str
+    tag_name: Optional[str] = None
+    account_name: Optional[str] = None
+    transaction_date: Optional[date] = None
+
+class Dashboard(BaseModel):
+    year: int
+    month: int
+    accounts: list[Account]
+    total_balance: Decimal
+    monthly_income: Decimal
+    monthly_expenses: Decimal
+    monthly_budget: Optional[Decimal] = None
+    budget_remaining: Optional[Decimal] = None
+    transaction_count: int
+    total_loans: Decimal
+    loan_count: int
+    total_debts: Decimal
+    unsettled_debt_count: int
+    net_worth: Decimal
+    recent_transactions: list[DashboardTransaction]
+
 # Tag Models
 class TagBase(BaseModel):
     name: str
@@ -0,0 +1,85 @@
+"""
+Backfill or rebuild the monthly rollups table (sql/rollups.sql).
+
+Recomputes per-user expense and income totals by month and tag from the raw
+tables. Uses the rebuild_monthly_rollups database function when it is
+deployed, otherwise recomputes each user's rollups client-side. The
+client-side path is not transactional, so run it while the API is not
+taking writes.
+
+Usage (from the backend directory):
+    python -m rollups rebuild                 # every user
+    python -m rollups rebuild --user-id UUID  # a single user
+"""
+import argparse
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+from database import (
+    RpcNotAvailable, RollupKey, expenses_repo, income_repo, monthly_rollups_repo, users_repo,
+    merge_rollup_deltas, rollup_deltas
+)
+
+logger = logging.getLogger(__name__)
+
+async def rebuild_user_rollups(user_id: str) -> int:
+    """Recompute one user's rollups from their expenses and income, returning the rows written"""
+    expenses, income = await asyncio.gather(
+        expenses_repo.get_all_pages({"user_id": user_id}, columns="user_id,amount,expense_date,tag_id,created_at"),
+        income_repo.get_all_pages({"user_id": user_id}, columns="user_id,amount,income_date,tag_id,created_at"),
+    )
+    totals: Dict[RollupKey, tuple] = merge_rollup_deltas(
+        *[rollup_deltas("expense", new_row=expense) for expense in expenses],
+        *[rollup_deltas("income", new_row=entry) for entry in income],
+    )
+
+    await monthly_rollups_repo.delete(user_id, "user_id")
+    created = await monthly_rollups_repo.create_many([
+        {
+            "user_id": key_user_id,
+            "year": year,
+            "month": month,
+            "tag_id": tag_id,
+            "kind": kind,
+            "total": float(total),
+            "entry_count": count,
+        }
+        for (key_user_id, year, month, tag_id, kind), (total, count) in totals.items()
+    ])
+    return len(created)
+
+async def rebuild(user_id: Optional[str] = None) -> int:
+    """Rebuild rollups for one user, or every user when user_id is None"""
+    try:
+        rows = await monthly_rollups_repo.execute_rpc("rebuild_monthly_rollups", {"p_user_id": user_id})
+        return int(rows or 0)
+    except RpcNotAvailable:
+        logger.warning("rebuild_monthly_rollups is not deployed; rebuilding client-side")
+
+    if user_id:
+        user_ids: List[str] = [user_id]
+    else:
+        users = await users_repo.get_all_pages(columns="id,created_at")
+        user_ids = [user["id"] for user in users]
+
+    written = 0
+    for index, current_user_id in enumerate(user_ids, start=1):
+        written += await rebuild_user_rollups(current_user_id)
+        if index % 100 == 0:
+            logger.info(f"Rebuilt rollups for {index}/{len(user_ids)} users")
+    return written
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    rebuild_parser = subcommands.add_parser("rebuild", help="recompute rollups from the raw tables")
+    rebuild_parser.add_argument("--user-id", help="only rebuild this user's rollups")
+    args = parser.parse_args()
+
+    if args.command == "rebuild":
+        written = asyncio.run(rebuild(args.user_id))
+        print(f"Wrote {written} rollup rows")
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import List
 from uuid import UUID
+import asyncio
 from supabase import Client
 
-from database import get_db, accounts_repo
-from models import Account, AccountCreate, AccountBase
+from database import get_db, accounts_repo, get_total_account_balance, transfer_between_accounts, AccountNotFound
+from models import Account, AccountCreate, AccountBase, AccountTransfer, AccountTransferResult
 
 router = APIRouter()
 
@@ -25,6 +26,45 @@ async def create_account(
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/transfer", response_model=AccountTransferResult)
+async def transfer_funds(
+    transfer: AccountTransfer,
+    db: Client = Depends(get_db)
+):
+    """Move money between two of a user's accounts in one atomic operation"""
+    try:
+        from_account_id = str(transfer.from_account_id)
+        to_account_id = str(transfer.to_account_id)
+        amount = float(transfer.amount)
+        
+        if from_account_id == to_account_id:
+            raise HTTPException(status_code=400, detail="Cannot transfer to the same account")
+        if amount <= 0:
+            raise HTTPException(status_code=400, detail="Transfer amount must be positive")
+        
+        # Both accounts must exist and belong to the user
+        source, destination = await asyncio.gather(
+            accounts_repo.get_by_id(from_account_id, "account_id"),
+            accounts_repo.get_by_id(to_account_id, "account_id"),
+        )
+        if not source or not destination or {source["user_id"], destination["user_id"]} != {str(transfer.user_id)}:
+            raise HTTPException(status_code=404, detail="Account not found")
+        if float(source["balance"]) < amount:
+            raise HTTPException(status_code=400, detail=f"Insufficient funds in {source['account_name']}")
+        
+        # The balance check is repeated inside the transaction, against the locked row
+        accounts = await transfer_between_accounts(from_account_id, to_account_id, amount, require_funds=True)
+        return AccountTransferResult(
+            from_account=Account(**accounts[from_account_id]),
+            to_account=Account(**accounts[to_account_id])
+        )
+    except HTTPException:
+        raise
+    except AccountNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/", response_model=List[Account])
 async def get_accounts(
     user_id: UUID,
@@ -32,10 +72,11 @@ async def get_accounts(
 ):
     """Get all accounts for a user"""
     try:
-        # Use Supabase filtering
-        results = await accounts_repo.get_all()
-        # Filter by user_id
-        user_accounts = [account for account in results if account.get("user_id") == str(user_id)]
+        # Only the user's accounts are read (served by the user_id index)
+        user_accounts = await accounts_repo.get_all_pages(
+            {"user_id": str(user_id)},
+            order_by=[("created_at", False)]
+        )
         return [Account(**account) for account in user_accounts]
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -94,9 +135,7 @@ async def get_total_balance(
 ):
     """Get total balance across all accounts for a user"""
     try:
-        results = await accounts_repo.get_all()
-        user_accounts = [account for account in results if account.get("user_id") == str(user_id)]
-        total_balance = sum(float(account.get("balance", 0)) for account in user_accounts)
-        return {"total_balance": total_balance}
+        total_balance = await get_total_account_balance(str(user_id))
+        return {"total_balance": float(total_balance)}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e)) 
\ No newline at end of file
@@ -1,6 +1,6 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import StreamingResponse
-from typing import Optional
+from typing import Awaitable, Callable, Dict, Optional, Tuple
 from uuid import UUID
 from pydantic import BaseModel
 from datetime import datetime, date, timedelta
@@ -8,12 +8,18 @@ from collections import defaultdict
 import os
 import json
 import logging
+import asyncio
 import re
-from groq import Groq
+import time
+from groq import AsyncGroq
 from dotenv import load_dotenv
 from pathlib import Path
 import os
 
+from cache import TTLCache
+from database import add_write_listener
+from metrics import Histogram
+
 # Load environment variables - try multiple paths
 # Try backend/.env first (relative to this file)
 env_path = Path(__file__).parent.parent / ".env"
@@ -41,11 +47,40 @@ if GROQ_API_KEY:
 else:
     logger.warning("GROQ_API_KEY is NOT set")
 
-# Initialize Groq client lazily
+# Context sources are fetched concurrently, with a bound and a per-source timeout
+CONTEXT_FETCH_CONCURRENCY = int(os.getenv("ASSISTANT_FETCH_CONCURRENCY", "6"))
+CONTEXT_SOURCE_TIMEOUT_SECONDS = float(os.getenv("ASSISTANT_SOURCE_TIMEOUT_SECONDS", "5"))
+
+# Per-user cache of the aggregated financial context, so follow-up messages
+# skip the database entirely. Entries are dropped whenever one of the tables
+# the context is built from is written for that user.
+CONTEXT_CACHE_TTL_SECONDS = float(os.getenv("ASSISTANT_CONTEXT_TTL_SECONDS", "300"))
+CONTEXT_CACHE_MAX_USERS = int(os.getenv("ASSISTANT_CONTEXT_CACHE_SIZE", "512"))
+CONTEXT_TABLES = {"accounts", "expenses", "income", "budgets", "loans", "loan_disbursements", "debts"}
+
+# Streams are timed until the last chunk, so they use the same buckets as full completions
+LLM_REQUEST_DURATION = Histogram(
+    "llm_request_duration_seconds", "Duration of Groq chat completions, by mode and outcome",
+    ["mode", "outcome"],
+)
+
+context_cache = TTLCache(max_entries=CONTEXT_CACHE_MAX_USERS, ttl_seconds=CONTEXT_CACHE_TTL_SECONDS)
+
+def invalidate_context_on_write(table_name: str, rows: list):
+    """Drop cached context for every user whose financial data changed"""
+    if table_name not in CONTEXT_TABLES:
+        return
+    for user_id in {str(row.get("user_id")) for row in rows if row.get("user_id")}:
+        context_cache.invalidate(user_id)
+
+add_write_listener(invalidate_context_on_write)
+
+# Initialize Groq client lazily. The async client keeps completions off the
+# event loop thread, so a slow model response never stalls other requests.
 groq_client = None
 
 def get_groq_client():
-    """Get or create Groq client"""
+    """Get or create the async Groq client"""
     global groq_client
     if groq_client is None:
         if not GROQ_API_KEY:
@@ -53,7 +88,7 @@ def get_groq_client():
                 status_code=500, 
                 detail="GROQ_API_KEY environment variable is not set. Please set it in your .env file."
             )
-        groq_client = Groq(api_key=GROQ_API_KEY)
+        groq_client = AsyncGroq(api_key=GROQ_API_KEY)
     return groq_client
 
 class ChatMessage(BaseModel):
@@ -115,7 +150,7 @@ async def chat_with_assistant(message: ChatMessage):
         
         # Contextualize the financial data
         logger.info("Contextualizing financial data...")
-        financial_context = await contextualize_financial_data(str(message.user_id))
+        financial_context = await get_financial_context(str(message.user_id))
         logger.info(f"Financial context generated (length: {len(financial_context)})")
         
         # Build system prompt
@@ -140,7 +175,8 @@ Be concise, helpful, and use the actual financial data provided. If you don't ha
         # Call Groq API
         try:
             logger.info(f"Calling Groq API with model: {GROQ_MODEL}")
-            completion = client.chat.completions.create(
+            started = time.perf_counter()
+            completion = await client.chat.completions.create(
                 model=GROQ_MODEL,
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -152,8 +188,10 @@ Be concise, helpful, and use the actual financial data provided. If you don't ha
                 stream=False,
                 stop=None
             )
+            LLM_REQUEST_DURATION.observe(time.perf_counter() - started, mode="complete", outcome="ok")
             logger.info(f"Groq API response received")
         except Exception as groq_error:
+            LLM_REQUEST_DURATION.observe(time.perf_counter() - started, mode="complete", outcome="error")
             logger.error(f"Groq API error: {str(groq_error)}", exc_info=True)
             raise HTTPException(
                 status_code=500, 
@@ -203,13 +241,13 @@ Be concise, helpful, and use the actual financial data provided. If you don't ha
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 @router.post("/chat/stream")
-async def chat_with_assistant_stream(message: ChatMessage):
+async def chat_with_assistant_stream(message: ChatMessage, request: Request):
     """
     Stream chat responses from financial assistant
     """
     try:
         # Contextualize the financial data
-        financial_context = await contextualize_financial_data(str(message.user_id))
+        financial_context = await get_financial_context(str(message.user_id))
         
         # Build system prompt
         system_prompt = f"""You are a helpful financial planning assistant for a personal finance tracking application.
@@ -231,8 +269,9 @@ Be concise, helpful, and use the actual financial data provided. If you don't ha
         client = get_groq_client()
         
         # Call Groq API with streaming
+        started = time.perf_counter()
         try:
-            completion = client.chat.completions.create(
+            completion = await client.chat.completions.create(
                 model=GROQ_MODEL,
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -245,6 +284,7 @@ Be concise, helpful, and use the actual financial data provided. If you don't ha
                 stop=None
             )
         except Exception as groq_error:
+            LLM_REQUEST_DURATION.observe(time.perf_counter() - started, mode="stream", outcome="error")
             logger.error(f"Groq API streaming error: {str(groq_error)}")
             raise HTTPException(
                 status_code=500, 
@@ -252,96 +292,167 @@ Be concise, helpful, and use the actual financial data provided. If you don't ha
             )
         
         async def generate():
+            # Chunks are pulled from Groq one at a time, only after the previous
+            # one has been handed to the client, so a slow reader slows the
+            # upstream read instead of buffering the whole answer in memory
+            outcome = "ok"
             try:
-                for chunk in completion:
+                async for chunk in completion:
+                    if await request.is_disconnected():
+                        logger.info(f"Client disconnected from assistant stream: {message.user_id}")
+                        outcome = "cancelled"
+                        return
                     if chunk.choices and len(chunk.choices) > 0:
                         delta = chunk.choices[0].delta
                         if hasattr(delta, 'content') and delta.content:
                             yield f"data: {json.dumps({'content': delta.content})}\n\n"
                 yield "data: [DONE]\n\n"
+            except asyncio.CancelledError:
+                # The client went away; Starlette cancels the response task
+                logger.info(f"Assistant stream cancelled for user: {message.user_id}")
+                outcome = "cancelled"
+                raise
             except Exception as e:
+                outcome = "error"
                 yield f"data: {json.dumps({'error': str(e)})}\n\n"
+            finally:
+                # Close the upstream connection so Groq stops generating tokens
+                # nobody will read
+                await completion.close()
+                LLM_REQUEST_DURATION.observe(time.perf_counter() - started, mode="stream", outcome=outcome)
         
         return StreamingResponse(generate(), media_type="text/event-stream")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-async def contextualize_financial_data(user_id: str) -> str:
+async def get_financial_context(user_id: str) -> str:
+    """Get the user's financial context from the cache, building it on a miss"""
+    cached_context = context_cache.get(user_id)
+    if cached_context is not None:
+        return cached_context
+    
+    # Read the version first so a write during the build isn't masked by a stale entry
+    version = context_cache.version(user_id)
+    financial_context, is_complete = await contextualize_financial_data(user_id)
+    if is_complete:
+        # Never cache a degraded context; the next message should retry the missing sources
+        context_cache.set(user_id, financial_context, version=version)
+    return financial_context
+
+async def fetch_context_sources(sources: Dict[str, Callable[[], Awaitable[list]]]) -> Tuple[Dict[str, list], Dict[str, str]]:
+    """
+    Load independent data sources concurrently.
+    At most CONTEXT_FETCH_CONCURRENCY queries run at once and each one gets
+    CONTEXT_SOURCE_TIMEOUT_SECONDS. Returns the loaded data plus the reason
+    for every source that timed out or failed, so callers can degrade.
+    """
+    semaphore = asyncio.Semaphore(CONTEXT_FETCH_CONCURRENCY)
+    
+    async def load(name: str, fetch: Callable[[], Awaitable[list]]):
+        async with semaphore:
+            try:
+                return name, await asyncio.wait_for(fetch(), timeout=CONTEXT_SOURCE_TIMEOUT_SECONDS), None
+            except asyncio.TimeoutError:
+                logger.warning(f"Assistant context source '{name}' timed out after {CONTEXT_SOURCE_TIMEOUT_SECONDS}s")
+                return name, None, "timed out"
+            except Exception as e:
+                logger.warning(f"Assistant context source '{name}' failed: {str(e)}")
+                return name, None, "failed to load"
+    
+    results = await asyncio.gather(*[load(name, fetch) for name, fetch in sources.items()])
+    
+    data = {name: rows for name, rows, error in results if error is None}
+    errors = {name: error for name, _, error in results if error is not None}
+    return data, errors
+
+def unavailable_section(title: str, reason: str) -> str:
+    """Placeholder for a context section whose data could not be loaded"""
+    return f"{title}: Data temporarily unavailable ({reason}); do not make claims about it."
+
+async def contextualize_financial_data(user_id: str) -> Tuple[str, bool]:
     """
     Transform raw database data into meaningful context for LLM
+    Returns the context and whether every data source loaded.
     """
     from database import (
         accounts_repo, expenses_repo, income_repo, 
         budgets_repo, loans_repo, debts_repo
     )
     
-    # Fetch data
-    accounts = await accounts_repo.get_filtered({"user_id": user_id})
-    all_expenses = await expenses_repo.get_filtered({"user_id": user_id}, limit=1000)
-    all_income = await income_repo.get_filtered({"user_id": user_id}, limit=1000)
-    budgets = await budgets_repo.get_filtered({"user_id": user_id})
-    loans = await loans_repo.get_filtered({"user_id": user_id})
-    
-    # Get debts directly by user_id
-    debts = await debts_repo.get_filtered({"user_id": user_id}, limit=1000)
-    
-    # Filter recent data (last 6 months)
+    # Filter recent data (last 6 months) in the database
     six_months_ago = (datetime.now() - timedelta(days=180)).date()
     
-    recent_expenses = []
-    for exp in all_expenses:
-        if exp.get("expense_date"):
-            try:
-                exp_date = datetime.fromisoformat(exp["expense_date"]).date()
-                if exp_date >= six_months_ago:
-                    recent_expenses.append(exp)
-            except:
-                pass
-    
-    recent_income = []
-    for inc in all_income:
-        if inc.get("income_date"):
-            try:
-                inc_date = datetime.fromisoformat(inc["income_date"]).date()
-                if inc_date >= six_months_ago:
-                    recent_income.append(inc)
-            except:
-                pass
+    # The sources are independent, so fetch them concurrently
+    data, errors = await fetch_context_sources({
+        "accounts": lambda: accounts_repo.get_filtered({"user_id": user_id}),
+        "expenses": lambda: expenses_repo.get_all_pages(
+            {"user_id": user_id}, gte={"expense_date": six_months_ago.isoformat()}
+        ),
+        "income": lambda: income_repo.get_all_pages(
+            {"user_id": user_id}, gte={"income_date": six_months_ago.isoformat()}
+        ),
+        "budgets": lambda: budgets_repo.get_filtered({"user_id": user_id}),
+        "loans": lambda: loans_repo.get_filtered({"user_id": user_id}),
+        # Get debts directly by user_id
+        "debts": lambda: debts_repo.get_filtered({"user_id": user_id}, limit=1000),
+    })
+    
+    accounts = data.get("accounts", [])
+    recent_expenses = data.get("expenses", [])
+    recent_income = data.get("income", [])
+    budgets = data.get("budgets", [])
+    loans = data.get("loans", [])
+    debts = data.get("debts", [])
     
     # Build context parts
     context_parts = []
     
     # Accounts
     total_balance = sum(float(acc.get("balance", 0)) for acc in accounts)
-    context_parts.append(format_accounts_context(accounts, total_balance))
+    if "accounts" in errors:
+        context_parts.append(unavailable_section("ACCOUNTS", errors["accounts"]))
+    else:
+        context_parts.append(format_accounts_context(accounts, total_balance))
     
     # Expenses
-    expense_context = aggregate_expenses(recent_expenses)
-    context_parts.append(expense_context)
+    if "expenses" in errors:
+        context_parts.append(unavailable_section("EXPENSES", errors["expenses"]))
+    else:
+        context_parts.append(aggregate_expenses(recent_expenses))
     
     # Income
-    income_context = aggregate_income(recent_income)
-    context_parts.append(income_context)
+    if "income" in errors:
+        context_parts.append(unavailable_section("INCOME", errors["income"]))
+    else:
+        context_parts.append(aggregate_income(recent_income))
     
-    # Budgets
-    budget_context = analyze_budgets(budgets, recent_expenses)
-    context_parts.append(budget_context)
+    # Budgets (compared against expenses)
+    if "budgets" in errors or "expenses" in errors:
+        context_parts.append(unavailable_section("BUDGETS", errors.get("budgets") or errors["expenses"]))
+    else:
+        context_parts.append(analyze_budgets(budgets, recent_expenses))
     
     # Loans
-    loans_context = summarize_loans(loans)
-    context_parts.append(loans_context)
+    if "loans" in errors:
+        context_parts.append(unavailable_section("LOANS", errors["loans"]))
+    else:
+        context_parts.append(summarize_loans(loans))
     
     # Debts
-    debts_context = summarize_debts(debts)
-    context_parts.append(debts_context)
+    if "debts" in errors:
+        context_parts.append(unavailable_section("DEBTS", errors["debts"]))
+    else:
+        context_parts.append(summarize_debts(debts))
     
     # Financial Health
     health_metrics = calculate_financial_health(
         total_balance, recent_expenses, recent_income, budgets, loans, debts
     )
+    if errors:
+        health_metrics += f"\n- Note: computed without {', '.join(sorted(errors))} data, so these figures are incomplete."
     context_parts.append(health_metrics)
     
-    return "\n\n".join(context_parts)
+    return "\n\n".join(context_parts), not errors
 
 def format_accounts_context(accounts: list, total_balance: float) -> str:
     """Format accounts summary"""
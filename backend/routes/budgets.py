@@ -34,14 +34,11 @@ async def get_budgets(
 ):
     """Get budgets for a user"""
     try:
-        results = await budgets_repo.get_all()
-        # Filter by user_id and optionally by year
-        user_budgets = [budget for budget in results if budget.get("user_id") == str(user_id)]
-        if year:
-            user_budgets = [budget for budget in user_budgets if budget.get("year") == year]
-        
-        # Sort by year desc, month desc
-        user_budgets.sort(key=lambda x: (x.get("year", 0), x.get("month", 0)), reverse=True)
+        # Filter by user_id and optionally by year, sorted by year desc, month desc
+        user_budgets = await budgets_repo.get_all_pages(
+            {"user_id": str(user_id), "year": year},
+            order_by=[("year", True), ("month", True)]
+        )
         return [Budget(**budget) for budget in user_budgets]
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -69,14 +66,18 @@ async def get_budget_for_month(
 ):
     """Get budget for a specific month/year"""
     try:
-        results = await budgets_repo.get_all()
         # Filter by user_id, month, and year
-        budget = next((b for b in results if b.get("user_id") == str(user_id) and b.get("month") == month and b.get("year") == year), None)
+        budgets = await budgets_repo.get_filtered(
+            {"user_id": str(user_id), "month": month, "year": year},
+            limit=1
+        )
         
-        if not budget:
+        if not budgets:
             raise HTTPException(status_code=404, detail="Budget not found for this month/year")
         
-        return Budget(**budget)
+        return Budget(**budgets[0])
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
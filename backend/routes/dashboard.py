@@ -0,0 +1,126 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import List, Optional
+from datetime import date, timedelta
+from decimal import Decimal
+from uuid import UUID
+import asyncio
+
+from database import (
+    accounts_repo, budgets_repo, expenses_repo, income_repo, loans_repo, tags_repo,
+    get_name_map, get_monthly_expense_totals, get_monthly_income_totals, get_unsettled_debt_totals
+)
+from models import Account, Dashboard, DashboardTransaction
+from routes.expenses import EXPENSE_ORDER
+from routes.income import INCOME_ORDER
+
+router = APIRouter()
+
+def month_bounds(year: int, month: int):
+    """First and last day of a month"""
+    start = date(year, month, 1)
+    next_month = date(year + month // 12, month % 12 + 1, 1)
+    return start, next_month - timedelta(days=1)
+
+def build_transactions(expenses: List[dict], income: List[dict], account_names: dict,
+                       tag_names: dict) -> List[DashboardTransaction]:
+    """Merge expenses and income into one list, newest first"""
+    transactions = [
+        DashboardTransaction(
+            id=expense["expense_id"],
+            type="expense",
+            amount=Decimal(str(expense["amount"])),
+            description=expense.get("place") or "Expense",
+            tag_name=tag_names.get(expense.get("tag_id")),
+            account_name=account_names.get(expense.get("account_id")),
+            transaction_date=expense.get("expense_date")
+        )
+        for expense in expenses
+    ] + [
+        DashboardTransaction(
+            id=entry["income_id"],
+            type="income",
+            amount=Decimal(str(entry["amount"])),
+            description=entry.get("notes") or "Income",
+            tag_name=tag_names.get(entry.get("tag_id")),
+            account_name=account_names.get(entry.get("account_id")),
+            transaction_date=entry.get("income_date")
+        )
+        for entry in income
+    ]
+    transactions.sort(key=lambda transaction: transaction.transaction_date or date.min, reverse=True)
+    return transactions
+
+@router.get("/{user_id}", response_model=Dashboard)
+async def get_dashboard(
+    user_id: UUID,
+    year: Optional[int] = Query(None, ge=2020),
+    month: Optional[int] = Query(None, ge=1, le=12),
+    recent_limit: int = Query(8, ge=1, le=50),
+):
+    """Get everything the home page shows for a month (default: the current one) in one call"""
+    try:
+        today = date.today()
+        year = year or today.year
+        month = month or today.month
+        start_date, end_date = month_bounds(year, month)
+        
+        user_id_str = str(user_id)
+        month_filters = {
+            "expense": {"gte": {"expense_date": start_date.isoformat()}, "lte": {"expense_date": end_date.isoformat()}},
+            "income": {"gte": {"income_date": start_date.isoformat()}, "lte": {"income_date": end_date.isoformat()}},
+        }
+        
+        # Every section is an independent query, so run them all at once
+        (
+            accounts, monthly_expenses, monthly_income, budgets, recent_expenses, recent_income,
+            expense_count, income_count, loans, debt_totals
+        ) = await asyncio.gather(
+            accounts_repo.get_all_pages({"user_id": user_id_str}, order_by=[("created_at", False)]),
+            get_monthly_expense_totals(user_id_str, start_date, end_date),
+            get_monthly_income_totals(user_id_str, start_date, end_date),
+            budgets_repo.get_filtered({"user_id": user_id_str, "month": month, "year": year}, limit=1),
+            expenses_repo.get_all(
+                {"user_id": user_id_str}, limit=recent_limit, order_by=EXPENSE_ORDER, **month_filters["expense"]
+            ),
+            income_repo.get_all(
+                {"user_id": user_id_str}, limit=recent_limit, order_by=INCOME_ORDER, **month_filters["income"]
+            ),
+            expenses_repo.count({"user_id": user_id_str}, **month_filters["expense"]),
+            income_repo.count({"user_id": user_id_str}, **month_filters["income"]),
+            loans_repo.get_all_pages({"user_id": user_id_str}, columns="loan_id,remaining_amount,created_at"),
+            get_unsettled_debt_totals(user_id_str),
+        )
+        
+        # Account names come from the accounts already loaded; tags need one lookup
+        account_names = {account["account_id"]: account.get("account_name") for account in accounts}
+        tag_ids = {row["tag_id"] for row in recent_expenses + recent_income if row.get("tag_id")}
+        tag_names = await get_name_map(tags_repo, list(tag_ids), "tag_id", "name")
+        
+        transactions = build_transactions(recent_expenses, recent_income, account_names, tag_names)
+        
+        total_balance = sum((Decimal(str(account["balance"])) for account in accounts), Decimal('0'))
+        total_expenses = monthly_expenses.get((year, month), Decimal('0'))
+        total_income = monthly_income.get((year, month), Decimal('0'))
+        monthly_budget = Decimal(str(budgets[0]["amount"])) if budgets else None
+        total_loans = sum((Decimal(str(loan.get("remaining_amount") or 0)) for loan in loans), Decimal('0'))
+        total_debts = sum((total for total, _ in debt_totals.values()), Decimal('0'))
+        
+        return Dashboard(
+            year=year,
+            month=month,
+            accounts=[Account(**account) for account in accounts],
+            total_balance=total_balance,
+            monthly_income=total_income,
+            monthly_expenses=total_expenses,
+            monthly_budget=monthly_budget,
+            budget_remaining=monthly_budget - total_expenses if monthly_budget is not None else None,
+            transaction_count=expense_count + income_count,
+            total_loans=total_loans,
+            loan_count=len(loans),
+            total_debts=total_debts,
+            unsettled_debt_count=sum(count for _, count in debt_totals.values()),
+            net_worth=total_balance - total_loans - total_debts,
+            recent_transactions=transactions[:recent_limit]
+        )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -1,13 +1,19 @@
 from fastapi import APIRouter, HTTPException, Query
 from typing import List, Optional
 from uuid import UUID
-from datetime import date
+from datetime import date, datetime
 
-from database import SupabaseRepository, adjust_account_balance
+from database import (
+    SupabaseRepository, RpcNotAvailable, adjust_account_balance, apply_balance_deltas, notify_write,
+    apply_rollup_deltas, merge_rollup_deltas, rollup_deltas, get_reference_rows,
+    get_person_debt_totals, transfer_between_accounts, AccountNotFound
+)
 from models import Debt, DebtCreate
+from serialization import RowSerializer
 from routes.tags import get_or_create_debt_repayment_tag
 
-router = APIRouter()
+serializer = RowSerializer("debts")
+router = APIRouter(default_response_class=serializer.response_class)
 debts_repo = SupabaseRepository("debts")
 people_repo = SupabaseRepository("people")
 expenses_repo = SupabaseRepository("expenses")
@@ -83,8 +89,7 @@ async def get_debts(user_id: UUID, type: Optional[str] = Query(None), is_settled
         debts_results = await debts_repo.get_filtered(debts_filters, 1000)
         
         # Get all people for the user to enrich debt data with person names
-        people_filters = {"user_id": str(user_id)}
-        people_results = await people_repo.get_filtered(people_filters, 1000)
+        people_results = await get_reference_rows("people", str(user_id))
         people_dict = {p['person_id']: p for p in people_results}
         
         # Combine debt and person information
@@ -154,10 +159,15 @@ async def update_debt(debt_id: UUID, debt_update: DebtCreate, account_id: Option
                 new_amount = float(debt_update.amount)
                 new_account_id = account_id
                 
-                # If account changed, refund old account and deduct from new account
+                # If account changed, move the lent amount from the new account back to the old
+                # one in one atomic transfer, then settle any change in amount on the old account
                 if original_account_id and new_account_id and original_account_id != new_account_id:
-                    await adjust_account_balance(original_account_id, original_amount, "add")
-                    await adjust_account_balance(new_account_id, new_amount, "subtract")
+                    try:
+                        await transfer_between_accounts(new_account_id, original_account_id, new_amount)
+                    except AccountNotFound:
+                        raise HTTPException(status_code=404, detail="Account not found")
+                    if original_amount != new_amount:
+                        await adjust_account_balance(original_account_id, original_amount - new_amount, "add")
                 # If only amount changed and same account
                 elif original_account_id and new_account_id and original_account_id == new_account_id:
                     amount_diff = new_amount - original_amount
@@ -235,6 +245,94 @@ async def delete_debt(debt_id: UUID):
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+def get_settlement_date(debt: dict) -> str:
+    """Use the debt's date if it is a valid date, otherwise today's date"""
+    settlement_date = debt.get('debt_date')
+    if settlement_date:
+        # Convert to string if it's a date object or datetime
+        if hasattr(settlement_date, 'strftime'):
+            return settlement_date.strftime('%Y-%m-%d')
+        if isinstance(settlement_date, str):
+            # Handle string dates - ensure proper format
+            try:
+                return datetime.strptime(settlement_date, '%Y-%m-%d').strftime('%Y-%m-%d')
+            except ValueError:
+                pass
+    return date.today().strftime('%Y-%m-%d')
+
+async def settle_debts_in_bulk(debts: List[dict], person: dict, account_id: str, use_debt_date: bool = True) -> dict:
+    """Settle a set of debts against one account in a constant number of round trips
+    
+    OwedToMe debts are credited to the account (a transfer, no income entry);
+    IOwe debts are recorded as expenses paid from it. The settle_debts database
+    function does all of this in one transaction. Without it we fall back to
+    one bulk update, one batch insert and one net balance increment.
+    """
+    debt_ids = [debt['debt_id'] for debt in debts]
+    
+    try:
+        result = await debts_repo.execute_rpc("settle_debts", {
+            "p_debt_ids": debt_ids,
+            "p_account_id": account_id,
+            "p_use_debt_date": use_debt_date,
+        })
+        # The database function wrote debts, expenses and the account directly
+        notify_write("debts", debts)
+        notify_write("accounts", [{"account_id": account_id, "user_id": person["user_id"]}])
+        await apply_rollup_deltas(merge_rollup_deltas(*[
+            rollup_deltas("expense", new_row=expense) for expense in result.get("expenses") or []
+        ]))
+        return {
+            "debts_settled": int(result["debts_settled"]),
+            "total_owed_to_me": float(result["total_owed_to_me"]),
+            "total_i_owe": float(result["total_i_owe"]),
+        }
+    except RpcNotAvailable:
+        pass
+    
+    # Claim the debts first, only where still unsettled: everything below is
+    # computed from the rows this call flipped, so an overlapping settle or a
+    # retry after a partial failure never pays the same debt twice
+    settled_debts = await debts_repo.update_many(
+        debt_ids, {"is_settled": True}, "debt_id", filters={"is_settled": False}
+    )
+    total_owed_to_me = sum(float(debt['amount']) for debt in settled_debts if debt['type'] == 'OwedToMe')
+    total_i_owe = sum(float(debt['amount']) for debt in settled_debts if debt['type'] == 'IOwe')
+    
+    i_owe_debts = [debt for debt in settled_debts if debt['type'] == 'IOwe']
+    if i_owe_debts:
+        # Get account name for payment_method field
+        account = await accounts_repo.get_by_id(account_id, "account_id")
+        payment_method_name = account['account_name'] if account else "Unknown Account"
+        today = date.today().strftime('%Y-%m-%d')
+        
+        # Create one expense record per debt, in a single batch insert
+        created_expenses = await expenses_repo.create_many([
+            {
+                "user_id": person['user_id'],
+                "account_id": account_id,
+                "amount": float(debt['amount']),
+                "place": debt.get('place') or f"Settlement to {person['name']}",
+                "payment_method": payment_method_name,
+                "notes": debt.get('notes', ''),
+                "expense_date": get_settlement_date(debt) if use_debt_date else today,
+                "tag_id": debt.get('tag_id')  # Use tag_id from debt record
+            }
+            for debt in i_owe_debts
+        ])
+        await apply_rollup_deltas(merge_rollup_deltas(*[
+            rollup_deltas("expense", new_row=expense) for expense in created_expenses
+        ]))
+    
+    # Apply the net effect on the account once
+    await apply_balance_deltas({account_id: total_owed_to_me - total_i_owe})
+    
+    return {
+        "debts_settled": len(settled_debts),
+        "total_owed_to_me": total_owed_to_me,
+        "total_i_owe": total_i_owe,
+    }
+
 @router.post("/{debt_id}/settle")
 async def settle_debt(debt_id: UUID, account_id: str = Query(...)):
     """Settle a debt by creating corresponding income or expense"""
@@ -252,67 +350,10 @@ async def settle_debt(debt_id: UUID, account_id: str = Query(...)):
         if not person:
             raise HTTPException(status_code=404, detail="Associated person not found")
         
-        # Get user_id from person
-        user_id = person['user_id']
-        amount = float(debt['amount'])
-        
-        # Use debt_date if available, otherwise use today's date
-        settlement_date = debt.get('debt_date')
-        if settlement_date:
-            # Convert to string if it's a date object or datetime
-            if hasattr(settlement_date, 'strftime'):
-                settlement_date = settlement_date.strftime('%Y-%m-%d')
-            elif isinstance(settlement_date, str):
-                # Handle string dates - ensure proper format
-                try:
-                    from datetime import datetime
-                    parsed_date = datetime.strptime(settlement_date, '%Y-%m-%d')
-                    settlement_date = parsed_date.strftime('%Y-%m-%d')
-                except ValueError:
-                    # If parsing fails, use today's date
-                    settlement_date = date.today().strftime('%Y-%m-%d')
-            else:
-                settlement_date = date.today().strftime('%Y-%m-%d')
-        else:
-            settlement_date = date.today().strftime('%Y-%m-%d')
-        
-        if debt['type'] == 'OwedToMe':
-            # Transfer money from original account to settlement account
-            # No income entry is created - it's just a transfer between accounts
-            original_account_id = debt.get('account_id')
-            
-            if original_account_id:
-                # Subtract from original account (if it exists)
-                # Note: The amount was already deducted when debt was created
-                # So we just need to add to the settlement account
-                await adjust_account_balance(account_id, amount, "add")
-            else:
-                # If no original account, just add to settlement account
-                await adjust_account_balance(account_id, amount, "add")
-            
-        elif debt['type'] == 'IOwe':
-            # Get account name for payment_method field
-            account = await accounts_repo.get_by_id(account_id, "account_id")
-            payment_method_name = account['account_name'] if account else "Unknown Account"
-            
-            # Create expense record
-            expense_data = {
-                "user_id": user_id,
-                "account_id": account_id,
-                "amount": amount,
-                "place": debt.get('place') or f"Settlement to {person['name']}",
-                "payment_method": payment_method_name,
-                "notes": debt.get('notes', ''),
-                "expense_date": settlement_date,
-                "tag_id": debt.get('tag_id')  # Use tag_id from debt record
-            }
-            await expenses_repo.create(expense_data)
-            
-            # Subtract money from account
-            await adjust_account_balance(account_id, amount, "subtract")
-        
-        # Mark debt as settled
-        await debts_repo.update(str(debt_id), {"is_settled": True}, "debt_id")
+        settlement = await settle_debts_in_bulk([debt], person, account_id)
+        if not settlement["debts_settled"]:
+            # A concurrent request settled it first
+            raise HTTPException(status_code=400, detail="Debt is already settled")
         
         return {"message": f"Debt settled successfully{' and recorded as expense' if debt['type'] == 'IOwe' else ''}"}
     except HTTPException:
@@ -335,78 +376,21 @@ async def settle_debts_by_type(person_id: UUID, account_id: str = Query(...), de
         
         # Get all unsettled debts of the specified type for this person
         debts_filters = {"person_id": str(person_id), "is_settled": False, "type": debt_type}
-        unsettled_debts = await debts_repo.get_filtered(debts_filters, 1000)
+        unsettled_debts = await debts_repo.get_all_pages(debts_filters)
         
         if not unsettled_debts:
             raise HTTPException(status_code=400, detail=f"No unsettled {debt_type} debts found for this person")
         
-        user_id = person['user_id']
-        records_created = []
-        
-        # Process each debt separately
-        for debt in unsettled_debts:
-            amount = float(debt['amount'])
-            
-            # Use debt_date if available, otherwise use today's date
-            settlement_date = debt.get('debt_date')
-            if settlement_date:
-                if hasattr(settlement_date, 'strftime'):
-                    settlement_date = settlement_date.strftime('%Y-%m-%d')
-                elif isinstance(settlement_date, str):
-                    try:
-                        from datetime import datetime
-                        parsed_date = datetime.strptime(settlement_date, '%Y-%m-%d')
-                        settlement_date = parsed_date.strftime('%Y-%m-%d')
-                    except ValueError:
-                        settlement_date = date.today().strftime('%Y-%m-%d')
-                else:
-                    settlement_date = date.today().strftime('%Y-%m-%d')
-            else:
-                settlement_date = date.today().strftime('%Y-%m-%d')
-            
-            if debt_type == 'OwedToMe':
-                # Transfer money from original account to settlement account
-                # No income entry is created - it's just a transfer between accounts
-                original_account_id = debt.get('account_id')
-                
-                if original_account_id:
-                    # Add to settlement account (amount was already deducted when debt was created)
-                    await adjust_account_balance(account_id, amount, "add")
-                else:
-                    # If no original account, just add to settlement account
-                    await adjust_account_balance(account_id, amount, "add")
-                records_created.append(f"Transfer: ${amount}")
-                
-            elif debt_type == 'IOwe':
-                # Get account name for payment_method field
-                account = await accounts_repo.get_by_id(account_id, "account_id")
-                payment_method_name = account['account_name'] if account else "Unknown Account"
-                
-                # Create separate expense record for each debt
-                expense_data = {
-                    "user_id": user_id,
-                    "account_id": account_id,
-                    "amount": amount,
-                    "place": debt.get('place') or f"Settlement to {person['name']}",
-                    "payment_method": payment_method_name,
-                    "notes": debt.get('notes', ''),
-                    "expense_date": settlement_date,
-                    "tag_id": debt.get('tag_id')  # Use tag_id from debt record
-                }
-                await expenses_repo.create(expense_data)
-                await adjust_account_balance(account_id, amount, "subtract")
-                records_created.append(f"Expense: ${amount}")
-            
-            # Mark this debt as settled
-            await debts_repo.update(debt['debt_id'], {"is_settled": True}, "debt_id")
+        # Each debt still becomes a separate transfer/expense record
+        settlement = await settle_debts_in_bulk(unsettled_debts, person, account_id)
         
-        total_amount = sum(float(debt['amount']) for debt in unsettled_debts)
+        total_amount = settlement["total_owed_to_me"] + settlement["total_i_owe"]
         record_type = "transfers" if debt_type == 'OwedToMe' else "expense records"
         
         return {
-            "message": f"Settled {len(unsettled_debts)} {debt_type} debts with {person['name']} as separate {record_type}",
+            "message": f"Settled {settlement['debts_settled']} {debt_type} debts with {person['name']} as separate {record_type}",
             "total_amount": total_amount,
-            "records_created": len(records_created),
+            "records_created": settlement["debts_settled"],
             "debt_type": debt_type
         }
     except HTTPException:
@@ -425,67 +409,22 @@ async def settle_net_debts_for_person(person_id: UUID, account_id: str = Query(.
         
         # Get all unsettled debts for this person
         debts_filters = {"person_id": str(person_id), "is_settled": False}
-        unsettled_debts = await debts_repo.get_filtered(debts_filters, 1000)
+        unsettled_debts = await debts_repo.get_all_pages(debts_filters)
         
         if not unsettled_debts:
             raise HTTPException(status_code=400, detail="No unsettled debts found for this person")
         
-        user_id = person['user_id']
-        total_owed_to_me = 0
-        total_i_owe = 0
+        # Create separate records for each debt (like settle-by-type but for all types),
+        # dated today rather than on the original debt date
+        settlement = await settle_debts_in_bulk(unsettled_debts, person, account_id, use_debt_date=False)
         
-        # Calculate totals
-        for debt in unsettled_debts:
-            amount = float(debt['amount'])
-            if debt['type'] == 'OwedToMe':
-                total_owed_to_me += amount
-            elif debt['type'] == 'IOwe':
-                total_i_owe += amount
+        records_created = [
+            f"{'Transfer' if debt['type'] == 'OwedToMe' else 'Expense'}: ${float(debt['amount'])}"
+            for debt in unsettled_debts
+        ]
         
-        # Create separate records for each debt (like settle-by-type but for all types)
-        records_created = []
-        
-        for debt in unsettled_debts:
-            amount = float(debt['amount'])
-            
-            # Use today's date for net settlement
-            settlement_date = date.today().strftime('%Y-%m-%d')
-            
-            if debt['type'] == 'OwedToMe':
-                # Transfer money from original account to settlement account
-                # No income entry is created - it's just a transfer between accounts
-                original_account_id = debt.get('account_id')
-                
-                if original_account_id:
-                    # Add to settlement account (amount was already deducted when debt was created)
-                    await adjust_account_balance(account_id, amount, "add")
-                else:
-                    # If no original account, just add to settlement account
-                    await adjust_account_balance(account_id, amount, "add")
-                records_created.append(f"Transfer: ${amount}")
-                
-            elif debt['type'] == 'IOwe':
-                # Get account name for payment_method field
-                account = await accounts_repo.get_by_id(account_id, "account_id")
-                payment_method_name = account['account_name'] if account else "Unknown Account"
-                
-                # Create separate expense record for each debt
-                expense_data = {
-                    "user_id": user_id,
-                    "account_id": account_id,
-                    "amount": amount,
-                    "place": debt.get('place') or f"Settlement to {person['name']}",
-                    "payment_method": payment_method_name,
-                    "notes": debt.get('notes', ''),
-                    "expense_date": settlement_date,
-                    "tag_id": debt.get('tag_id')  # Use tag_id from debt record
-                }
-                await expenses_repo.create(expense_data)
-                await adjust_account_balance(account_id, amount, "subtract")
-                records_created.append(f"Expense: ${amount}")
-            
-            # Mark this debt as settled
-            await debts_repo.update(debt['debt_id'], {"is_settled": True}, "debt_id")
+        total_owed_to_me = settlement["total_owed_to_me"]
+        total_i_owe = settlement["total_i_owe"]
         
         # Calculate net amount for display purposes
         net_amount = total_owed_to_me - total_i_owe
@@ -496,7 +435,7 @@ async def settle_net_debts_for_person(person_id: UUID, account_id: str = Query(.
             "message": f"Net settlement with {person['name']} completed - created {len(records_created)} separate {record_type}",
             "net_amount": abs(net_amount),
             "records_created": len(records_created),
-            "debts_settled": len(unsettled_debts),
+            "debts_settled": settlement["debts_settled"],
             "details": records_created
         }
     except HTTPException:
@@ -504,63 +443,72 @@ async def settle_net_debts_for_person(person_id: UUID, account_id: str = Query(.
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+def build_person_summary(person_id: str, totals: dict) -> dict:
+    """Per-person debt summary entry from get_person_debt_totals"""
+    owed_to_me = float(totals["owed_to_me"])
+    i_owe = float(totals["i_owe"])
+    net_amount = owed_to_me - i_owe
+    return {
+        "person_id": person_id,
+        "person_name": totals["person_name"],
+        "owed_to_me": owed_to_me,
+        "i_owe": i_owe,
+        "net_amount": net_amount,
+        "type": "owed_to_me" if net_amount > 0 else ("i_owe" if net_amount < 0 else "settled"),
+        "debts_count": totals["debt_count"],
+    }
+
 @router.get("/summary/{user_id}")
 async def get_debt_summary(user_id: UUID):
     """Get debt summary for a user"""
     try:
-        # Get all unsettled debts for the user directly
-        debts_filters = {"user_id": str(user_id), "is_settled": False}
-        all_debts = await debts_repo.get_filtered(debts_filters, 1000)
+        # Per-person totals are grouped by the database
+        person_totals = await get_person_debt_totals(str(user_id))
+        people = [build_person_summary(person_id, totals) for person_id, totals in person_totals.items()]
+        people.sort(key=lambda person: (person["person_name"] or "").lower())
         
-        # Get all people for the user to get person names
-        people_filters = {"user_id": str(user_id)}
-        people_results = await people_repo.get_filtered(people_filters, 1000)
-        people_dict = {p['person_id']: p for p in people_results}
+        total_owed_to_me = sum(person["owed_to_me"] for person in people)
+        total_i_owe = sum(person["i_owe"] for person in people)
         
-        summary = {
-            "total_owed_to_me": 0,
-            "total_i_owe": 0,
-            "net_balance": 0,
-            "people_count": len(people_results),
-            "debts_count": len(all_debts),
-            "net_settlements": []
+        return {
+            "total_owed_to_me": total_owed_to_me,
+            "total_i_owe": total_i_owe,
+            # Net balance: owed to me - i owe
+            "net_balance": total_owed_to_me - total_i_owe,
+            "people_count": len(people),
+            "debts_count": sum(person["debts_count"] for person in people),
+            "net_settlements": [
+                {
+                    "person_id": person["person_id"],
+                    "person_name": person["person_name"],
+                    "net_amount": person["net_amount"],
+                    "type": person["type"],
+                }
+                for person in people
+                if person["net_amount"] != 0
+            ],
+            "people": people,
         }
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/person/{person_id}/summary")
+async def get_person_debt_summary(person_id: UUID):
+    """Get unsettled debt totals for one person"""
+    try:
+        person = await people_repo.get_by_id(str(person_id), "person_id")
+        if not person:
+            raise HTTPException(status_code=404, detail="Person not found")
         
-        # Group debts by person and calculate totals
-        person_totals = {}
-        for debt in all_debts:
-            person_id = debt['person_id']
-            if person_id not in person_totals:
-                person_totals[person_id] = {"owed_to_me": 0, "i_owe": 0}
-            
-            if debt['type'] == 'OwedToMe':
-                person_totals[person_id]["owed_to_me"] += float(debt['amount'])
-            elif debt['type'] == 'IOwe':
-                person_totals[person_id]["i_owe"] += float(debt['amount'])
-        
-        # Calculate totals and net settlements
-        for person_id, totals in person_totals.items():
-            person = people_dict.get(person_id)
-            if person:
-                person_owed_to_me = totals["owed_to_me"]
-                person_i_owe = totals["i_owe"]
-                
-                summary["total_owed_to_me"] += person_owed_to_me
-                summary["total_i_owe"] += person_i_owe
-                
-                # Calculate net for this person
-                net_amount = person_owed_to_me - person_i_owe
-                if net_amount != 0:
-                    summary["net_settlements"].append({
-                        "person_id": person_id,
-                        "person_name": person['name'],
-                        "net_amount": net_amount,
-                        "type": "owed_to_me" if net_amount > 0 else "i_owe"
-                    })
-        
-        # Calculate net balance: owed to me - i owe
-        summary["net_balance"] = summary["total_owed_to_me"] - summary["total_i_owe"]
-        
-        return summary
+        person_totals = await get_person_debt_totals(str(person["user_id"]), str(person_id))
+        totals = person_totals.get(str(person_id)) or {
+            "person_name": person["name"],
+            "owed_to_me": 0,
+            "i_owe": 0,
+            "debt_count": 0,
+        }
+        return build_person_summary(str(person_id), totals)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e)) 
\ No newline at end of file
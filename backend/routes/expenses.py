@@ -1,44 +1,55 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile
 from typing import List, Optional
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from decimal import Decimal
 from uuid import UUID
+import asyncio
 
-from database import expenses_repo, accounts_repo, budgets_repo, get_db, adjust_account_balance, handle_expense_balance_changes, SupabaseRepository
+from bulk_import import import_transactions
+from database import expenses_repo, accounts_repo, budgets_repo, get_db, adjust_account_balance, handle_expense_balance_changes, attach_account_and_tag_names, get_matching_tag_ids, get_monthly_expense_totals, record_rollup_change, SupabaseRepository
 from models import (
     Expense, ExpenseCreate, ExpenseWithAccount, ExpenseWithAccountAndTag,
     BudgetSummary, Budget
 )
+from serialization import RowSerializer
 
-router = APIRouter()
+serializer = RowSerializer("expenses")
+router = APIRouter(default_response_class=serializer.response_class)
 
 # Initialize tags repository
 tags_repo = SupabaseRepository("tags")
 
+# Listing order; expense_id breaks ties so the sort key is unique for keyset paging
+EXPENSE_ORDER = [("expense_date", True), ("expense_id", True)]
+
+def build_expense_data(expense: ExpenseCreate) -> dict:
+    """Row to insert for a new expense"""
+    expense_date = expense.expense_date or date.today()
+    
+    # Handle date conversion properly
+    if isinstance(expense_date, str):
+        try:
+            expense_date = datetime.fromisoformat(expense_date.replace('Z', '')).date()
+        except:
+            expense_date = date.today()
+    
+    return {
+        "user_id": str(expense.user_id),
+        "account_id": str(expense.account_id) if expense.account_id else None,
+        "amount": float(expense.amount),
+        "place": expense.place or "",
+        "payment_method": expense.payment_method or "",
+        "notes": expense.notes or "",
+        "expense_date": expense_date.strftime('%Y-%m-%d'),
+        "tag_id": str(expense.tag_id) if expense.tag_id else None
+    }
+
 @router.post("/", response_model=Expense)
 async def create_expense(expense: ExpenseCreate):
     """Create a new expense and update account balance if account_id provided"""
     try:
         # Prepare expense data
-        expense_date = expense.expense_date or date.today()
-        
-        # Handle date conversion properly
-        if isinstance(expense_date, str):
-            try:
-                expense_date = datetime.fromisoformat(expense_date.replace('Z', '')).date()
-            except:
-                expense_date = date.today()
-        
-        expense_data = {
-            "user_id": str(expense.user_id),
-            "account_id": str(expense.account_id) if expense.account_id else None,
-            "amount": float(expense.amount),
-            "place": expense.place or "",
-            "payment_method": expense.payment_method or "",
-            "notes": expense.notes or "",
-            "expense_date": expense_date.strftime('%Y-%m-%d'),
-            "tag_id": str(expense.tag_id) if expense.tag_id else None
-        }
+        expense_data = build_expense_data(expense)
         
         # Insert expense
         result = await expenses_repo.create(expense_data)
@@ -51,90 +62,83 @@ async def create_expense(expense: ExpenseCreate):
                 "subtract"
             )
         
+        await record_rollup_change("expense", new_row=result)
+        
         return Expense(**result)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/import")
+async def import_expenses(
+    user_id: UUID,
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, description="csv or ndjson; detected from the file name if omitted"),
+):
+    """Bulk import expenses from a CSV or NDJSON file"""
+    try:
+        return await import_transactions(
+            file, str(user_id), ExpenseCreate, build_expense_data, expenses_repo,
+            kind="expense", balance_sign=-1, file_format=format
+        )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/", response_model=List[ExpenseWithAccountAndTag])
 async def get_expenses(
+    response: Response,
     user_id: UUID,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     tag_name: Optional[str] = None,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
 ):
-    """Get user's expenses with optional filters"""
+    """Get user's expenses with optional filters
+    
+    Pass the X-Next-Cursor header of a page as `cursor` to get the next one
+    (skip only applies to the first page and is ignored with a cursor);
+    include_total adds an X-Total-Count header.
+    """
     try:
         # Build filters
         filters = {"user_id": str(user_id)}
-        
-        # Get expenses using improved filtering
-        expenses = await expenses_repo.get_filtered(filters, limit=1000)  # Get more than needed
+        in_filters = {}
         
         # Filter by tag name if provided
         if tag_name:
-            # Get all tags for this user first
-            user_tags = await tags_repo.get_filtered({"user_id": str(user_id)}, limit=1000)
-            # Find tags that match the search
-            matching_tag_ids = [tag["tag_id"] for tag in user_tags if tag_name.lower() in tag.get("name", "").lower()]
-            # Filter expenses by matching tag IDs
-            expenses = [exp for exp in expenses if exp.get("tag_id") in matching_tag_ids]
-        
-        # Filter by date if provided
-        if start_date or end_date:
-            filtered_expenses = []
-            for expense in expenses:
-                expense_date_str = expense.get("expense_date")
-                if expense_date_str:
-                    try:
-                        expense_date = datetime.fromisoformat(expense_date_str).date()
-                        if start_date and expense_date < start_date:
-                            continue
-                        if end_date and expense_date > end_date:
-                            continue
-                    except ValueError:
-                        continue
-                filtered_expenses.append(expense)
-            expenses = filtered_expenses
-        
-        # Get total count
-        total_count = len(expenses)
-        
-        # Apply pagination
-        if skip:
-            expenses = expenses[skip:]
-        if limit:
-            expenses = expenses[:limit]
-        
-        # Add account names and tag names
-        result = []
-        for expense in expenses:
-            expense_data = expense.copy()
-            
-            # Add account name
-            if expense.get("account_id"):
-                try:
-                    account = await accounts_repo.get_by_id(expense["account_id"], "account_id")
-                    expense_data["account_name"] = account["account_name"] if account else None
-                except:
-                    expense_data["account_name"] = None
-            else:
-                expense_data["account_name"] = None
-            
-            # Add tag name
-            if expense.get("tag_id"):
-                try:
-                    tag = await tags_repo.get_by_id(expense["tag_id"], "tag_id")
-                    expense_data["tag_name"] = tag["name"] if tag else None
-                except:
-                    expense_data["tag_name"] = None
-            else:
-                expense_data["tag_name"] = None
-            
-            result.append(ExpenseWithAccountAndTag(**expense_data))
-        
-        return result
+            in_filters["tag_id"] = await get_matching_tag_ids(str(user_id), tag_name)
+        
+        # Date range, ordering (newest first) and keyset pagination are applied by the database
+        query_filters = {
+            "gte": {"expense_date": start_date.isoformat() if start_date else None},
+            "lte": {"expense_date": end_date.isoformat() if end_date else None},
+            "in_filters": in_filters,
+        }
+        page_query = expenses_repo.get_page(
+            filters,
+            limit=limit,
+            cursor=cursor,
+            order_by=EXPENSE_ORDER,
+            # The cursor already marks where the page starts
+            offset=0 if cursor else skip,
+            **query_filters,
+        )
+        if include_total:
+            (expenses, next_cursor), total = await asyncio.gather(
+                page_query, expenses_repo.count(filters, **query_filters)
+            )
+            response.headers["X-Total-Count"] = str(total)
+        else:
+            expenses, next_cursor = await page_query
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        
+        # Add account names and tag names with one lookup per table
+        enriched_expenses = await attach_account_and_tag_names(expenses)
+        
+        return serializer.list_response(ExpenseWithAccountAndTag, enriched_expenses, response)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -146,13 +150,18 @@ async def get_budget_summary(
 ):
     """Get budget summary for a specific month/year"""
     try:
-        # Get budget for the specific month/year using proper filtering
+        # Get the month's budget and its aggregated spend concurrently
         budget_filters = {
             "user_id": str(user_id),
             "month": month,
             "year": year
         }
-        budgets = await budgets_repo.get_filtered(budget_filters, limit=1)
+        month_start = date(year, month, 1)
+        month_end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+        budgets, monthly_totals = await asyncio.gather(
+            budgets_repo.get_filtered(budget_filters, limit=1),
+            get_monthly_expense_totals(str(user_id), month_start, month_end - timedelta(days=1)),
+        )
         
         budget_obj = None
         budget_amount = Decimal('0')
@@ -161,17 +170,7 @@ async def get_budget_summary(
             budget_obj = Budget(**budgets[0])
             budget_amount = Decimal(str(budgets[0]["amount"]))
         
-        # Calculate total expenses for the month
-        # Get expenses for the user (we'll filter by date in memory since date filtering is complex)
-        expense_filters = {"user_id": str(user_id)}
-        user_expenses = await expenses_repo.get_filtered(expense_filters, limit=1000)
-        
-        total_expenses = Decimal('0')
-        for expense in user_expenses:
-            if expense.get("expense_date"):
-                expense_date = datetime.fromisoformat(expense["expense_date"]).date()
-                if expense_date.month == month and expense_date.year == year:
-                    total_expenses += Decimal(str(expense["amount"]))
+        total_expenses = monthly_totals.get((year, month), Decimal('0'))
         
         remaining_budget = budget_amount - total_expenses
         
@@ -185,6 +184,37 @@ async def get_budget_summary(
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.get("/budget-summary/yearly", response_model=List[BudgetSummary])
+async def get_yearly_budget_summary(
+    user_id: UUID,
+    year: int = Query(..., ge=2020),
+):
+    """Get budget vs. spend for every month of a year in one call"""
+    try:
+        # One query for the year's budgets and one aggregate for the year's spend
+        budgets, monthly_totals = await asyncio.gather(
+            budgets_repo.get_filtered({"user_id": str(user_id), "year": year}, limit=12),
+            get_monthly_expense_totals(str(user_id), date(year, 1, 1), date(year, 12, 31)),
+        )
+        budgets_by_month = {budget["month"]: budget for budget in budgets}
+        
+        summaries = []
+        for month in range(1, 13):
+            budget = budgets_by_month.get(month)
+            budget_amount = Decimal(str(budget["amount"])) if budget else Decimal('0')
+            total_expenses = monthly_totals.get((year, month), Decimal('0'))
+            summaries.append(BudgetSummary(
+                budget=Budget(**budget) if budget else None,
+                total_expenses=total_expenses,
+                remaining_budget=budget_amount - total_expenses,
+                month=month,
+                year=year
+            ))
+        
+        return summaries
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/{expense_id}", response_model=ExpenseWithAccountAndTag)
 async def get_expense(expense_id: UUID):
     """Get a specific expense"""
@@ -250,6 +280,8 @@ async def update_expense(
         if not result:
             raise HTTPException(status_code=404, detail="Expense not found")
         
+        await record_rollup_change("expense", old_expense, result)
+        
         return Expense(**result)
     except HTTPException:
         raise
@@ -280,6 +312,8 @@ async def delete_expense(expense_id: UUID):
         if not success:
             raise HTTPException(status_code=404, detail="Expense not found")
         
+        await record_rollup_change("expense", old_row=expense)
+        
         return {"message": "Expense deleted successfully and amount refunded"}
     except HTTPException:
         raise
@@ -0,0 +1,182 @@
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import Any, AsyncIterator, Dict, List, Optional
+from uuid import UUID
+import asyncio
+import csv
+import io
+import json
+import logging
+
+from database import (
+    PAGE_SIZE, debts_repo, expenses_repo, income_repo, loan_disbursements_repo, loans_repo, get_reference_rows
+)
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Rows read per keyset page
+EXPORT_PAGE_SIZE = PAGE_SIZE
+
+# Exported tables in output order. Each is read in keyset pages ordered by
+# order_by, whose last column is the table's primary key. The date columns are
+# nullable; undated rows sort after dated ones and the cursor matches them with
+# is null, so they are paged through like any other row.
+EXPORT_SECTIONS: Dict[str, Dict[str, Any]] = {
+    "expenses": {
+        "type": "expense",
+        "repo": expenses_repo,
+        "id_column": "expense_id",
+        "date_column": "expense_date",
+        "order_by": [("expense_date", False), ("expense_id", False)],
+    },
+    "income": {
+        "type": "income",
+        "repo": income_repo,
+        "id_column": "income_id",
+        "date_column": "income_date",
+        "order_by": [("income_date", False), ("income_id", False)],
+    },
+    "debts": {
+        "type": "debt",
+        "repo": debts_repo,
+        "id_column": "debt_id",
+        "date_column": "debt_date",
+        "order_by": [("created_at", False), ("debt_id", False)],
+    },
+    "loans": {
+        "type": "loan",
+        "repo": loans_repo,
+        "id_column": "loan_id",
+        "date_column": "created_at",
+        "order_by": [("created_at", False), ("loan_id", False)],
+    },
+    "disbursements": {
+        "type": "disbursement",
+        "repo": loan_disbursements_repo,
+        "id_column": "disbursement_id",
+        "date_column": "disbursement_date",
+        "order_by": [("disbursement_date", False), ("disbursement_id", False)],
+    },
+}
+
+# One flat column set shared by every section so the CSV is a single table
+CSV_COLUMNS = [
+    "type", "id", "date", "amount", "account_name", "tag_name", "person_name", "loan_name",
+    "place", "payment_method", "notes", "debt_type", "is_settled", "remaining_amount", "created_at",
+]
+
+# Name added next to each referenced ID
+NAME_COLUMNS = {
+    "account_id": "account_name",
+    "tag_id": "tag_name",
+    "person_id": "person_name",
+    "loan_id": "loan_name",
+}
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+async def load_name_maps(user_id: str) -> Dict[str, Dict[str, str]]:
+    """Names of every account, tag, person and loan the user has, keyed by ID"""
+    accounts, tags, people, loans = await asyncio.gather(
+        get_reference_rows("accounts", user_id),
+        get_reference_rows("tags", user_id),
+        get_reference_rows("people", user_id),
+        loans_repo.get_all_pages({"user_id": user_id}, columns="loan_id,loan_name,created_at"),
+    )
+    return {
+        "account_id": {row["account_id"]: row.get("account_name") for row in accounts},
+        "tag_id": {row["tag_id"]: row.get("name") for row in tags},
+        "person_id": {row["person_id"]: row.get("name") for row in people},
+        "loan_id": {row["loan_id"]: row.get("loan_name") for row in loans},
+    }
+
+def attach_names(row: Dict[str, Any], name_maps: Dict[str, Dict[str, str]]) -> Dict[str, Any]:
+    """Copy of row with account_name/tag_name/person_name/loan_name for the IDs it references"""
+    record = dict(row)
+    for id_column, names in name_maps.items():
+        if row.get(id_column):
+            record.setdefault(NAME_COLUMNS[id_column], names.get(row[id_column]))
+    return record
+
+def to_csv_row(section: Dict[str, Any], record: Dict[str, Any]) -> List[Any]:
+    """Flatten an enriched record into CSV_COLUMNS order"""
+    values = {
+        "type": section["type"],
+        "id": record.get(section["id_column"]),
+        "date": record.get(section["date_column"]),
+        "amount": record.get("total_amount") if section["type"] == "loan" else record.get("amount"),
+        "debt_type": record.get("type") if section["type"] == "debt" else None,
+    }
+    return [values[column] if column in values else record.get(column) for column in CSV_COLUMNS]
+
+async def stream_ledger(user_id: str, sections: List[str], file_format: str,
+                        name_maps: Dict[str, Dict[str, str]]) -> AsyncIterator[str]:
+    """Yield the export one page of rows at a time"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    
+    if file_format == "csv":
+        writer.writerow(CSV_COLUMNS)
+    
+    for section_name in sections:
+        section = EXPORT_SECTIONS[section_name]
+        pages = section["repo"].iter_pages(
+            {"user_id": user_id}, order_by=section["order_by"], page_size=EXPORT_PAGE_SIZE
+        )
+        async for page in pages:
+            for row in page:
+                record = attach_names(row, name_maps)
+                if file_format == "csv":
+                    writer.writerow(to_csv_row(section, record))
+                else:
+                    buffer.write(json.dumps({"record_type": section["type"], **record}, default=str))
+                    buffer.write("\n")
+            
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    
+    if buffer.tell():
+        yield buffer.getvalue()
+
+@router.get("/{user_id}")
+async def export_ledger(
+    user_id: UUID,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    sections: Optional[List[str]] = Query(None, description="Tables to include; defaults to all of them"),
+):
+    """Stream a user's expenses, income, debts, loans and disbursements as NDJSON or CSV"""
+    selected = sections or list(EXPORT_SECTIONS)
+    unknown = [name for name in selected if name not in EXPORT_SECTIONS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown sections: {', '.join(unknown)}; expected any of: {', '.join(EXPORT_SECTIONS)}"
+        )
+    
+    user_id_str = str(user_id)
+    
+    # Resolved before streaming starts so a failure here is still a clean 400
+    try:
+        name_maps = await load_name_maps(user_id_str)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    async def generate():
+        try:
+            async for chunk in stream_ledger(user_id_str, selected, format, name_maps):
+                yield chunk
+        except Exception as e:
+            # Headers are already sent, so the client only sees a truncated body
+            logger.error(f"Export for user {user_id_str} failed: {str(e)}")
+            raise
+    
+    return StreamingResponse(
+        generate(),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="ledger-{user_id_str}.{format}"'}
+    )
@@ -1,108 +1,122 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, File, HTTPException, Query, Response, UploadFile
 from typing import List, Optional
 from datetime import date
 from uuid import UUID
+import asyncio
 
-from database import SupabaseRepository, adjust_account_balance
+from bulk_import import import_transactions
+from database import SupabaseRepository, adjust_account_balance, attach_account_and_tag_names, get_matching_tag_ids, record_rollup_change
 from models import Income, IncomeCreate, IncomeWithAccount, IncomeWithAccountAndTag
+from serialization import RowSerializer
 
-router = APIRouter()
+serializer = RowSerializer("income")
+router = APIRouter(default_response_class=serializer.response_class)
 income_repo = SupabaseRepository("income")
 tags_repo = SupabaseRepository("tags")
 
+# Listing order; income_id breaks ties so the sort key is unique for keyset paging
+INCOME_ORDER = [("income_date", True), ("income_id", True)]
+
+def build_income_data(income: IncomeCreate) -> dict:
+    """Row to insert for a new income entry"""
+    income_date = income.income_date or date.today()
+    
+    return {
+        "user_id": str(income.user_id),
+        "account_id": str(income.account_id),
+        "amount": float(income.amount),
+        "notes": income.notes or "",
+        "income_date": income_date.strftime('%Y-%m-%d'),
+        "tag_id": str(income.tag_id) if income.tag_id else None,
+    }
+
 @router.post("/", response_model=Income)
 async def create_income(income: IncomeCreate):
     """Create a new income entry and update account balance if account_id provided"""
     try:
-        income_date = income.income_date or date.today()
-        
-        income_data = {
-            "user_id": str(income.user_id),
-            "account_id": str(income.account_id),
-            "amount": float(income.amount),
-            "notes": income.notes or "",
-            "income_date": income_date.strftime('%Y-%m-%d'),
-            "tag_id": str(income.tag_id) if income.tag_id else None,
-        }
+        income_data = build_income_data(income)
         
         result = await income_repo.create(income_data)
         
         # Update account balance
         await adjust_account_balance(str(income.account_id), float(income.amount), "add")
         
+        await record_rollup_change("income", new_row=result)
+        
         return Income(**result)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/import")
+async def import_income(
+    user_id: UUID,
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, description="csv or ndjson; detected from the file name if omitted"),
+):
+    """Bulk import income from a CSV or NDJSON file"""
+    try:
+        return await import_transactions(
+            file, str(user_id), IncomeCreate, build_income_data, income_repo,
+            kind="income", balance_sign=1, file_format=format
+        )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/", response_model=List[IncomeWithAccountAndTag])
 async def get_income(
+    response: Response,
     user_id: UUID,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     tag_name: Optional[str] = None,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
 ):
-    """Get user's income with optional filters"""
+    """Get user's income with optional filters
+    
+    Pass the X-Next-Cursor header of a page as `cursor` to get the next one
+    (skip only applies to the first page and is ignored with a cursor);
+    include_total adds an X-Total-Count header.
+    """
     try:
         filters = {"user_id": str(user_id)}
-        
-        # Get income records (get all for proper filtering and counting)
-        income_records = await income_repo.get_filtered(filters, 10000)  # High limit to get all
-        
-        # Apply additional filters in Python
-        filtered_records = income_records
+        in_filters = {}
         
         # Filter by tag name if provided
         if tag_name:
-            # Get all tags for this user first
-            user_tags = await tags_repo.get_filtered({"user_id": str(user_id)}, limit=1000)
-            # Find tags that match the search
-            matching_tag_ids = [tag["tag_id"] for tag in user_tags if tag_name.lower() in tag.get("name", "").lower()]
-            # Filter income by matching tag IDs
-            filtered_records = [r for r in filtered_records if r.get("tag_id") in matching_tag_ids]
+            in_filters["tag_id"] = await get_matching_tag_ids(str(user_id), tag_name)
         
-        if start_date:
-            filtered_records = [r for r in filtered_records if r.get('income_date') and r['income_date'] >= start_date.strftime('%Y-%m-%d')]
-        
-        if end_date:
-            filtered_records = [r for r in filtered_records if r.get('income_date') and r['income_date'] <= end_date.strftime('%Y-%m-%d')]
-        
-        # Sort by income_date descending
-        filtered_records.sort(key=lambda x: x.get('income_date', ''), reverse=True)
-        
-        # Get total count before pagination
-        total_count = len(filtered_records)
+        # Date range, ordering (newest first) and keyset pagination are applied by the database
+        query_filters = {
+            "gte": {"income_date": start_date.isoformat() if start_date else None},
+            "lte": {"income_date": end_date.isoformat() if end_date else None},
+            "in_filters": in_filters,
+        }
+        page_query = income_repo.get_page(
+            filters,
+            limit=limit,
+            cursor=cursor,
+            order_by=INCOME_ORDER,
+            # The cursor already marks where the page starts
+            offset=0 if cursor else skip,
+            **query_filters,
+        )
+        if include_total:
+            (paginated_records, next_cursor), total = await asyncio.gather(
+                page_query, income_repo.count(filters, **query_filters)
+            )
+            response.headers["X-Total-Count"] = str(total)
+        else:
+            paginated_records, next_cursor = await page_query
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         
-        # Apply skip and limit
-        paginated_records = filtered_records[skip:skip + limit]
+        # Enrich with account names and tag names with one lookup per table
+        enriched_records = await attach_account_and_tag_names(paginated_records)
         
-        # Enrich with account names and tag names
-        from database import accounts_repo
-        result = []
-        for record in paginated_records:
-            income_data = dict(record)
-            
-            # Add account name
-            if income_data.get('account_id'):
-                account = await accounts_repo.get_by_id(income_data['account_id'], "account_id")
-                income_data['account_name'] = account.get('account_name') if account else None
-            else:
-                income_data['account_name'] = None
-            
-            # Add tag name
-            if income_data.get('tag_id'):
-                try:
-                    tag = await tags_repo.get_by_id(income_data['tag_id'], "tag_id")
-                    income_data['tag_name'] = tag['name'] if tag else None
-                except:
-                    income_data['tag_name'] = None
-            else:
-                income_data['tag_name'] = None
-            
-            result.append(IncomeWithAccountAndTag(**income_data))
-        
-        return result
+        return serializer.list_response(IncomeWithAccountAndTag, enriched_records, response)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -165,6 +179,8 @@ async def update_income(income_id: UUID, income_update: IncomeCreate):
         # Update the income entry
         result = await income_repo.update(str(income_id), update_data, "income_id")
         
+        await record_rollup_change("income", old_income, result)
+        
         return Income(**result)
     except HTTPException:
         raise
@@ -192,6 +208,8 @@ async def delete_income(income_id: UUID):
         if not success:
             raise HTTPException(status_code=404, detail="Income entry not found")
         
+        await record_rollup_change("income", old_row=income_data)
+        
         return {"message": "Income entry deleted successfully"}
     except HTTPException:
         raise
@@ -206,9 +224,13 @@ async def get_monthly_income_summary(
 ):
     """Get monthly income summary"""
     try:
-        # Get all income records for the user
+        # Get the user's income records for the requested year
         filters = {"user_id": str(user_id)}
-        income_records = await income_repo.get_filtered(filters, 1000)  # Get more records for summary
+        income_records = await income_repo.get_all_pages(
+            filters,
+            gte={"income_date": date(year, 1, 1).isoformat()},
+            lte={"income_date": date(year, 12, 31).isoformat()},
+        )
         
         # Filter by year and optionally month
         filtered_records = []
@@ -4,10 +4,12 @@ from datetime import date
 from uuid import UUID
 from decimal import Decimal
 
-from database import SupabaseRepository, adjust_account_balance
+from database import SupabaseRepository, adjust_account_balance, attach_account_and_tag_names
 from models import LoanDisbursement, LoanDisbursementCreate, LoanDisbursementWithTag
+from serialization import RowSerializer
 
-router = APIRouter()
+serializer = RowSerializer("loan_disbursements")
+router = APIRouter(default_response_class=serializer.response_class)
 
 # Initialize repositories
 loan_disbursements_repo = SupabaseRepository("loan_disbursements")
@@ -66,24 +68,10 @@ async def get_loan_disbursements(
         # Apply pagination
         paginated_disbursements = disbursements[skip:skip + limit]
         
-        # Enrich with tag names
-        result = []
-        for disbursement in paginated_disbursements:
-            disbursement_data = disbursement.copy()
-            
-            # Add tag name
-            if disbursement.get('tag_id'):
-                try:
-                    tag = await tags_repo.get_by_id(disbursement['tag_id'], "tag_id")
-                    disbursement_data['tag_name'] = tag['name'] if tag else None
-                except:
-                    disbursement_data['tag_name'] = None
-            else:
-                disbursement_data['tag_name'] = None
-            
-            result.append(LoanDisbursementWithTag(**disbursement_data))
+        # Enrich with tag names using a single lookup
+        enriched_disbursements = await attach_account_and_tag_names(paginated_disbursements, include_account=False)
         
-        return result
+        return serializer.list_response(LoanDisbursementWithTag, enriched_disbursements)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
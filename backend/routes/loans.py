@@ -4,10 +4,12 @@ from uuid import UUID
 from decimal import Decimal
 from datetime import date
 
-from database import SupabaseRepository, adjust_account_balance
+from database import SupabaseRepository, adjust_account_balance, attach_account_and_tag_names
 from models import Loan, LoanCreate, LoanSummary, LoanDisbursement, LoanDisbursementCreate, LoanDisbursementWithTag
+from serialization import RowSerializer
 
-router = APIRouter()
+serializer = RowSerializer("loans")
+router = APIRouter(default_response_class=serializer.response_class)
 loans_repo = SupabaseRepository("loans")
 disbursements_repo = SupabaseRepository("loan_disbursements")
 tags_repo = SupabaseRepository("tags")
@@ -38,7 +40,7 @@ async def get_loans(user_id: UUID):
         # Sort by created_at descending
         results.sort(key=lambda x: x.get('created_at', ''), reverse=True)
         
-        return [Loan(**result) for result in results]
+        return serializer.list_response(Loan, results)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -180,24 +182,10 @@ async def get_disbursements(loan_id: UUID):
         # Sort by disbursement_date descending
         results.sort(key=lambda x: x.get('disbursement_date', ''), reverse=True)
         
-        # Enrich with tag names
-        enriched_results = []
-        for result in results:
-            disbursement_data = result.copy()
-            
-            # Add tag name
-            if result.get('tag_id'):
-                try:
-                    tag = await tags_repo.get_by_id(result['tag_id'], "tag_id")
-                    disbursement_data['tag_name'] = tag['name'] if tag else None
-                except:
-                    disbursement_data['tag_name'] = None
-            else:
-                disbursement_data['tag_name'] = None
-            
-            enriched_results.append(LoanDisbursementWithTag(**disbursement_data))
-        
-        return enriched_results
+        # Enrich with tag names using a single lookup
+        enriched_results = await attach_account_and_tag_names(results, include_account=False)
+        
+        return serializer.list_response(LoanDisbursementWithTag, enriched_results)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
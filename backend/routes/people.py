@@ -2,10 +2,12 @@ from fastapi import APIRouter, HTTPException
 from typing import List
 from uuid import UUID
 
-from database import SupabaseRepository
+from database import SupabaseRepository, get_reference_rows
 from models import Person, PersonCreate
+from serialization import RowSerializer
 
-router = APIRouter()
+serializer = RowSerializer("people")
+router = APIRouter(default_response_class=serializer.response_class)
 people_repo = SupabaseRepository("people")
 
 @router.post("/", response_model=Person)
@@ -26,13 +28,12 @@ async def create_person(person: PersonCreate):
 async def get_people(user_id: UUID):
     """Get all people for a user"""
     try:
-        filters = {"user_id": str(user_id)}
-        results = await people_repo.get_filtered(filters, 100)
+        results = await get_reference_rows("people", str(user_id))
         
         # Sort by name
         results.sort(key=lambda x: x.get('name', '').lower())
         
-        return [Person(**result) for result in results]
+        return serializer.list_response(Person, results)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
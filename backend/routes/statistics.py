@@ -0,0 +1,174 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Dict, List, Optional, Tuple
+from datetime import date, timedelta
+from decimal import Decimal
+from uuid import UUID
+import asyncio
+
+from database import (
+    budgets_repo, loans_repo, tags_repo, get_name_map, get_total_account_balance,
+    get_monthly_expense_totals, get_monthly_income_totals, get_category_totals,
+    get_unsettled_debt_totals, get_loan_disbursement_totals
+)
+from models import (
+    Statistics, StatisticsOverview, MonthlyStatistics, CategoryStatistics,
+    LoanStatistics, DisbursementMonthStatistics
+)
+
+router = APIRouter()
+
+# Months covered when no start date is given (including the current one)
+DEFAULT_RANGE_MONTHS = 6
+
+def default_date_range(today: date) -> Tuple[date, date]:
+    """First day of the month DEFAULT_RANGE_MONTHS - 1 months ago through the end of this month"""
+    month_index = today.year * 12 + today.month - 1 - (DEFAULT_RANGE_MONTHS - 1)
+    start = date(month_index // 12, month_index % 12 + 1, 1)
+    next_month = date(today.year + today.month // 12, today.month % 12 + 1, 1)
+    return start, next_month - timedelta(days=1)
+
+def months_between(start_date: date, end_date: date) -> List[Tuple[int, int]]:
+    """Every (year, month) from start_date's month through end_date's month"""
+    months = []
+    year, month = start_date.year, start_date.month
+    while (year, month) <= (end_date.year, end_date.month):
+        months.append((year, month))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+def build_category_statistics(totals: Dict[Optional[str], Tuple[Decimal, int]],
+                              tag_names: Dict[str, str]) -> List[CategoryStatistics]:
+    """Turn per-tag totals into named categories, largest first"""
+    categories = [
+        CategoryStatistics(
+            tag_id=tag_id,
+            name=(tag_names.get(tag_id) if tag_id else None) or "Uncategorized",
+            amount=amount,
+            count=count
+        )
+        for tag_id, (amount, count) in totals.items()
+    ]
+    categories.sort(key=lambda category: category.amount, reverse=True)
+    return categories
+
+@router.get("/", response_model=Statistics)
+async def get_statistics(
+    user_id: UUID,
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+):
+    """Get overview totals, monthly series and category breakdowns for a date range"""
+    try:
+        default_start, default_end = default_date_range(date.today())
+        start_date = start_date or default_start
+        end_date = end_date or default_end
+        if start_date > end_date:
+            raise HTTPException(status_code=400, detail="start_date must be on or before end_date")
+        
+        user_id_str = str(user_id)
+        
+        # Every section is an independent grouped query, so run them together
+        (
+            total_balance, monthly_expenses, monthly_income, category_totals,
+            debt_totals, disbursement_totals, loans, budgets
+        ) = await asyncio.gather(
+            get_total_account_balance(user_id_str),
+            get_monthly_expense_totals(user_id_str, start_date, end_date),
+            get_monthly_income_totals(user_id_str, start_date, end_date),
+            get_category_totals(user_id_str, start_date, end_date),
+            get_unsettled_debt_totals(user_id_str),
+            get_loan_disbursement_totals(user_id_str),
+            loans_repo.get_all_pages({"user_id": user_id_str}),
+            budgets_repo.get_all_pages(
+                {"user_id": user_id_str},
+                gte={"year": start_date.year},
+                lte={"year": end_date.year},
+                columns="year,month,amount,created_at",
+            ),
+        )
+        
+        # Only the tags that actually appear in the range need names
+        tag_ids = [
+            tag_id
+            for kind_totals in category_totals.values()
+            for tag_id in kind_totals
+            if tag_id
+        ]
+        tag_names = await get_name_map(tags_repo, tag_ids, "tag_id", "name")
+        
+        # Monthly series, with a zero entry for every month in the range
+        budgets_by_month = {(budget["year"], budget["month"]): Decimal(str(budget["amount"])) for budget in budgets}
+        monthly = []
+        for year, month in months_between(start_date, end_date):
+            income = monthly_income.get((year, month), Decimal('0'))
+            expenses = monthly_expenses.get((year, month), Decimal('0'))
+            monthly.append(MonthlyStatistics(
+                year=year,
+                month=month,
+                income=income,
+                expenses=expenses,
+                savings=income - expenses,
+                budget=budgets_by_month.get((year, month))
+            ))
+        
+        # Loans, with their disbursement counts and a monthly disbursement series
+        disbursed_by_loan: Dict[str, Tuple[Decimal, int]] = {}
+        disbursed_by_month: Dict[Tuple[int, int], Decimal] = {}
+        for (loan_id, year, month), (amount, count) in disbursement_totals.items():
+            loan_amount, loan_count = disbursed_by_loan.get(loan_id, (Decimal('0'), 0))
+            disbursed_by_loan[loan_id] = (loan_amount + amount, loan_count + count)
+            if year is not None:
+                disbursed_by_month[(year, month)] = disbursed_by_month.get((year, month), Decimal('0')) + amount
+        
+        loan_statistics = []
+        for loan in loans:
+            total_disbursed, disbursement_count = disbursed_by_loan.get(str(loan["loan_id"]), (Decimal('0'), 0))
+            loan_statistics.append(LoanStatistics(
+                loan_id=loan["loan_id"],
+                loan_name=loan.get("loan_name"),
+                total_amount=Decimal(str(loan.get("total_amount") or 0)),
+                remaining_amount=Decimal(str(loan.get("remaining_amount") or 0)),
+                disbursement_count=disbursement_count,
+                total_disbursed=total_disbursed
+            ))
+        
+        # Overview
+        total_income = sum(monthly_income.values(), Decimal('0'))
+        total_expenses = sum(monthly_expenses.values(), Decimal('0'))
+        total_loans = sum((loan.remaining_amount for loan in loan_statistics), Decimal('0'))
+        owed_to_me, owed_to_me_count = debt_totals.get("OwedToMe", (Decimal('0'), 0))
+        i_owe, i_owe_count = debt_totals.get("IOwe", (Decimal('0'), 0))
+        total_debts = owed_to_me + i_owe
+        
+        overview = StatisticsOverview(
+            total_balance=total_balance,
+            total_income=total_income,
+            total_expenses=total_expenses,
+            actual_savings=total_income - total_expenses,
+            total_loans=total_loans,
+            total_loan_amount=sum((loan.total_amount for loan in loan_statistics), Decimal('0')),
+            total_debts=total_debts,
+            owed_to_me=owed_to_me,
+            i_owe=i_owe,
+            unsettled_debt_count=owed_to_me_count + i_owe_count,
+            net_worth=total_balance - total_loans - total_debts
+        )
+        
+        return Statistics(
+            start_date=start_date,
+            end_date=end_date,
+            overview=overview,
+            monthly=monthly,
+            expense_categories=build_category_statistics(category_totals["expense"], tag_names),
+            income_categories=build_category_statistics(category_totals["income"], tag_names),
+            loans=loan_statistics,
+            disbursement_count=sum(count for _, count in disbursed_by_loan.values()),
+            disbursements_by_month=[
+                DisbursementMonthStatistics(year=year, month=month, amount=amount)
+                for (year, month), amount in sorted(disbursed_by_month.items())
+            ]
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -2,10 +2,12 @@ from fastapi import APIRouter, HTTPException, Query
 from typing import List, Optional
 from uuid import UUID
 
-from database import SupabaseRepository
+from database import SupabaseRepository, get_reference_rows, get_tag_index
 from models import Tag, TagCreate
+from serialization import RowSerializer
 
-router = APIRouter()
+serializer = RowSerializer("tags")
+router = APIRouter(default_response_class=serializer.response_class)
 
 # Initialize repository
 tags_repo = SupabaseRepository("tags")
@@ -44,21 +46,20 @@ async def get_tags(
 ):
     """Get tags for a user with optional filtering"""
     try:
-        filters = {"user_id": str(user_id)}
-        if type:
-            filters["type"] = type
-        
-        results = await tags_repo.get_filtered(filters, limit=1000)
-        
         # Apply search filter if provided
         if search:
-            search_lower = search.lower()
-            results = [tag for tag in results if search_lower in tag.get('name', '').lower()]
+            index = await get_tag_index(str(user_id))
+            results = index.matching(search)
+        else:
+            results = await get_reference_rows("tags", str(user_id))
+        
+        if type:
+            results = [tag for tag in results if tag.get("type") == type]
         
         # Sort by name
         results.sort(key=lambda x: x.get('name', '').lower())
         
-        return [Tag(**tag) for tag in results]
+        return serializer.list_response(Tag, results)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -108,35 +109,10 @@ async def search_tags(
 ):
     """Search tags by name with autocomplete functionality"""
     try:
-        filters = {"user_id": str(user_id)}
-        if type:
-            filters["type"] = type
-        
-        results = await tags_repo.get_filtered(filters, limit=1000)
-        
-        # Search by name (case-insensitive, partial match)
-        search_lower = q.lower()
-        matching_tags = []
-        
-        for tag in results:
-            tag_name = tag.get('name', '').lower()
-            if search_lower in tag_name:
-                # Prioritize exact matches and prefix matches
-                if tag_name == search_lower:
-                    priority = 0  # Exact match
-                elif tag_name.startswith(search_lower):
-                    priority = 1  # Prefix match
-                else:
-                    priority = 2  # Contains match
-                
-                matching_tags.append((priority, tag))
-        
-        # Sort by priority, then by name
-        matching_tags.sort(key=lambda x: (x[0], x[1].get('name', '').lower()))
-        
-        # Return limited results
-        results = [tag for _, tag in matching_tags[:limit]]
-        return [Tag(**tag) for tag in results]
+        # Ranked exact > prefix > contains, then by name, from the user's tag index
+        index = await get_tag_index(str(user_id))
+        results = index.search(q, limit=limit, tag_type=type)
+        return serializer.list_response(Tag, results)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -0,0 +1,248 @@
+-- Database functions used by the backend through SupabaseRepository.execute_rpc.
+-- Run this file in the Supabase SQL editor after the tables have been created.
+-- Every function is optional: if one is missing the API falls back to plain
+-- PostgREST queries, it just does more work per request.
+
+-- Total expenses per month for a user between two dates (inclusive)
+create or replace function monthly_expense_totals(p_user_id uuid, p_start_date date, p_end_date date)
+returns table (year int, month int, total_expenses numeric, expense_count bigint)
+language sql
+stable
+as $$
+    select
+        extract(year from e.expense_date)::int as year,
+        extract(month from e.expense_date)::int as month,
+        coalesce(sum(e.amount), 0) as total_expenses,
+        count(*) as expense_count
+    from expenses e
+    where e.user_id = p_user_id
+      and e.expense_date between p_start_date and p_end_date
+    group by 1, 2
+    order by 1, 2;
+$$;
+
+-- Sum of all account balances for a user
+create or replace function account_balance_total(p_user_id uuid)
+returns numeric
+language sql
+stable
+as $$
+    select coalesce(sum(a.balance), 0)
+    from accounts a
+    where a.user_id = p_user_id;
+$$;
+
+-- Atomically add p_delta (negative to subtract) to an account balance
+create or replace function increment_account_balance(p_account_id uuid, p_delta numeric)
+returns setof accounts
+language sql
+volatile
+as $$
+    update accounts
+    set balance = balance + p_delta
+    where account_id = p_account_id
+    returning *;
+$$;
+
+-- Atomically move p_amount from one account to another and return both rows.
+-- Both accounts are locked (in a fixed order, so opposite transfers cannot
+-- deadlock) before either balance changes. The transfer fails, changing
+-- nothing, if the accounts are the same or either one does not exist, and with
+-- p_require_funds if the source balance is below p_amount.
+create or replace function transfer_between_accounts(
+    p_from_account_id uuid,
+    p_to_account_id uuid,
+    p_amount numeric,
+    p_require_funds boolean default false
+)
+returns setof accounts
+language plpgsql
+volatile
+as $$
+declare
+    v_from_balance numeric;
+    v_locked integer;
+begin
+    if p_from_account_id = p_to_account_id then
+        raise exception 'Cannot transfer to the same account';
+    end if;
+
+    perform 1
+    from accounts a
+    where a.account_id in (p_from_account_id, p_to_account_id)
+    order by a.account_id
+    for update;
+
+    get diagnostics v_locked = row_count;
+    if v_locked < 2 then
+        raise exception 'Account not found';
+    end if;
+
+    select a.balance into v_from_balance
+    from accounts a
+    where a.account_id = p_from_account_id;
+
+    if p_require_funds and v_from_balance < p_amount then
+        raise exception 'Insufficient funds: available %', v_from_balance;
+    end if;
+
+    return query
+    update accounts a
+    set balance = a.balance + case when a.account_id = p_to_account_id then p_amount else -p_amount end
+    where a.account_id in (p_from_account_id, p_to_account_id)
+    returning a.*;
+end;
+$$;
+
+-- Settle a set of debts against one account in a single transaction.
+-- OwedToMe debts credit the account; IOwe debts are recorded as expenses paid
+-- from it. Debts already settled (e.g. by a concurrent request) are skipped.
+-- Returns the totals plus the expenses created, so callers can update rollups.
+create or replace function settle_debts(p_debt_ids uuid[], p_account_id uuid, p_use_debt_date boolean default true)
+returns json
+language plpgsql
+volatile
+as $$
+declare
+    v_account_name text;
+    v_owed_to_me numeric;
+    v_i_owe numeric;
+    v_settled int;
+    v_expenses json;
+begin
+    select a.account_name into v_account_name
+    from accounts a
+    where a.account_id = p_account_id;
+
+    with settled as (
+        update debts d
+        set is_settled = true
+        where d.debt_id = any(p_debt_ids)
+          and not d.is_settled
+        returning d.*
+    ), inserted as (
+        insert into expenses (user_id, account_id, amount, place, payment_method, notes, expense_date, tag_id)
+        select
+            s.user_id,
+            p_account_id,
+            s.amount,
+            coalesce(nullif(s.place, ''), 'Settlement to ' || p.name),
+            coalesce(v_account_name, 'Unknown Account'),
+            s.notes,
+            case when p_use_debt_date then coalesce(s.debt_date, current_date) else current_date end,
+            s.tag_id
+        from settled s
+        join people p on p.person_id = s.person_id
+        where s.type = 'IOwe'
+        returning user_id, expense_date, tag_id, amount
+    )
+    select
+        coalesce(sum(s.amount) filter (where s.type = 'OwedToMe'), 0),
+        coalesce(sum(s.amount) filter (where s.type = 'IOwe'), 0),
+        count(*),
+        (select coalesce(json_agg(x), '[]'::json) from inserted x)
+    into v_owed_to_me, v_i_owe, v_settled, v_expenses
+    from settled s;
+
+    update accounts
+    set balance = balance + v_owed_to_me - v_i_owe
+    where account_id = p_account_id;
+
+    return json_build_object(
+        'debts_settled', v_settled,
+        'total_owed_to_me', v_owed_to_me,
+        'total_i_owe', v_i_owe,
+        'expenses', v_expenses
+    );
+end;
+$$;
+
+-- Total income per month for a user between two dates (inclusive)
+create or replace function monthly_income_totals(p_user_id uuid, p_start_date date, p_end_date date)
+returns table (year int, month int, total_income numeric, income_count bigint)
+language sql
+stable
+as $$
+    select
+        extract(year from i.income_date)::int as year,
+        extract(month from i.income_date)::int as month,
+        coalesce(sum(i.amount), 0) as total_income,
+        count(*) as income_count
+    from income i
+    where i.user_id = p_user_id
+      and i.income_date between p_start_date and p_end_date
+    group by 1, 2
+    order by 1, 2;
+$$;
+
+-- Expense and income totals per tag for a user between two dates (inclusive).
+-- kind is 'expense' or 'income'; untagged entries are grouped under a null tag_id.
+create or replace function category_totals(p_user_id uuid, p_start_date date, p_end_date date)
+returns table (kind text, tag_id uuid, total numeric, entry_count bigint)
+language sql
+stable
+as $$
+    select 'expense', e.tag_id, coalesce(sum(e.amount), 0), count(*)
+    from expenses e
+    where e.user_id = p_user_id
+      and e.expense_date between p_start_date and p_end_date
+    group by e.tag_id
+    union all
+    select 'income', i.tag_id, coalesce(sum(i.amount), 0), count(*)
+    from income i
+    where i.user_id = p_user_id
+      and i.income_date between p_start_date and p_end_date
+    group by i.tag_id;
+$$;
+
+-- Unsettled debt totals per type for a user
+create or replace function unsettled_debt_totals(p_user_id uuid)
+returns table (type text, total numeric, debt_count bigint)
+language sql
+stable
+as $$
+    select d.type, coalesce(sum(d.amount), 0), count(*)
+    from debts d
+    where d.user_id = p_user_id
+      and not d.is_settled
+    group by d.type;
+$$;
+
+-- Loan disbursement totals per loan and month for a user.
+-- Disbursements without a date are grouped under a null year and month.
+create or replace function loan_disbursement_totals(p_user_id uuid)
+returns table (loan_id uuid, year int, month int, total numeric, disbursement_count bigint)
+language sql
+stable
+as $$
+    select
+        ld.loan_id,
+        extract(year from ld.disbursement_date)::int,
+        extract(month from ld.disbursement_date)::int,
+        coalesce(sum(ld.amount), 0),
+        count(*)
+    from loan_disbursements ld
+    where ld.user_id = p_user_id
+    group by 1, 2, 3;
+$$;
+
+-- Unsettled debt totals per person for a user, joined to the person's name.
+-- Every person is listed, with zeros when they have no open debts; pass
+-- p_person_id to get a single person.
+create or replace function debt_summary_by_person(p_user_id uuid, p_person_id uuid default null)
+returns table (person_id uuid, person_name text, owed_to_me numeric, i_owe numeric, debt_count bigint)
+language sql
+stable
+as $$
+    select
+        p.person_id,
+        p.name,
+        coalesce(sum(d.amount) filter (where d.type = 'OwedToMe'), 0),
+        coalesce(sum(d.amount) filter (where d.type = 'IOwe'), 0),
+        count(d.debt_id)
+    from people p
+    left join debts d on d.person_id = p.person_id and not d.is_settled
+    where p.user_id = p_user_id
+      and (p_person_id is null or p.person_id = p_person_id)
+    group by p.person_id, p.name;
+$$;
@@ -0,0 +1,14 @@
+-- Indexes backing the user-scoped queries issued by the API.
+-- Run this file in the Supabase SQL editor; every statement is idempotent.
+
+create index if not exists accounts_user_id_idx on accounts (user_id);
+create index if not exists budgets_user_year_month_idx on budgets (user_id, year, month);
+create index if not exists expenses_user_date_id_idx on expenses (user_id, expense_date desc, expense_id desc);
+create index if not exists income_user_date_id_idx on income (user_id, income_date desc, income_id desc);
+create index if not exists tags_user_id_idx on tags (user_id);
+create index if not exists people_user_id_idx on people (user_id);
+create index if not exists debts_user_settled_idx on debts (user_id, is_settled);
+create index if not exists debts_person_settled_idx on debts (person_id, is_settled);
+create index if not exists loans_user_id_idx on loans (user_id);
+create index if not exists loan_disbursements_loan_id_idx on loan_disbursements (loan_id);
+create index if not exists loan_disbursements_user_id_idx on loan_disbursements (user_id);
@@ -0,0 +1,73 @@
+-- Monthly rollups: per-user expense and income totals by month and tag.
+-- The API keeps them up to date on every write through
+-- increment_monthly_rollups. Run this file in the Supabase SQL editor, then
+-- backfill with `python -m rollups rebuild` (from the backend directory)
+-- before setting MONTHLY_ROLLUPS_ENABLED=true.
+
+create table if not exists monthly_rollups (
+    user_id uuid not null,
+    year int not null,
+    month int not null,
+    tag_id uuid,
+    kind text not null check (kind in ('expense', 'income')),
+    total numeric not null default 0,
+    entry_count bigint not null default 0,
+    -- Untagged entries share one row per month, so nulls must collide
+    constraint monthly_rollups_key unique nulls not distinct (user_id, year, month, tag_id, kind)
+);
+
+-- Add a batch of deltas to the rollups.
+-- p_deltas is a json array of {user_id, year, month, tag_id, kind, amount, count}
+-- with at most one element per key.
+create or replace function increment_monthly_rollups(p_deltas jsonb)
+returns void
+language sql
+volatile
+as $$
+    insert into monthly_rollups as r (user_id, year, month, tag_id, kind, total, entry_count)
+    select
+        (d->>'user_id')::uuid,
+        (d->>'year')::int,
+        (d->>'month')::int,
+        (d->>'tag_id')::uuid,
+        d->>'kind',
+        (d->>'amount')::numeric,
+        (d->>'count')::bigint
+    from jsonb_array_elements(p_deltas) d
+    on conflict on constraint monthly_rollups_key
+    do update set
+        total = r.total + excluded.total,
+        entry_count = r.entry_count + excluded.entry_count;
+$$;
+
+-- Recompute the rollups from the raw tables, for one user or (p_user_id null) everyone
+create or replace function rebuild_monthly_rollups(p_user_id uuid default null)
+returns bigint
+language plpgsql
+volatile
+as $$
+declare
+    v_rows bigint;
+begin
+    delete from monthly_rollups r
+    where p_user_id is null or r.user_id = p_user_id;
+
+    insert into monthly_rollups (user_id, year, month, tag_id, kind, total, entry_count)
+    select e.user_id, extract(year from e.expense_date)::int, extract(month from e.expense_date)::int,
+           e.tag_id, 'expense', sum(e.amount), count(*)
+    from expenses e
+    where e.expense_date is not null
+      and (p_user_id is null or e.user_id = p_user_id)
+    group by 1, 2, 3, 4
+    union all
+    select i.user_id, extract(year from i.income_date)::int, extract(month from i.income_date)::int,
+           i.tag_id, 'income', sum(i.amount), count(*)
+    from income i
+    where i.income_date is not null
+      and (p_user_id is null or i.user_id = p_user_id)
+    group by 1, 2, 3, 4;
+
+    get diagnostics v_rows = row_count;
+    return v_rows;
+end;
+$$;
@@ -0,0 +1,413 @@
+"""
+SQLite storage backend for running the API without Supabase.
+
+Selected with STORAGE_BACKEND=sqlite; SQLITE_DATABASE_PATH points at a file,
+or ":memory:" (the default) for a throwaway database. The tables mirror the
+Supabase schema closely enough for every endpoint: generated primary keys and
+created_at timestamps, numeric columns returned as numbers, booleans as
+booleans, dates and timestamps as ISO strings, and NULLs sorting last in
+ascending order as in Postgres.
+
+The read-only aggregates and the atomic balance functions from
+sql/functions.sql are implemented here too, so local runs take the same code
+paths as a fully deployed database. The remaining functions (debt settlement
+and monthly rollups) raise RpcNotAvailable and the API uses its fallbacks.
+
+Requires SQLite 3.35 or newer for RETURNING.
+"""
+import sqlite3
+import threading
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from storage import RpcNotAvailable, StorageBackend, keyset_alternatives
+
+# Column types per table, primary key first. uuid/text/date/timestamp are
+# stored as text, numeric as real, int and bool as integers.
+TABLES: Dict[str, Dict[str, str]] = {
+    "users": {
+        "id": "uuid", "name": "text", "username": "text", "email": "text", "password": "text",
+        "created_at": "timestamp",
+    },
+    "accounts": {
+        "account_id": "uuid", "user_id": "uuid", "account_name": "text", "balance": "numeric",
+        "created_at": "timestamp",
+    },
+    "expenses": {
+        "expense_id": "uuid", "user_id": "uuid", "account_id": "uuid", "amount": "numeric",
+        "place": "text", "payment_method": "text", "notes": "text", "expense_date": "date",
+        "tag_id": "uuid", "created_at": "timestamp",
+    },
+    "income": {
+        "income_id": "uuid", "user_id": "uuid", "account_id": "uuid", "amount": "numeric",
+        "notes": "text", "income_date": "date", "tag_id": "uuid", "created_at": "timestamp",
+    },
+    "budgets": {
+        "budget_id": "uuid", "user_id": "uuid", "month": "int", "year": "int", "amount": "numeric",
+        "created_at": "timestamp",
+    },
+    "loans": {
+        "loan_id": "uuid", "user_id": "uuid", "loan_name": "text", "total_amount": "numeric",
+        "taken_amount": "numeric", "remaining_amount": "numeric", "created_at": "timestamp",
+    },
+    "loan_disbursements": {
+        "disbursement_id": "uuid", "loan_id": "uuid", "user_id": "uuid", "amount": "numeric",
+        "notes": "text", "disbursement_date": "date", "tag_id": "uuid", "created_at": "timestamp",
+    },
+    "debts": {
+        "debt_id": "uuid", "user_id": "uuid", "person_id": "uuid", "amount": "numeric", "type": "text",
+        "notes": "text", "is_settled": "bool", "debt_date": "date", "place": "text", "tag_id": "uuid",
+        "account_id": "uuid", "created_at": "timestamp",
+    },
+    "people": {
+        "person_id": "uuid", "user_id": "uuid", "name": "text", "created_at": "timestamp",
+    },
+    "tags": {
+        "tag_id": "uuid", "user_id": "uuid", "name": "text", "type": "text", "created_at": "timestamp",
+    },
+    "monthly_rollups": {
+        "user_id": "uuid", "year": "int", "month": "int", "tag_id": "uuid", "kind": "text",
+        "total": "numeric", "entry_count": "int",
+    },
+}
+
+# Tables whose first column is a generated uuid primary key
+KEYED_TABLES = set(TABLES) - {"monthly_rollups"}
+
+SQL_TYPES = {"numeric": "REAL", "int": "INTEGER", "bool": "INTEGER"}
+
+# SQL for the comparison operators in keyset_alternatives
+KEYSET_OPERATORS = {"eq": "=", "gt": ">", "lt": "<"}
+
+# Column clauses beyond the type
+COLUMN_DEFAULTS = {
+    ("loans", "taken_amount"): "NOT NULL DEFAULT 0",
+    ("loans", "remaining_amount"): "GENERATED ALWAYS AS (total_amount - taken_amount) VIRTUAL",
+    ("debts", "is_settled"): "NOT NULL DEFAULT 0",
+    ("monthly_rollups", "total"): "NOT NULL DEFAULT 0",
+    ("monthly_rollups", "entry_count"): "NOT NULL DEFAULT 0",
+}
+
+# Same indexes as sql/indexes.sql
+INDEXES = [
+    "create index if not exists accounts_user_id_idx on accounts (user_id)",
+    "create index if not exists budgets_user_year_month_idx on budgets (user_id, year, month)",
+    "create index if not exists expenses_user_date_id_idx on expenses (user_id, expense_date desc, expense_id desc)",
+    "create index if not exists income_user_date_id_idx on income (user_id, income_date desc, income_id desc)",
+    "create index if not exists tags_user_id_idx on tags (user_id)",
+    "create index if not exists people_user_id_idx on people (user_id)",
+    "create index if not exists debts_user_settled_idx on debts (user_id, is_settled)",
+    "create index if not exists debts_person_settled_idx on debts (person_id, is_settled)",
+    "create index if not exists loans_user_id_idx on loans (user_id)",
+    "create index if not exists loan_disbursements_loan_id_idx on loan_disbursements (loan_id)",
+    "create index if not exists loan_disbursements_user_id_idx on loan_disbursements (user_id)",
+    "create index if not exists monthly_rollups_user_year_idx on monthly_rollups (user_id, year, month)",
+]
+
+# Table-returning functions from sql/functions.sql, as SQLite queries over
+# the same named parameters
+QUERY_FUNCTIONS: Dict[str, str] = {
+    "monthly_expense_totals": """
+        select cast(strftime('%Y', expense_date) as integer) as year,
+               cast(strftime('%m', expense_date) as integer) as month,
+               coalesce(sum(amount), 0) as total_expenses,
+               count(*) as expense_count
+        from expenses
+        where user_id = :p_user_id and expense_date between :p_start_date and :p_end_date
+        group by 1, 2
+        order by 1, 2
+    """,
+    "monthly_income_totals": """
+        select cast(strftime('%Y', income_date) as integer) as year,
+               cast(strftime('%m', income_date) as integer) as month,
+               coalesce(sum(amount), 0) as total_income,
+               count(*) as income_count
+        from income
+        where user_id = :p_user_id and income_date between :p_start_date and :p_end_date
+        group by 1, 2
+        order by 1, 2
+    """,
+    "category_totals": """
+        select 'expense' as kind, tag_id, coalesce(sum(amount), 0) as total, count(*) as entry_count
+        from expenses
+        where user_id = :p_user_id and expense_date between :p_start_date and :p_end_date
+        group by tag_id
+        union all
+        select 'income', tag_id, coalesce(sum(amount), 0), count(*)
+        from income
+        where user_id = :p_user_id and income_date between :p_start_date and :p_end_date
+        group by tag_id
+    """,
+    "unsettled_debt_totals": """
+        select type, coalesce(sum(amount), 0) as total, count(*) as debt_count
+        from debts
+        where user_id = :p_user_id and not is_settled
+        group by type
+    """,
+    "loan_disbursement_totals": """
+        select loan_id,
+               cast(strftime('%Y', disbursement_date) as integer) as year,
+               cast(strftime('%m', disbursement_date) as integer) as month,
+               coalesce(sum(amount), 0) as total,
+               count(*) as disbursement_count
+        from loan_disbursements
+        where user_id = :p_user_id
+        group by 1, 2, 3
+    """,
+    "debt_summary_by_person": """
+        select p.person_id, p.name as person_name,
+               coalesce(sum(case when d.type = 'OwedToMe' then d.amount end), 0) as owed_to_me,
+               coalesce(sum(case when d.type = 'IOwe' then d.amount end), 0) as i_owe,
+               count(d.debt_id) as debt_count
+        from people p
+        left join debts d on d.person_id = p.person_id and not d.is_settled
+        where p.user_id = :p_user_id
+          and (:p_person_id is null or p.person_id = :p_person_id)
+        group by p.person_id, p.name
+    """,
+}
+
+def now_timestamp() -> str:
+    """Current UTC time formatted like a Postgres timestamptz from PostgREST"""
+    return datetime.now(timezone.utc).isoformat(timespec="microseconds")
+
+def to_sql_value(value: Any) -> Any:
+    """Convert a Python value to what SQLite stores for it"""
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+class SQLiteBackend(StorageBackend):
+    """Local SQLite database implementing the StorageBackend interface
+
+    One connection is shared by the database executor's threads and guarded
+    by a lock, so statements run one at a time as they would on a single
+    SQLite writer anyway.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._functions = {
+            "account_balance_total": self._account_balance_total,
+            "increment_account_balance": self._increment_account_balance,
+            "transfer_between_accounts": self._transfer_between_accounts,
+        }
+        self.create_schema()
+
+    def create_schema(self):
+        """Create any missing tables and indexes"""
+        with self._lock, self._connection:
+            for table, columns in TABLES.items():
+                definitions = []
+                for position, (column, column_type) in enumerate(columns.items()):
+                    clauses = [column, SQL_TYPES.get(column_type, "TEXT")]
+                    if position == 0 and table in KEYED_TABLES:
+                        clauses.append("PRIMARY KEY")
+                    if (table, column) in COLUMN_DEFAULTS:
+                        clauses.append(COLUMN_DEFAULTS[(table, column)])
+                    definitions.append(" ".join(clauses))
+                self._connection.execute(f"create table if not exists {table} ({', '.join(definitions)})")
+            for statement in INDEXES:
+                self._connection.execute(statement)
+
+    def _columns(self, table: str) -> Dict[str, str]:
+        if table not in TABLES:
+            raise ValueError(f"Table {table} does not exist")
+        return TABLES[table]
+
+    def _column(self, table: str, column: str) -> str:
+        """Validated column name, safe to interpolate into SQL"""
+        column = column.strip()
+        if column not in self._columns(table):
+            raise ValueError(f"Column {table}.{column} does not exist")
+        return column
+
+    def _to_row(self, table: str, cursor: sqlite3.Cursor, values: tuple) -> Dict[str, Any]:
+        """Row tuple as a dict, with booleans restored"""
+        types = self._columns(table)
+        row = {}
+        for description, value in zip(cursor.description, values):
+            column = description[0]
+            if value is not None and types.get(column) == "bool":
+                value = bool(value)
+            row[column] = value
+        return row
+
+    def _fetch(self, table: str, sql: str, params: List[Any]) -> List[Dict[str, Any]]:
+        cursor = self._connection.execute(sql, params)
+        return [self._to_row(table, cursor, values) for values in cursor.fetchall()]
+
+    def _where(self, table: str, filters: Optional[Dict[str, Any]] = None,
+               gte: Optional[Dict[str, Any]] = None, lte: Optional[Dict[str, Any]] = None,
+               in_filters: Optional[Dict[str, List[Any]]] = None) -> Tuple[List[str], List[Any]]:
+        """WHERE conditions and parameters for the repository's filter arguments"""
+        conditions: List[str] = []
+        params: List[Any] = []
+        for operator, predicates in (("=", filters), (">=", gte), ("<=", lte)):
+            for column, value in (predicates or {}).items():
+                if value is not None:
+                    conditions.append(f"{self._column(table, column)} {operator} ?")
+                    params.append(to_sql_value(value))
+        for column, values in (in_filters or {}).items():
+            if values is None:
+                continue
+            values = list(values)
+            if not values:
+                conditions.append("0")
+                continue
+            conditions.append(f"{self._column(table, column)} in ({', '.join('?' * len(values))})")
+            params.extend(to_sql_value(value) for value in values)
+        return conditions, params
+
+    def _keyset(self, table: str, alternatives: List[List[Tuple[str, str, Any]]]) -> Tuple[str, List[Any]]:
+        """WHERE condition and parameters matching one of the keyset_alternatives"""
+        clauses: List[str] = []
+        params: List[Any] = []
+        for terms in alternatives:
+            conditions = []
+            for column, operator, value in terms:
+                name = self._column(table, column)
+                if operator == "null":
+                    conditions.append(f"{name} is null")
+                elif operator == "notnull":
+                    conditions.append(f"{name} is not null")
+                else:
+                    conditions.append(f"{name} {KEYSET_OPERATORS[operator]} ?")
+                    params.append(to_sql_value(value))
+            clauses.append(f"({' and '.join(conditions)})")
+        return f"({' or '.join(clauses)})", params
+
+    @staticmethod
+    def _clause(conditions: List[str]) -> str:
+        return f" where {' and '.join(conditions)}" if conditions else ""
+
+    def insert(self, table, rows):
+        columns = self._columns(table)
+        inserted = []
+        with self._lock, self._connection:
+            for data in rows:
+                row = {self._column(table, column): to_sql_value(value) for column, value in data.items()}
+                if table in KEYED_TABLES:
+                    primary_key = next(iter(columns))
+                    row[primary_key] = row.get(primary_key) or str(uuid.uuid4())
+                if "created_at" in columns:
+                    row.setdefault("created_at", now_timestamp())
+                sql = (
+                    f"insert into {table} ({', '.join(row)}) values ({', '.join('?' * len(row))}) "
+                    f"returning *"
+                )
+                inserted.extend(self._fetch(table, sql, list(row.values())))
+        return inserted
+
+    def select(self, table, columns="*", filters=None, gte=None, lte=None, in_filters=None,
+               order_by=None, after=None, offset=0, limit=None):
+        if columns.strip() == "*":
+            selected = "*"
+        else:
+            selected = ", ".join(self._column(table, column) for column in columns.split(","))
+
+        conditions, params = self._where(table, filters, gte, lte, in_filters)
+        if after is not None:
+            alternatives = keyset_alternatives(order_by, after)
+            if not alternatives:
+                return []
+            keyset, keyset_params = self._keyset(table, alternatives)
+            conditions.append(keyset)
+            params.extend(keyset_params)
+
+        sql = f"select {selected} from {table}{self._clause(conditions)}"
+        if order_by:
+            # Postgres puts NULLs last in ascending order and first in descending order
+            sql += " order by " + ", ".join(
+                f"{self._column(table, column)} {'desc nulls first' if descending else 'asc nulls last'}"
+                for column, descending in order_by
+            )
+        if limit is not None:
+            sql += " limit ? offset ?"
+            params.extend([limit, offset])
+
+        with self._lock:
+            return self._fetch(table, sql, params)
+
+    def count(self, table, filters=None, gte=None, lte=None, in_filters=None):
+        conditions, params = self._where(table, filters, gte, lte, in_filters)
+        with self._lock:
+            return self._connection.execute(
+                f"select count(*) from {table}{self._clause(conditions)}", params
+            ).fetchone()[0]
+
+    def update(self, table, data, filters=None, in_filters=None):
+        if not data:
+            return self.select(table, filters=filters, in_filters=in_filters)
+        assignments = [f"{self._column(table, column)} = ?" for column in data]
+        conditions, params = self._where(table, filters, in_filters=in_filters)
+        sql = f"update {table} set {', '.join(assignments)}{self._clause(conditions)} returning *"
+        with self._lock, self._connection:
+            return self._fetch(table, sql, [to_sql_value(value) for value in data.values()] + params)
+
+    def delete(self, table, filters):
+        conditions, params = self._where(table, filters)
+        with self._lock, self._connection:
+            return self._fetch(table, f"delete from {table}{self._clause(conditions)} returning *", params)
+
+    def rpc(self, function_name, params):
+        params = {name: to_sql_value(value) for name, value in (params or {}).items()}
+        if function_name in QUERY_FUNCTIONS:
+            with self._lock:
+                cursor = self._connection.execute(QUERY_FUNCTIONS[function_name], params)
+                names = [description[0] for description in cursor.description]
+                return [dict(zip(names, values)) for values in cursor.fetchall()]
+        if function_name in self._functions:
+            return self._functions[function_name](**params)
+        raise RpcNotAvailable(function_name)
+
+    def _account_balance_total(self, p_user_id: str) -> float:
+        with self._lock:
+            return self._connection.execute(
+                "select coalesce(sum(balance), 0) from accounts where user_id = ?", [p_user_id]
+            ).fetchone()[0]
+
+    def _increment_account_balance(self, p_account_id: str, p_delta: float) -> List[Dict[str, Any]]:
+        with self._lock, self._connection:
+            return self._fetch(
+                "accounts",
+                "update accounts set balance = balance + ? where account_id = ? returning *",
+                [p_delta, p_account_id],
+            )
+
+    def _transfer_between_accounts(self, p_from_account_id: str, p_to_account_id: str, p_amount: float,
+                                   p_require_funds: bool = False) -> List[Dict[str, Any]]:
+        if p_from_account_id == p_to_account_id:
+            raise ValueError("Cannot transfer to the same account")
+        # The lock and the transaction make the checks and both updates atomic
+        with self._lock, self._connection:
+            balances = dict(self._connection.execute(
+                "select account_id, balance from accounts where account_id in (?, ?)",
+                [p_from_account_id, p_to_account_id],
+            ).fetchall())
+            if len(balances) < 2:
+                raise ValueError("Account not found")
+            if p_require_funds and balances[p_from_account_id] < p_amount:
+                raise ValueError(f"Insufficient funds: available {balances[p_from_account_id]}")
+            return self._fetch(
+                "accounts",
+                "update accounts set balance = balance + case when account_id = ? then ? else -? end "
+                "where account_id in (?, ?) returning *",
+                [p_to_account_id, p_amount, p_amount, p_from_account_id, p_to_account_id],
+            )
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,188 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from postgrest.types import CountMethod
+
+# PostgREST error code returned when an RPC function does not exist
+MISSING_FUNCTION_CODE = "PGRST202"
+
+# Characters that must be quoted inside a PostgREST or=(...) filter value
+POSTGREST_RESERVED_CHARS = set(',.:()" \\')
+
+class RpcNotAvailable(Exception):
+    """Raised when a database function from sql/functions.sql has not been deployed"""
+
+    def __init__(self, function_name: str):
+        super().__init__(f"Database function {function_name} is not available")
+        self.function_name = function_name
+
+class StorageBackend:
+    """Row storage behind SupabaseRepository
+
+    Every method is synchronous and performs one round trip; the repository
+    runs them on the database executor and adds batching, caching and write
+    notifications on top. Filters follow the repository's conventions:
+    `filters` are equalities, `gte`/`lte` inclusive bounds, `in_filters` sets
+    of allowed values, and None values are ignored. `order_by` is a list of
+    (column, descending) pairs and `after` the order_by values of the row a
+    keyset page continues after.
+    """
+
+    name = "abstract"
+
+    def insert(self, table: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Insert rows and return them as stored"""
+        raise NotImplementedError
+
+    def select(self, table: str, columns: str = "*", filters: Optional[Dict[str, Any]] = None,
+               gte: Optional[Dict[str, Any]] = None, lte: Optional[Dict[str, Any]] = None,
+               in_filters: Optional[Dict[str, List[Any]]] = None,
+               order_by: Optional[List[Tuple[str, bool]]] = None, after: Optional[List[Any]] = None,
+               offset: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Matching rows with the comma-separated `columns`"""
+        raise NotImplementedError
+
+    def count(self, table: str, filters: Optional[Dict[str, Any]] = None,
+              gte: Optional[Dict[str, Any]] = None, lte: Optional[Dict[str, Any]] = None,
+              in_filters: Optional[Dict[str, List[Any]]] = None) -> int:
+        """Number of matching rows"""
+        raise NotImplementedError
+
+    def update(self, table: str, data: Dict[str, Any], filters: Optional[Dict[str, Any]] = None,
+               in_filters: Optional[Dict[str, List[Any]]] = None) -> List[Dict[str, Any]]:
+        """Apply data to every matching row and return the updated rows"""
+        raise NotImplementedError
+
+    def delete(self, table: str, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Delete matching rows and return them"""
+        raise NotImplementedError
+
+    def rpc(self, function_name: str, params: Dict[str, Any]) -> Any:
+        """Call a database function from sql/functions.sql
+
+        Raises RpcNotAvailable when the backend does not have the function.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Release connections held by the backend"""
+
+def keyset_alternatives(order_by: List[Tuple[str, bool]], after: List[Any]) -> List[List[Tuple[str, str, Any]]]:
+    """Rows sorting strictly after `after`, as alternatives of (column, operator, value) terms
+
+    Expands to (a > x) or (a = x and b > y) ..., which the database answers
+    with a range read on an index over the order_by columns. Operators are
+    "eq", "gt", "lt", "null" and "notnull". NULLs sort last in ascending and
+    first in descending order, as in Postgres, so a NULL in `after` is matched
+    with is (not) null instead of being compared. No alternatives means no
+    row can follow.
+    """
+    if not order_by or len(after) != len(order_by):
+        raise ValueError("Cursor does not match the sort order")
+
+    alternatives = []
+    for position, (column, descending) in enumerate(order_by):
+        equalities = [
+            (previous, "null", None) if after[index] is None else (previous, "eq", after[index])
+            for index, (previous, _) in enumerate(order_by[:position])
+        ]
+        value = after[position]
+        if value is None:
+            # Only non-NULL values follow a NULL, and only when descending
+            if descending:
+                alternatives.append(equalities + [(column, "notnull", None)])
+        elif descending:
+            alternatives.append(equalities + [(column, "lt", value)])
+        else:
+            alternatives.append(equalities + [(column, "gt", value)])
+            alternatives.append(equalities + [(column, "null", None)])
+    return alternatives
+
+def format_filter_value(value: Any) -> str:
+    """Quote a value for use inside a PostgREST logical filter if needed"""
+    text = str(value)
+    if any(char in POSTGREST_RESERVED_CHARS for char in text):
+        return '"' + text.replace('\\', '\\\\').replace('"', '\\"') + '"'
+    return text
+
+class PostgrestBackend(StorageBackend):
+    """Supabase tables reached through the PostgREST client"""
+
+    name = "postgrest"
+
+    def __init__(self, client):
+        self.client = client
+
+    def _apply_filters(self, query, filters: Optional[Dict[str, Any]] = None,
+                       gte: Optional[Dict[str, Any]] = None, lte: Optional[Dict[str, Any]] = None,
+                       in_filters: Optional[Dict[str, List[Any]]] = None):
+        """Apply equality, range and set predicates to a PostgREST query"""
+        if filters:
+            for key, value in filters.items():
+                if value is not None:
+                    query = query.eq(key, value)
+        if gte:
+            for key, value in gte.items():
+                if value is not None:
+                    query = query.gte(key, value)
+        if lte:
+            for key, value in lte.items():
+                if value is not None:
+                    query = query.lte(key, value)
+        if in_filters:
+            for key, values in in_filters.items():
+                if values is not None:
+                    query = query.in_(key, list(values))
+        return query
+
+    def _apply_keyset(self, query, alternatives: List[List[Tuple[str, str, Any]]]):
+        """Only match rows satisfying one of the keyset_alternatives"""
+        conditions = []
+        for terms in alternatives:
+            filters = [
+                f"{column}.is.null" if operator == "null"
+                else f"{column}.not.is.null" if operator == "notnull"
+                else f"{column}.{operator}.{format_filter_value(value)}"
+                for column, operator, value in terms
+            ]
+            conditions.append(f"and({','.join(filters)})" if len(filters) > 1 else filters[0])
+        return query.or_(",".join(conditions))
+
+    def insert(self, table, rows):
+        return self.client.table(table).insert(rows).execute().data or []
+
+    def select(self, table, columns="*", filters=None, gte=None, lte=None, in_filters=None,
+               order_by=None, after=None, offset=0, limit=None):
+        query = self.client.table(table).select(columns)
+        query = self._apply_filters(query, filters, gte, lte, in_filters)
+        if after is not None:
+            alternatives = keyset_alternatives(order_by, after)
+            if not alternatives:
+                return []
+            query = self._apply_keyset(query, alternatives)
+
+        for column, descending in order_by or []:
+            query = query.order(column, desc=descending)
+
+        if limit is not None:
+            query = query.range(offset, offset + limit - 1)
+        return query.execute().data or []
+
+    def count(self, table, filters=None, gte=None, lte=None, in_filters=None):
+        query = self.client.table(table).select("*", count=CountMethod.exact, head=True)
+        return self._apply_filters(query, filters, gte, lte, in_filters).execute().count or 0
+
+    def update(self, table, data, filters=None, in_filters=None):
+        query = self.client.table(table).update(data)
+        return self._apply_filters(query, filters, in_filters=in_filters).execute().data or []
+
+    def delete(self, table, filters):
+        query = self.client.table(table).delete()
+        return self._apply_filters(query, filters).execute().data or []
+
+    def rpc(self, function_name, params):
+        try:
+            return self.client.rpc(function_name, params).execute().data
+        except Exception as e:
+            if getattr(e, "code", None) == MISSING_FUNCTION_CODE:
+                raise RpcNotAvailable(function_name) from e
+            raise
@@ -0,0 +1,79 @@
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional
+
+# Longest substring indexed directly; longer queries intersect the postings
+# of their substrings of this length and then verify the candidates
+GRAM_SIZE = 3
+
+# Sorts after any name sharing a prefix, for bisecting the end of a prefix range
+MAX_CHAR = chr(0x10FFFF)
+
+class TagIndex:
+    """Case-insensitive substring index over one user's tags
+
+    Every substring of up to GRAM_SIZE characters of each name maps to the
+    positions of the tags that contain it, and tags are kept sorted by name,
+    so a query is answered from posting lists and a bisect instead of a scan
+    over every name. Built once per user and replaced when their tags change.
+    """
+
+    def __init__(self, tags: Iterable[Dict[str, Any]]):
+        self._tags = sorted(tags, key=lambda tag: (tag.get("name") or "").lower())
+        self._names = [(tag.get("name") or "").lower() for tag in self._tags]
+        self._postings: Dict[str, List[int]] = {}
+        for position, name in enumerate(self._names):
+            grams = {
+                name[start:start + size]
+                for size in range(1, GRAM_SIZE + 1)
+                for start in range(len(name) - size + 1)
+            }
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(position)
+
+    def __len__(self) -> int:
+        return len(self._tags)
+
+    def _contains_positions(self, query: str) -> List[int]:
+        """Positions of names containing query, in name order"""
+        if not query:
+            return list(range(len(self._names)))
+        if len(query) <= GRAM_SIZE:
+            return self._postings.get(query, [])
+
+        grams = {query[start:start + GRAM_SIZE] for start in range(len(query) - GRAM_SIZE + 1)}
+        postings = sorted((self._postings.get(gram, []) for gram in grams), key=len)
+        candidates = set(postings[0]).intersection(*postings[1:])
+        return [position for position in sorted(candidates) if query in self._names[position]]
+
+    def _prefix_range(self, query: str) -> range:
+        """Positions of names starting with query; exact matches come first"""
+        return range(bisect_left(self._names, query), bisect_left(self._names, query + MAX_CHAR))
+
+    def search(self, query: str, limit: Optional[int] = None,
+               tag_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Tags whose name contains query, ranked exact > prefix > contains, then by name"""
+        query = query.lower()
+        prefix = self._prefix_range(query)
+        remaining = (
+            position for position in self._contains_positions(query)
+            if position not in prefix
+        )
+
+        results = []
+        for positions in (prefix, remaining):
+            for position in positions:
+                tag = self._tags[position]
+                if tag_type and tag.get("type") != tag_type:
+                    continue
+                results.append(dict(tag))
+                if limit is not None and len(results) >= limit:
+                    return results
+        return results
+
+    def matching(self, query: str) -> List[Dict[str, Any]]:
+        """Tags whose name contains query, in name order"""
+        return [dict(self._tags[position]) for position in self._contains_positions(query.lower())]
+
+    def matching_ids(self, query: str) -> List[str]:
+        """IDs of the tags whose name contains query"""
+        return [self._tags[position]["tag_id"] for position in self._contains_positions(query.lower())]
@@ -0,0 +1,8 @@
+import os
+import sys
+from pathlib import Path
+
+# Tests import the backend modules directly and run on the in-memory SQLite backend
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ["STORAGE_BACKEND"] = "sqlite"
+os.environ["SQLITE_DATABASE_PATH"] = ":memory:"
@@ -0,0 +1,63 @@
+import uuid
+
+from fastapi.testclient import TestClient
+
+import bulk_import
+import main
+from database import expenses_repo
+
+def upload(user_id, rows):
+    body = "amount,place,expense_date\n" + "".join(f"{amount},shop,2024-01-01\n" for amount in rows)
+    return TestClient(main.app).post(
+        "/api/expenses/import",
+        params={"user_id": user_id},
+        files={"file": ("expenses.csv", body.encode(), "text/csv")},
+    )
+
+def stored_expenses(user_id):
+    return expenses_repo.backend.select("expenses", filters={"user_id": user_id})
+
+def test_over_cap_upload_inserts_nothing(monkeypatch):
+    monkeypatch.setattr(bulk_import, "IMPORT_MAX_ROWS", 5)
+    monkeypatch.setattr(bulk_import, "INSERT_BATCH_SIZE", 2)
+    user_id = str(uuid.uuid4())
+
+    response = upload(user_id, range(1, 7))
+
+    assert response.status_code == 400
+    assert "limited to 5 rows" in response.json()["detail"]
+    assert stored_expenses(user_id) == []
+
+def test_failed_batch_reports_rows_actually_inserted(monkeypatch):
+    monkeypatch.setattr(bulk_import, "INSERT_BATCH_SIZE", 2)
+    create_many = expenses_repo.create_many
+    calls = []
+
+    async def fail_second_batch(rows, *args, **kwargs):
+        calls.append(len(rows))
+        if len(calls) == 2:
+            raise RuntimeError("connection reset")
+        return await create_many(rows, *args, **kwargs)
+
+    monkeypatch.setattr(expenses_repo, "create_many", fail_second_batch)
+    user_id = str(uuid.uuid4())
+
+    response = upload(user_id, range(1, 6))
+
+    assert response.status_code == 200
+    result = response.json()
+    assert result["imported"] == len(stored_expenses(user_id)) == 2
+    assert "connection reset" in result["error"]
+
+def test_invalid_utf8_inserts_nothing():
+    user_id = str(uuid.uuid4())
+    body = "amount,place\n1,shop\n2,caf\xe9\n".encode("latin-1")
+
+    response = TestClient(main.app).post(
+        "/api/expenses/import",
+        params={"user_id": user_id},
+        files={"file": ("expenses.csv", body, "text/csv")},
+    )
+
+    assert response.status_code == 400
+    assert stored_expenses(user_id) == []
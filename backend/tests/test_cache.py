@@ -0,0 +1,20 @@
+from cache import TTLCache
+
+def test_clear_rejects_builds_started_before_it():
+    cache = TTLCache()
+    cache.set("cached", 1)
+
+    # A build for a key with no entry yet reads its version, then a clear happens
+    version = cache.version("building")
+    cache.clear()
+    cache.set("building", "stale", version=version)
+
+    assert cache.get("building") is None
+    assert cache.get("cached") is None
+
+def test_set_after_clear_with_fresh_version_is_stored():
+    cache = TTLCache()
+    cache.clear()
+    cache.set("key", "fresh", version=cache.version("key"))
+
+    assert cache.get("key") == "fresh"
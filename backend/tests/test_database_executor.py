@@ -0,0 +1,56 @@
+import asyncio
+import threading
+
+from database import DatabaseExecutor
+
+def test_cancelled_queued_call_is_not_counted():
+    async def scenario():
+        executor = DatabaseExecutor(max_workers=1, queue_warning_depth=100)
+        release = threading.Event()
+        ran = []
+        try:
+            # Occupy the only worker so the next call stays queued
+            blocker = asyncio.ensure_future(executor.run(release.wait))
+            await asyncio.sleep(0.01)
+
+            queued = asyncio.ensure_future(executor.run(ran.append, "ran"))
+            await asyncio.sleep(0.01)
+            assert executor.stats()["queued"] == 1
+
+            queued.cancel()
+            await asyncio.gather(queued, return_exceptions=True)
+            assert executor.stats()["queued"] == 0
+
+            release.set()
+            await blocker
+            await asyncio.sleep(0.01)
+            stats = executor.stats()
+            assert (stats["queued"], stats["running"], stats["completed"]) == (0, 0, 1)
+            assert ran == []
+        finally:
+            release.set()
+            executor.shutdown()
+
+    asyncio.run(scenario())
+
+def test_timed_out_queued_call_is_not_counted():
+    async def scenario():
+        executor = DatabaseExecutor(max_workers=1, queue_warning_depth=100)
+        release = threading.Event()
+        try:
+            blocker = asyncio.ensure_future(executor.run(release.wait))
+            await asyncio.sleep(0.01)
+
+            try:
+                await asyncio.wait_for(executor.run(lambda: None), timeout=0.01)
+            except asyncio.TimeoutError:
+                pass
+            assert executor.stats()["queued"] == 0
+
+            release.set()
+            await blocker
+        finally:
+            release.set()
+            executor.shutdown()
+
+    asyncio.run(scenario())
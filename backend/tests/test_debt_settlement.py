@@ -0,0 +1,33 @@
+import asyncio
+import uuid
+
+from database import accounts_repo, debts_repo, expenses_repo, people_repo
+from routes.debts import settle_debts_in_bulk
+
+def test_overlapping_settles_apply_each_debt_once():
+    async def scenario():
+        user_id = str(uuid.uuid4())
+        account = await accounts_repo.create({"user_id": user_id, "account_name": "Bank", "balance": 100})
+        person = await people_repo.create({"user_id": user_id, "name": "Sam"})
+        debts = await debts_repo.create_many([
+            {"user_id": user_id, "person_id": person["person_id"], "amount": 30, "type": "IOwe", "is_settled": False},
+            {"user_id": user_id, "person_id": person["person_id"], "amount": 10, "type": "IOwe", "is_settled": False},
+            {"user_id": user_id, "person_id": person["person_id"], "amount": 5, "type": "OwedToMe", "is_settled": False},
+        ])
+
+        # Both requests read the debts while they were still unsettled
+        first, second = await asyncio.gather(
+            settle_debts_in_bulk(debts, person, account["account_id"]),
+            settle_debts_in_bulk(debts, person, account["account_id"]),
+        )
+
+        assert sorted([first["debts_settled"], second["debts_settled"]]) == [0, 3]
+        settled = first if first["debts_settled"] else second
+        assert (settled["total_i_owe"], settled["total_owed_to_me"]) == (40, 5)
+
+        balance = (await accounts_repo.get_by_id(account["account_id"], "account_id"))["balance"]
+        assert balance == 100 - 40 + 5
+        expenses = await expenses_repo.get_all({"user_id": user_id})
+        assert sorted(expense["amount"] for expense in expenses) == [10, 30]
+
+    asyncio.run(scenario())
@@ -0,0 +1,39 @@
+import json
+import uuid
+
+from fastapi.testclient import TestClient
+
+import main
+from routes import export
+
+SECTIONS = {
+    # record_type: (section, table, id column, date column)
+    "expense": ("expenses", "expenses", "expense_id", "expense_date"),
+    "income": ("income", "income", "income_id", "income_date"),
+    "disbursement": ("disbursements", "loan_disbursements", "disbursement_id", "disbursement_date"),
+}
+
+def test_export_includes_undated_rows_across_pages(monkeypatch):
+    monkeypatch.setattr(export, "EXPORT_PAGE_SIZE", 2)
+    user_id = str(uuid.uuid4())
+    dates = ["2024-02-01", None, "2024-01-01", None, None, "2024-03-01"]
+    seeded = {}
+    for record_type, (section, table, _, date_column) in SECTIONS.items():
+        repo = export.EXPORT_SECTIONS[section]["repo"]
+        seeded[record_type] = repo.backend.insert(
+            table, [{"user_id": user_id, "amount": 1, date_column: day} for day in dates]
+        )
+
+    response = TestClient(main.app).get(
+        f"/api/export/{user_id}", params={"sections": [section for section, *_ in SECTIONS.values()]}
+    )
+
+    assert response.status_code == 200
+    records = [json.loads(line) for line in response.text.splitlines()]
+    for record_type, (_, _, id_column, date_column) in SECTIONS.items():
+        exported = [record for record in records if record["record_type"] == record_type]
+        assert sorted(record[id_column] for record in exported) == sorted(row[id_column] for row in seeded[record_type])
+        # Dated rows first in date order, then the undated ones
+        assert [record[date_column] for record in exported] == [
+            "2024-01-01", "2024-02-01", "2024-03-01", None, None, None
+        ]
@@ -0,0 +1,68 @@
+import pytest
+
+from database import decode_cursor, encode_cursor
+from sqlite_storage import SQLiteBackend
+from storage import PostgrestBackend
+
+USER_ID = "00000000-0000-0000-0000-000000000001"
+DATES = ["2024-01-03", None, "2024-01-01", None, "2024-01-02", "2024-01-02", None]
+
+@pytest.fixture
+def backend():
+    backend = SQLiteBackend(":memory:")
+    backend.insert("expenses", [
+        {
+            "expense_id": f"00000000-0000-0000-0000-00000000010{index}",
+            "user_id": USER_ID,
+            "amount": 1,
+            "expense_date": expense_date,
+        }
+        for index, expense_date in enumerate(DATES)
+    ])
+    yield backend
+    backend.close()
+
+def keyset_pages(backend, order_by, page_size):
+    """Every row read a page at a time, passing the sort key through a cursor"""
+    rows, after = [], None
+    while True:
+        page = backend.select(
+            "expenses", filters={"user_id": USER_ID}, order_by=order_by, after=after, limit=page_size
+        )
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
+        after = decode_cursor(encode_cursor([page[-1][column] for column, _ in order_by]))
+
+@pytest.mark.parametrize("descending", [False, True])
+@pytest.mark.parametrize("page_size", [1, 2, 3])
+def test_keyset_pages_cover_null_sort_values(backend, descending, page_size):
+    order_by = [("expense_date", descending), ("expense_id", descending)]
+    expected = backend.select("expenses", filters={"user_id": USER_ID}, order_by=order_by)
+
+    rows = keyset_pages(backend, order_by, page_size)
+
+    assert [row["expense_id"] for row in rows] == [row["expense_id"] for row in expected]
+
+def test_cursor_keeps_null():
+    cursor = encode_cursor([None, "abc"])
+    assert decode_cursor(cursor) == [None, "abc"]
+
+class RecordingQuery:
+    def __init__(self):
+        self.filters = None
+
+    def or_(self, filters):
+        self.filters = filters
+        return self
+
+def test_postgrest_keyset_matches_nulls_with_is():
+    query = PostgrestBackend(client=None)._apply_keyset(RecordingQuery(), [
+        [("expense_date", "gt", "2024-01-02")],
+        [("expense_date", "null", None)],
+        [("expense_date", "null", None), ("expense_id", "gt", "abc")],
+    ])
+    assert query.filters == (
+        "expense_date.gt.2024-01-02,expense_date.is.null,"
+        "and(expense_date.is.null,expense_id.gt.abc)"
+    )
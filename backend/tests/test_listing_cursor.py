@@ -0,0 +1,27 @@
+import uuid
+
+from fastapi.testclient import TestClient
+
+import main
+from database import expenses_repo
+
+def test_skip_is_ignored_when_following_a_cursor():
+    user_id = str(uuid.uuid4())
+    expenses_repo.backend.insert("expenses", [
+        {"user_id": user_id, "amount": day, "expense_date": f"2024-01-{day:02d}"} for day in range(1, 8)
+    ])
+    client = TestClient(main.app)
+
+    # A client that keeps sending its original skip on every page
+    params = {"user_id": user_id, "limit": 2, "skip": 1}
+    amounts, cursor = [], None
+    while True:
+        response = client.get("/api/expenses/", params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        amounts.extend(float(expense["amount"]) for expense in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    # Newest first, skipping only the first row
+    assert amounts == [6, 5, 4, 3, 2, 1]
@@ -66,12 +66,22 @@ const formatCurrency = (amount: string | number): string => {
   return isNaN(num) ? '0.00' : num.toFixed(2);
 };
 
+interface PersonDebtSummary {
+  person_id: string;
+  person_name: string;
+  owed_to_me: number;
+  i_owe: number;
+  net_amount: number;
+  debts_count: number;
+}
+
 interface DebtSummary {
   total_owed_to_me: number;
   total_i_owe: number;
   net_balance: number;
   people_count: number;
   debts_count: number;
+  people: PersonDebtSummary[];
 }
 
 export default function DebtsPage() {
@@ -206,7 +216,16 @@ export default function DebtsPage() {
     return debts.filter(debt => debt.person_id === personId);
   };
 
+  // Per-person totals come from the server-side summary once it has loaded
+  const personSummaries = new Map(
+    (debtSummary?.people || []).map(summary => [summary.person_id, summary])
+  );
+
   const getPersonTotal = (personId: string, type: 'OwedToMe' | 'IOwe') => {
+    const summary = personSummaries.get(personId);
+    if (summary) {
+      return type === 'OwedToMe' ? summary.owed_to_me : summary.i_owe;
+    }
     const personDebts = getPersonDebts(personId);
     return personDebts
       .filter(debt => debt.type === type)
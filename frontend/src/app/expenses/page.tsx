@@ -207,34 +207,20 @@ const ExpensesPage = () => {
     
     setLoading(true);
     try {
-      // Fetch all expenses for the selected month at once; pagination is handled client-side
+      // Fetch all expenses for the selected month, following cursors so busy
+      // months aren't cut off; pagination is handled client-side
       const monthStart = startOfMonth(selectedMonth);
       const monthEnd = endOfMonth(selectedMonth);
       
-      const params: any = {
+      const monthExpenses = await expenseApi.getAllPages({
         user_id: user.id,
-        skip: 0,
         limit: 1000,
         start_date: format(monthStart, 'yyyy-MM-dd'),
         end_date: format(monthEnd, 'yyyy-MM-dd'),
-      };
-
-      const response = await expenseApi.getAll(params);
+      });
       
-      // Backend returns array directly, Axios wraps it in response.data
-      if (Array.isArray(response.data)) {
-        setExpenses(response.data);
-        setTotalCount(response.data.length);
-      } else if (response.data && typeof response.data === 'object' && 'data' in response.data) {
-        // Fallback: if backend returns paginated format
-        setExpenses(response.data.data);
-        setTotalCount(response.data.total || response.data.data?.length || 0);
-      } else {
-        // Empty or unexpected format
-        console.warn('Unexpected response format:', response.data);
-        setExpenses([]);
-        setTotalCount(0);
-      }
+      setExpenses(monthExpenses);
+      setTotalCount(monthExpenses.length);
     } catch (error: any) {
       console.error('Failed to load expenses:', error);
       console.error('Error details:', error.response?.data || error.message);
@@ -117,12 +117,14 @@ export default function IncomePage() {
         user_id: user.id,
         skip: page * rowsPerPage,
         limit: rowsPerPage,
+        include_total: true,
       });
       
       // Backend returns array directly, Axios wraps it in response.data
       if (Array.isArray(response.data)) {
         setIncome(response.data);
-        setTotalCount(response.data.length);
+        // The total across all pages comes from the X-Total-Count header
+        setTotalCount(parseInt(response.headers['x-total-count'] ?? '', 10) || response.data.length);
       } else if (response.data && typeof response.data === 'object' && 'data' in response.data) {
         // Fallback: if backend returns paginated format
         setIncome(response.data.data);
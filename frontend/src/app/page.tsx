@@ -60,18 +60,9 @@ import TagSelector from '@/components/TagSelector';
 import { 
   expenseApi, 
   incomeApi, 
-  accountApi, 
-  budgetApi, 
-  loanApi, 
-  debtApi,
-  peopleApi,
-  Expense, 
-  Income, 
+  dashboardApi,
   Account, 
-  Budget,
-  Loan,
-  Debt,
-  Person,
+  DashboardTransaction,
   Tag
 } from '@/lib/api';
 import { format, startOfMonth, endOfMonth, parseISO } from 'date-fns';
@@ -128,8 +119,8 @@ const Dashboard = () => {
 
   const [recentTransactions, setRecentTransactions] = useState<RecentTransaction[]>([]);
   const [accounts, setAccounts] = useState<Account[]>([]);
-  const [loans, setLoans] = useState<Loan[]>([]);
-  const [debts, setDebts] = useState<Debt[]>([]);
+  const [loanCount, setLoanCount] = useState(0);
+  const [debtCount, setDebtCount] = useState(0);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
 
@@ -191,88 +182,23 @@ const Dashboard = () => {
 
 
 
-      const currentDate = new Date();
-      const monthStart = startOfMonth(currentDate);
-      const monthEnd = endOfMonth(currentDate);
-
-      // Load all data in parallel with individual error handling
-      const results = await Promise.allSettled([
-        accountApi.getAll(user.id),
-        expenseApi.getAll({
-          user_id: user.id,
-          skip: 0,
-          limit: 50,
-          start_date: monthStart.toISOString().split('T')[0],
-          end_date: monthEnd.toISOString().split('T')[0]
-        }),
-        incomeApi.getAll({
-          user_id: user.id,
-          skip: 0,
-          limit: 50,
-          start_date: monthStart.toISOString().split('T')[0],
-          end_date: monthEnd.toISOString().split('T')[0]
-        }),
-        budgetApi.getForMonth(user.id, currentDate.getMonth() + 1, currentDate.getFullYear()),
-        loanApi.getAll(user.id),
-        debtApi.getAll({ user_id: user.id }),
-      ]);
-
-      // Extract data or use empty arrays/null for failed requests
-      const accountsResponse = results[0].status === 'fulfilled' ? results[0].value : { data: [] };
-      const expensesResponse = results[1].status === 'fulfilled' ? results[1].value : { data: [] };
-      const incomeResponse = results[2].status === 'fulfilled' ? results[2].value : { data: [] };
-      const budgetResponse = results[3].status === 'fulfilled' ? results[3].value : { data: null };
-      const loansResponse = results[4].status === 'fulfilled' ? results[4].value : { data: [] };
-      const debtsResponse = results[5].status === 'fulfilled' ? results[5].value : { data: [] };
-
-      // Log any failures for debugging
-      results.forEach((result, index) => {
-        if (result.status === 'rejected') {
-          const names = ['accounts', 'expenses', 'income', 'budgets', 'loans', 'debts'];
-          console.error(`Failed to load ${names[index]}:`, result.reason);
-        }
-      });
-
-      // Ensure data is always an array
-      const accountsData = Array.isArray(accountsResponse.data) ? accountsResponse.data : [];
-      const expensesData = Array.isArray(expensesResponse.data) ? expensesResponse.data : [];
-      const incomeData = Array.isArray(incomeResponse.data) ? incomeResponse.data : [];
-      const budgetData = budgetResponse.data;
-      const loansData = Array.isArray(loansResponse.data) ? loansResponse.data : [];
-      const debtsData = Array.isArray(debtsResponse.data) ? debtsResponse.data : [];
-
-      setAccounts(accountsData);
-      setLoans(loansData);
-      setDebts(debtsData);
-
-      // Calculate stats
-      const totalBalance = accountsData.reduce((sum: number, account: Account) => 
-        sum + parseFloat(account.balance.toString()), 0
-      );
+      // One request returns the accounts, month totals and recent transactions
+      const { data } = await dashboardApi.get(user.id);
 
-      const monthlyExpenses = expensesData.reduce((sum: number, expense: Expense) => 
-        sum + parseFloat(expense.amount.toString()), 0
-      );
+      setAccounts(data.accounts);
+      setLoanCount(data.loan_count);
+      setDebtCount(data.unsettled_debt_count);
 
-      const monthlyIncome = incomeData.reduce((sum: number, income: Income) => 
-        sum + parseFloat(income.amount.toString()), 0
-      );
-
-      const monthlyBudget = budgetData?.amount ? parseFloat(budgetData.amount.toString()) : 0;
+      const totalBalance = parseFloat(data.total_balance.toString());
+      const monthlyIncome = parseFloat(data.monthly_income.toString());
+      const monthlyExpenses = parseFloat(data.monthly_expenses.toString());
+      const monthlyBudget = data.monthly_budget != null ? parseFloat(data.monthly_budget.toString()) : 0;
       const budgetUsed = monthlyBudget > 0 ? (monthlyExpenses / monthlyBudget) * 100 : 0;
       const budgetRemaining = monthlyBudget - monthlyExpenses;
-
-      const totalLoans = loansData.reduce((sum: number, loan: Loan) => 
-        sum + parseFloat(loan.remaining_amount?.toString() || '0'), 0
-      );
-
-      const totalDebts = debtsData
-        .filter((debt: Debt) => !debt.is_settled)
-        .reduce((sum: number, debt: Debt) => sum + parseFloat(debt.amount.toString()), 0);
-
-      const netWorth = totalBalance - totalLoans - totalDebts;
+      const totalLoans = parseFloat(data.total_loans.toString());
+      const totalDebts = parseFloat(data.total_debts.toString());
+      const netWorth = parseFloat(data.net_worth.toString());
       const savingsRate = monthlyIncome > 0 ? ((monthlyIncome - monthlyExpenses) / monthlyIncome) * 100 : 0;
-      const transactionCount = expensesData.length + incomeData.length;
 
       setStats({
         totalBalance,
@@ -285,37 +211,18 @@ const Dashboard = () => {
         totalDebts,
         netWorth,
         savingsRate,
-        transactionCount,
+        transactionCount: data.transaction_count,
       });
 
-      // Prepare recent transactions
-      const recentExpenses: RecentTransaction[] = expensesData
-        .slice(0, 5)
-        .map((expense: Expense) => ({
-          id: expense.expense_id,
-          type: 'expense' as const,
-          amount: parseFloat(expense.amount.toString()),
-          description: expense.place || 'Expense',
-          tag: expense.tag_name || 'Uncategorized',
-          date: expense.expense_date || '',
-        }));
-
-      const recentIncomes: RecentTransaction[] = incomeData
-        .slice(0, 5)
-        .map((income: Income) => ({
-          id: income.income_id,
-          type: 'income' as const,
-          amount: parseFloat(income.amount.toString()),
-          description: income.notes || 'Income',
-          tag: income.tag_name || 'Uncategorized',
-          date: income.income_date || '',
-        }));
-
-      const allTransactions = [...recentExpenses, ...recentIncomes]
-        .sort((a, b) => new Date(b.date).getTime() - new Date(a.date).getTime())
-        .slice(0, 8);
-
-      setRecentTransactions(allTransactions);
+      // Already merged and sorted newest first by the backend
+      setRecentTransactions(data.recent_transactions.map((transaction: DashboardTransaction) => ({
+        id: transaction.id,
+        type: transaction.type,
+        amount: parseFloat(transaction.amount.toString()),
+        description: transaction.description,
+        tag: transaction.tag_name || 'Uncategorized',
+        date: transaction.transaction_date || '',
+      })));
 
     } catch (error) {
       console.error('Failed to load dashboard data:', error);
@@ -514,7 +421,7 @@ const Dashboard = () => {
   }
 
   // Check if user has any data
-  const hasAnyData = accounts.length > 0 || loans.length > 0 || debts.length > 0 || 
+  const hasAnyData = accounts.length > 0 || loanCount > 0 || debtCount > 0 || 
                      stats.monthlyIncome > 0 || stats.monthlyExpenses > 0;
 
 
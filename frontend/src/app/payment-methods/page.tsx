@@ -255,20 +255,12 @@ const PaymentMethodsPage = () => {
         return;
       }
 
-      // Perform transfer by updating both accounts
-      const newFromBalance = fromBalance - transferAmount;
-      const newToBalance = parseFloat(toAccount.balance.toString()) + transferAmount;
-
-      // Update source account
-      await accountApi.update(fromAccountId, {
-        ...fromAccount,
-        balance: newFromBalance,
-      });
-
-      // Update destination account
-      await accountApi.update(toAccountId, {
-        ...toAccount,
-        balance: newToBalance,
+      // Debit and credit both accounts in one atomic request
+      await accountApi.transfer({
+        user_id: user.id,
+        from_account_id: fromAccountId,
+        to_account_id: toAccountId,
+        amount: transferAmount,
       });
 
       showNotification(
@@ -55,24 +55,15 @@ import Layout from '@/components/Layout';
 import ProtectedRoute from '@/components/ProtectedRoute';
 import { useAuth } from '@/contexts/AuthContext';
 import { 
-  expenseApi, 
-  incomeApi, 
   accountApi, 
-  budgetApi, 
-  loanApi, 
-  debtApi,
-  loanDisbursementApi,
-  tagApi,
-  Expense, 
-  Income, 
+  statisticsApi,
   Account, 
-  Budget,
-  Loan,
-  Debt,
-  LoanDisbursement,
-  Tag
+  CategoryStatistics,
+  LoanStatistics,
+  MonthlyStatistics,
+  Statistics
 } from '@/lib/api';
-import { format, startOfMonth, endOfMonth, subMonths, parseISO, startOfYear, endOfYear } from 'date-fns';
+import { format, startOfMonth, endOfMonth, subMonths, startOfYear, endOfYear } from 'date-fns';
 import EmptyState from '@/components/EmptyState';
 
 // Register Chart.js components
@@ -103,6 +94,7 @@ interface MonthlyData {
   income: number;
   expenses: number;
   savings: number;
+  budget: number | null;
 }
 
 interface CategoryData {
@@ -130,11 +122,11 @@ const StatisticsPage = () => {
   const [expenseCategories, setExpenseCategories] = useState<CategoryData[]>([]);
   const [incomeCategories, setIncomeCategories] = useState<CategoryData[]>([]);
   const [accounts, setAccounts] = useState<Account[]>([]);
-  const [loans, setLoans] = useState<Loan[]>([]);
-  const [debts, setDebts] = useState<Debt[]>([]);
-  const [budgets, setBudgets] = useState<Budget[]>([]);
-  const [loanDisbursements, setLoanDisbursements] = useState<LoanDisbursement[]>([]);
-  const [expenses, setExpenses] = useState<Expense[]>([]);
+  const [loans, setLoans] = useState<LoanStatistics[]>([]);
+  const [debtSummary, setDebtSummary] = useState({ owedToMe: 0, iOwe: 0, count: 0 });
+  const [totalLoanAmount, setTotalLoanAmount] = useState(0);
+  const [disbursementCount, setDisbursementCount] = useState(0);
+  const [disbursementsByMonth, setDisbursementsByMonth] = useState<{ month: string; amount: number }[]>([]);
 
   // Filter states
   const [dateRange, setDateRange] = useState('6months');
@@ -179,99 +171,49 @@ const StatisticsPage = () => {
 
       const { start, end } = getDateRange();
       
-      // Load all data in parallel
-      const [
-        accountsResponse,
-        expensesResponse,
-        incomeResponse,
-        loansResponse,
-        debtsResponse,
-        budgetsResponse,
-      ] = await Promise.all([
+      // Totals, monthly series and category breakdowns are aggregated server-side
+      const [accountsResponse, statisticsResponse] = await Promise.all([
         accountApi.getAll(user.id),
-        expenseApi.getAll({
+        statisticsApi.get({
           user_id: user.id,
-          skip: 0,
-          limit: 1000,
-          start_date: start.toISOString().split('T')[0],
-          end_date: end.toISOString().split('T')[0]
+          start_date: format(start, 'yyyy-MM-dd'),
+          end_date: format(end, 'yyyy-MM-dd'),
         }),
-        incomeApi.getAll({
-          user_id: user.id,
-          skip: 0,
-          limit: 1000,
-          start_date: start.toISOString().split('T')[0],
-          end_date: end.toISOString().split('T')[0]
-        }),
-        loanApi.getAll(user.id),
-        debtApi.getAll({ user_id: user.id }),
-        budgetApi.getAll(user.id, end.getFullYear()),
       ]);
 
       const accountsData = accountsResponse.data || [];
-      const expensesData = expensesResponse.data || [];
-      const incomeData = incomeResponse.data || [];
-      const loansData = loansResponse.data || [];
-      const debtsData = debtsResponse.data || [];
-      const budgetsData = budgetsResponse.data || [];
+      const statistics: Statistics = statisticsResponse.data;
+      const overview = statistics.overview;
 
       setAccounts(accountsData);
-      setLoans(loansData);
-      setDebts(debtsData);
-      setBudgets(budgetsData);
-      setExpenses(expensesData);
-
-      // Load loan disbursements for all loans
-      const disbursementPromises = loansData.map((loan: Loan) =>
-        loanDisbursementApi.getAll(loan.loan_id).catch(() => ({ data: [] }))
-      );
-      const disbursementResponses = await Promise.all(disbursementPromises);
-      const allDisbursements = disbursementResponses.flatMap(res => res.data || []);
-      setLoanDisbursements(allDisbursements);
-
-      // Calculate overview stats
-      const totalBalance = accountsData.reduce((sum: number, account: Account) => 
-        sum + parseFloat(account.balance.toString()), 0
-      );
-
-      const totalExpenses = expensesData.reduce((sum: number, expense: Expense) => 
-        sum + parseFloat(expense.amount.toString()), 0
+      setLoans(statistics.loans);
+      setTotalLoanAmount(toNumber(overview.total_loan_amount));
+      setDisbursementCount(statistics.disbursement_count);
+      setDisbursementsByMonth(
+        statistics.disbursements_by_month.map(entry => ({
+          month: formatMonth(entry.year, entry.month),
+          amount: toNumber(entry.amount),
+        }))
       );
-
-      const totalIncome = incomeData.reduce((sum: number, income: Income) => 
-        sum + parseFloat(income.amount.toString()), 0
-      );
-
-      const totalLoans = loansData.reduce((sum: number, loan: Loan) => 
-        sum + parseFloat(loan.remaining_amount?.toString() || '0'), 0
-      );
-
-      const totalDebts = debtsData
-        .filter((debt: Debt) => !debt.is_settled)
-        .reduce((sum: number, debt: Debt) => sum + parseFloat(debt.amount.toString()), 0);
-
-      const netWorth = totalBalance - totalLoans - totalDebts;
-      const actualSavings = totalIncome - totalExpenses;
+      setDebtSummary({
+        owedToMe: toNumber(overview.owed_to_me),
+        iOwe: toNumber(overview.i_owe),
+        count: overview.unsettled_debt_count,
+      });
 
       setOverviewStats({
-        totalBalance,
-        totalIncome,
-        totalExpenses,
-        netWorth,
-        actualSavings,
-        totalLoans,
-        totalDebts,
+        totalBalance: toNumber(overview.total_balance),
+        totalIncome: toNumber(overview.total_income),
+        totalExpenses: toNumber(overview.total_expenses),
+        netWorth: toNumber(overview.net_worth),
+        actualSavings: toNumber(overview.actual_savings),
+        totalLoans: toNumber(overview.total_loans),
+        totalDebts: toNumber(overview.total_debts),
       });
 
-      // Calculate monthly trends
-      const monthlyData = calculateMonthlyTrends(expensesData, incomeData);
-      setMonthlyTrends(monthlyData);
-
-      // Calculate category breakdowns
-      const expenseCats = calculateCategoryBreakdown(expensesData, 'expense');
-      const incomeCats = calculateCategoryBreakdown(incomeData, 'income');
-      setExpenseCategories(expenseCats);
-      setIncomeCategories(incomeCats);
+      setMonthlyTrends(statistics.monthly.map(toMonthlyData));
+      setExpenseCategories(toCategoryData(statistics.expense_categories));
+      setIncomeCategories(toCategoryData(statistics.income_categories));
 
     } catch (error) {
       console.error('Failed to load statistics data:', error);
@@ -281,102 +223,56 @@ const StatisticsPage = () => {
     }
   };
 
-  const calculateMonthlyTrends = (expenses: Expense[], income: Income[]): MonthlyData[] => {
-    const monthlyMap = new Map<string, { income: number; expenses: number }>();
-    
-    // Process expenses
-    expenses.forEach(expense => {
-      const month = format(parseISO(expense.expense_date || ''), 'MMM yyyy');
-      const current = monthlyMap.get(month) || { income: 0, expenses: 0 };
-      current.expenses += parseFloat(expense.amount.toString());
-      monthlyMap.set(month, current);
-    });
-
-    // Process income
-    income.forEach(inc => {
-      const month = format(parseISO(inc.income_date || ''), 'MMM yyyy');
-      const current = monthlyMap.get(month) || { income: 0, expenses: 0 };
-      current.income += parseFloat(inc.amount.toString());
-      monthlyMap.set(month, current);
-    });
-
-    // Convert to array and sort
-    return Array.from(monthlyMap.entries())
-      .map(([month, data]) => ({
-        month,
-        income: data.income,
-        expenses: data.expenses,
-        savings: data.income - data.expenses,
-      }))
-      .sort((a, b) => new Date(a.month).getTime() - new Date(b.month).getTime());
-  };
+  // Decimal fields arrive from the API as strings
+  const toNumber = (value: number | string | null | undefined): number =>
+    parseFloat(value?.toString() || '0');
 
-  const calculateCategoryBreakdown = (data: (Expense | Income)[], type: 'expense' | 'income'): CategoryData[] => {
-    const categoryMap = new Map<string, number>();
-    
-    data.forEach(item => {
-      const category = item.tag_name || 'Uncategorized';
-      const current = categoryMap.get(category) || 0;
-      categoryMap.set(category, current + parseFloat(item.amount.toString()));
-    });
+  const formatMonth = (year: number, month: number): string =>
+    format(new Date(year, month - 1, 1), 'MMM yyyy');
+
+  const toMonthlyData = (entry: MonthlyStatistics): MonthlyData => ({
+    month: formatMonth(entry.year, entry.month),
+    income: toNumber(entry.income),
+    expenses: toNumber(entry.expenses),
+    savings: toNumber(entry.savings),
+    budget: entry.budget === null || entry.budget === undefined ? null : toNumber(entry.budget),
+  });
 
+  const toCategoryData = (categories: CategoryStatistics[]): CategoryData[] => {
     const colors = [
       '#FF6384', '#36A2EB', '#FFCE56', '#4BC0C0', '#9966FF', 
       '#FF9F40', '#FF6384', '#C9CBCF', '#4BC0C0', '#FF6384'
     ];
 
-    return Array.from(categoryMap.entries())
-      .map(([name, amount], index) => ({
-        name,
-        amount,
+    // Categories come back sorted by amount, largest first
+    return categories
+      .slice(0, 8) // Top 8 categories
+      .map((category, index) => ({
+        name: category.name,
+        amount: toNumber(category.amount),
         color: colors[index % colors.length],
-      }))
-      .sort((a, b) => b.amount - a.amount)
-      .slice(0, 8); // Top 8 categories
+      }));
   };
 
-  const calculateBudgetVsExpenses = (budgets: Budget[], expenses: Expense[]) => {
-    const monthlyBudgetMap = new Map<string, number>();
-    const monthlyExpenseMap = new Map<string, number>();
-
-    // Process budgets
-    budgets.forEach(budget => {
-      const monthKey = `${budget.year}-${String(budget.month).padStart(2, '0')}`;
-      monthlyBudgetMap.set(monthKey, parseFloat(budget.amount.toString()));
-    });
-
-    // Process expenses by month
-    expenses.forEach(expense => {
-      if (expense.expense_date) {
-        const date = parseISO(expense.expense_date);
-        const monthKey = format(date, 'yyyy-MM');
-        const current = monthlyExpenseMap.get(monthKey) || 0;
-        monthlyExpenseMap.set(monthKey, current + parseFloat(expense.amount.toString()));
-      }
-    });
-
-    // Get all unique months
-    const allMonths = Array.from(new Set([...monthlyBudgetMap.keys(), ...monthlyExpenseMap.keys()]))
-      .sort()
-      .slice(-6); // Last 6 months
+  const calculateBudgetVsExpenses = (monthlyData: MonthlyData[]) => {
+    // Months with a budget or any spending, last 6 months
+    const months = monthlyData
+      .filter(data => data.budget !== null || data.expenses > 0)
+      .slice(-6);
 
     return {
-      labels: allMonths.map(month => {
-        const [year, monthNum] = month.split('-');
-        const date = new Date(parseInt(year), parseInt(monthNum) - 1, 1);
-        return format(date, 'MMM yyyy');
-      }),
+      labels: months.map(data => data.month),
       datasets: [
         {
           label: 'Budget',
-          data: allMonths.map(month => monthlyBudgetMap.get(month) || 0),
+          data: months.map(data => data.budget || 0),
           backgroundColor: 'rgba(54, 162, 235, 0.6)',
           borderColor: 'rgba(54, 162, 235, 1)',
           borderWidth: 2,
         },
         {
           label: 'Expenses',
-          data: allMonths.map(month => monthlyExpenseMap.get(month) || 0),
+          data: months.map(data => data.expenses),
           backgroundColor: 'rgba(255, 99, 132, 0.6)',
           borderColor: 'rgba(255, 99, 132, 1)',
           borderWidth: 2,
@@ -417,7 +313,7 @@ const StatisticsPage = () => {
     ],
   };
 
-  const budgetVsExpensesData = calculateBudgetVsExpenses(budgets, expenses);
+  const budgetVsExpensesData = calculateBudgetVsExpenses(monthlyTrends);
 
   const expenseCategoryChartData = {
     labels: expenseCategories.map(cat => cat.name),
@@ -746,7 +642,7 @@ const StatisticsPage = () => {
             </AccordionSummary>
             <AccordionDetails>
               <Box height={400}>
-                {monthlyTrends.length > 0 ? (
+                {monthlyTrends.some(data => data.income > 0 || data.expenses > 0) ? (
                   <Line data={timelineChartData} options={chartOptions} />
                 ) : (
                   <EmptyState
@@ -791,7 +687,7 @@ const StatisticsPage = () => {
                         Number of Debt Entries
                       </Typography>
                       <Typography variant="h6">
-                        {debts.filter(debt => !debt.is_settled).length}
+                        {debtSummary.count}
                       </Typography>
                     </Box>
                   </Stack>
@@ -804,21 +700,13 @@ const StatisticsPage = () => {
                     <Box display="flex" justifyContent="space-between">
                       <Typography variant="body2">Owed to Me:</Typography>
                       <Typography variant="body2" color="success.main">
-                        {formatCurrency(
-                          debts
-                            .filter(debt => debt.type === 'OwedToMe' && !debt.is_settled)
-                            .reduce((sum, debt) => sum + parseFloat(debt.amount.toString()), 0)
-                        )}
+                        {formatCurrency(debtSummary.owedToMe)}
                       </Typography>
                     </Box>
                     <Box display="flex" justifyContent="space-between">
                       <Typography variant="body2">I Owe:</Typography>
                       <Typography variant="body2" color="error.main">
-                        {formatCurrency(
-                          debts
-                            .filter(debt => debt.type === 'IOwe' && !debt.is_settled)
-                            .reduce((sum, debt) => sum + parseFloat(debt.amount.toString()), 0)
-                        )}
+                        {formatCurrency(debtSummary.iOwe)}
                       </Typography>
                     </Box>
                   </Stack>
@@ -851,11 +739,7 @@ const StatisticsPage = () => {
                         Total Loan Amount
                       </Typography>
                       <Typography variant="h6" color="primary.main">
-                        {formatCurrency(
-                          loans.reduce((sum, loan) => 
-                            sum + parseFloat(loan.total_amount?.toString() || '0'), 0
-                          )
-                        )}
+                        {formatCurrency(totalLoanAmount)}
                       </Typography>
                     </Box>
                     <Box>
@@ -879,7 +763,7 @@ const StatisticsPage = () => {
                         Total Disbursements
                       </Typography>
                       <Typography variant="h6" color="warning.main">
-                        {loanDisbursements.length}
+                        {disbursementCount}
                       </Typography>
                     </Box>
                   </Stack>
@@ -890,9 +774,6 @@ const StatisticsPage = () => {
                   </Typography>
                   <Stack spacing={2}>
                     {loans.map((loan, index) => {
-                      const loanDisbursementsForLoan = loanDisbursements.filter(
-                        d => d.loan_id === loan.loan_id
-                      );
                       return (
                         <Box key={loan.loan_id} sx={{ p: 2, border: '1px solid', borderColor: 'divider', borderRadius: 1 }}>
                           <Typography variant="body1" fontWeight="medium" gutterBottom>
@@ -914,7 +795,7 @@ const StatisticsPage = () => {
                             <Box display="flex" justifyContent="space-between">
                               <Typography variant="body2" color="text.secondary">Disbursements:</Typography>
                               <Typography variant="body2" fontWeight="medium">
-                                {loanDisbursementsForLoan.length}
+                                {loan.disbursement_count}
                               </Typography>
                             </Box>
                           </Stack>
@@ -928,29 +809,19 @@ const StatisticsPage = () => {
                     )}
                   </Stack>
                 </Grid>
-                {loanDisbursements.length > 0 && (
+                {disbursementsByMonth.length > 0 && (
                   <Grid item xs={12}>
                     <Typography variant="subtitle1" gutterBottom>
                       Disbursements Over Time
                     </Typography>
                     <Box height={300}>
                       {(() => {
-                        const disbursementMap = new Map<string, number>();
-                        loanDisbursements.forEach(disbursement => {
-                          if (disbursement.disbursement_date) {
-                            const month = format(parseISO(disbursement.disbursement_date), 'MMM yyyy');
-                            const current = disbursementMap.get(month) || 0;
-                            disbursementMap.set(month, current + parseFloat(disbursement.amount.toString()));
-                          }
-                        });
-                        const sortedMonths = Array.from(disbursementMap.entries())
-                          .sort((a, b) => new Date(a[0]).getTime() - new Date(b[0]).getTime());
-                        
+                        // Already grouped and sorted by month on the server
                         const disbursementChartData = {
-                          labels: sortedMonths.map(([month]) => month),
+                          labels: disbursementsByMonth.map(entry => entry.month),
                           datasets: [{
                             label: 'Disbursement Amount',
-                            data: sortedMonths.map(([, amount]) => amount),
+                            data: disbursementsByMonth.map(entry => entry.amount),
                             borderColor: 'rgba(255, 159, 64, 1)',
                             backgroundColor: 'rgba(255, 159, 64, 0.1)',
                             borderWidth: 2,
@@ -75,6 +75,11 @@ export interface Account {
   created_at: string;
 }
 
+export interface AccountTransferResult {
+  from_account: Account;
+  to_account: Account;
+}
+
 export interface Tag {
   tag_id: string;
   user_id: string;
@@ -173,8 +178,113 @@ export interface Income {
   tag_name?: string;
 }
 
+export interface StatisticsOverview {
+  total_balance: number;
+  total_income: number;
+  total_expenses: number;
+  actual_savings: number;
+  total_loans: number;
+  total_loan_amount: number;
+  total_debts: number;
+  owed_to_me: number;
+  i_owe: number;
+  unsettled_debt_count: number;
+  net_worth: number;
+}
+
+export interface MonthlyStatistics {
+  year: number;
+  month: number;
+  income: number;
+  expenses: number;
+  savings: number;
+  budget?: number | null;
+}
+
+export interface CategoryStatistics {
+  tag_id?: string | null;
+  name: string;
+  amount: number;
+  count: number;
+}
+
+export interface LoanStatistics {
+  loan_id: string;
+  loan_name?: string;
+  total_amount: number;
+  remaining_amount: number;
+  disbursement_count: number;
+  total_disbursed: number;
+}
+
+export interface Statistics {
+  start_date: string;
+  end_date: string;
+  overview: StatisticsOverview;
+  monthly: MonthlyStatistics[];
+  expense_categories: CategoryStatistics[];
+  income_categories: CategoryStatistics[];
+  loans: LoanStatistics[];
+  disbursement_count: number;
+  disbursements_by_month: { year: number; month: number; amount: number }[];
+}
+
+export interface DashboardTransaction {
+  id: string;
+  type: 'expense' | 'income';
+  amount: number;
+  description: string;
+  tag_name?: string;
+  account_name?: string;
+  transaction_date?: string;
+}
+
+export interface Dashboard {
+  year: number;
+  month: number;
+  accounts: Account[];
+  total_balance: number;
+  monthly_income: number;
+  monthly_expenses: number;
+  monthly_budget?: number;
+  budget_remaining?: number;
+  transaction_count: number;
+  total_loans: number;
+  loan_count: number;
+  total_debts: number;
+  unsettled_debt_count: number;
+  net_worth: number;
+  recent_transactions: DashboardTransaction[];
+}
+
 // API Functions
 
+// Listing params shared by the expense and income endpoints. Pages are keyset
+// paginated: the X-Next-Cursor response header is the `cursor` for the next page.
+interface ListingParams {
+  user_id: string;
+  skip?: number;
+  limit?: number;
+  cursor?: string;
+  include_total?: boolean;
+  start_date?: string;
+  end_date?: string;
+}
+
+// Follow X-Next-Cursor until every matching row has been loaded
+const getAllPages = async <T>(url: string, params: ListingParams): Promise<T[]> => {
+  const rows: T[] = [];
+  let cursor: string | undefined;
+  do {
+    // skip only positions the first page; later pages continue from the cursor
+    const pageParams = cursor ? { ...params, skip: undefined, cursor } : { ...params, cursor };
+    const response = await api.get<T[]>(url, { params: pageParams });
+    rows.push(...response.data);
+    cursor = response.headers['x-next-cursor'];
+  } while (cursor);
+  return rows;
+};
+
 export const accountApi = {
   create: (data: { user_id: string; account_name: string; balance: number }) =>
     api.post('/api/accounts/', data),
@@ -184,25 +294,23 @@ export const accountApi = {
     api.put(`/api/accounts/${accountId}`, data),
   delete: (accountId: string) => api.delete(`/api/accounts/${accountId}`),
   getTotalBalance: (userId: string) => api.get(`/api/accounts/user/${userId}/total-balance`),
+  transfer: (data: { user_id: string; from_account_id: string; to_account_id: string; amount: number }) =>
+    api.post<AccountTransferResult>('/api/accounts/transfer', data),
 };
 
 export const expenseApi = {
   create: (data: Omit<Expense, 'expense_id' | 'created_at' | 'account_name'>) =>
     api.post('/api/expenses/', data),
-  getAll: (params: {
-    user_id: string;
-    skip?: number;
-    limit?: number;
-    category?: string;
-    start_date?: string;
-    end_date?: string;
-  }) => api.get('/api/expenses/', { params }),
+  getAll: (params: ListingParams & { category?: string }) => api.get('/api/expenses/', { params }),
+  getAllPages: (params: ListingParams) => getAllPages<Expense>('/api/expenses/', params),
   getById: (expenseId: string) => api.get(`/api/expenses/${expenseId}`),
   update: (expenseId: string, data: Omit<Expense, 'expense_id' | 'created_at' | 'account_name'>) =>
     api.put(`/api/expenses/${expenseId}`, data),
   delete: (expenseId: string) => api.delete(`/api/expenses/${expenseId}`),
   getBudgetSummary: (userId: string, month: number, year: number) =>
     api.get(`/api/expenses/budget-summary?user_id=${userId}&month=${month}&year=${year}`),
+  getYearlyBudgetSummary: (userId: string, year: number) =>
+    api.get<BudgetSummary[]>(`/api/expenses/budget-summary/yearly?user_id=${userId}&year=${year}`),
 };
 
 export const budgetApi = {
@@ -244,6 +352,7 @@ export const debtApi = {
     api.put(`/api/debts/${debtId}`, data, { params: data.account_id ? { account_id: data.account_id } : {} }),
   delete: (debtId: string) => api.delete(`/api/debts/${debtId}`),
   getSummary: (userId: string) => api.get(`/api/debts/summary/${userId}`),
+  getPersonSummary: (personId: string) => api.get(`/api/debts/person/${personId}/summary`),
 };
 
 export const loanApi = {
@@ -286,14 +395,8 @@ export const assistantApi = {
 export const incomeApi = {
   create: (data: Omit<Income, 'income_id' | 'created_at' | 'account_name'>) =>
     api.post('/api/income/', data),
-  getAll: (params: {
-    user_id: string;
-    skip?: number;
-    limit?: number;
-    source?: string;
-    start_date?: string;
-    end_date?: string;
-  }) => api.get('/api/income/', { params }),
+  getAll: (params: ListingParams & { source?: string }) => api.get('/api/income/', { params }),
+  getAllPages: (params: ListingParams) => getAllPages<Income>('/api/income/', params),
   getById: (incomeId: string) => api.get(`/api/income/${incomeId}`),
   update: (incomeId: string, data: Omit<Income, 'income_id' | 'created_at' | 'account_name'>) =>
     api.put(`/api/income/${incomeId}`, data),
@@ -302,6 +405,16 @@ export const incomeApi = {
     api.get(`/api/income/summary/monthly?user_id=${userId}&year=${year}${month ? `&month=${month}` : ''}`),
 };
 
+export const dashboardApi = {
+  get: (userId: string, params?: { year?: number; month?: number; recent_limit?: number }) =>
+    api.get<Dashboard>(`/api/dashboard/${userId}`, { params }),
+};
+
+export const statisticsApi = {
+  get: (params: { user_id: string; start_date?: string; end_date?: string }) =>
+    api.get<Statistics>('/api/statistics/', { params }),
+};
+
 export const tagApi = {
   create: (data: { user_id: string; name: string; type: 'Expense' | 'Income' | 'InternalLoan' | 'ExternalLoan' }) =>
     api.post('/api/tags/', data),